@@ -1,12 +1,66 @@
 import logging
 import os
 
-import vtk
+import vtk, qt
 
 import slicer
 from slicer.ScriptedLoadableModule import *
 from slicer.util import VTKObservationMixin
 
+from t_ApplyThresholdLib import *
+from t_ApplyThresholdLib.SampleDataCache import SampleDataCache
+from t_ApplyThresholdLib.TypedParameterNode import TypedParameterNode
+
+'''=================================================================================================================='''
+'''=================================================================================================================='''
+'''------------------------- STRING Macro of  t_ApplyThreshold ------------------------------------------------------'''
+'''------------------------------------------------------------------------------------------------------------------'''
+# Threshold engines of t_ApplyThresholdLogic.process
+STR_ThresholdEngine_NumPy               = 'NumPy'   # In-process, vectorized on the voxel array (default)
+STR_ThresholdEngine_CLI                 = 'CLI'     # "Threshold Scalar Volume" CLI module (opt-in fallback)
+
+# Output modes of t_ApplyThresholdLogic.process
+STR_OutputMode_KeepValues               = 'KeepValues'      # Scalar type of the input, thresholded voxels set to 0
+STR_OutputMode_BinaryMask               = 'BinaryMask'      # uint8 mask, 1 for the kept voxels
+STR_OutputMode_BitPackedMask            = 'BitPackedMask'   # Bit-packed mask in a sidecar file, 8 voxels per byte
+
+# Live preview: slider events closer than this are coalesced into one recompute of the visible slices
+INT_LivePreviewDebounce_ms              = 30
+# Background threshold: period of the main-thread poll of the worker (progress, result hand-over)
+INT_AsyncPoll_ms                        = 50
+# Batch threshold: volumes submitted to the process pool at a time, per worker process (bounds the temporary files)
+INT_BatchInFlightPerProcess             = 2
+
+# Parameters of the parameter node and their types (see TypedParameterNode), and its node references. Their
+#   modifications within one turn of the event loop are coalesced into one refresh of the widgets whose value changed
+DICT_ParameterTypes = {
+    "Threshold":                float,
+    "Invert":                   bool,
+    "LivePreview":              bool,
+    "OutputMode":               str,
+    "RunInBackground":          bool,
+    "AutoThresholdMethod":      str,
+    "AutoThresholdPercentile":  float,
+}
+TUPLE_ReferenceRoles                    = ("InputVolume", "OutputVolume", "OutputVolumeInverse")
+
+# Automatic threshold methods of t_ApplyThresholdLogic.obtainSuggestedThreshold
+STR_AutoThreshold_Otsu                  = 'Otsu'        # Maximal between-class variance of the two classes
+STR_AutoThreshold_Percentile            = 'Percentile'  # Intensity below which a given % of the voxels lie
+STR_AutoThreshold_Valley                = 'Valley'      # Least populated intensity between the two highest modes
+
+# Sample data sets: download URL, file name and checksum (also the key of the local sample cache, see SampleDataCache)
+DICT_SampleDataSources = {
+    't_ApplyThreshold1': {
+        'Uri': 'https://github.com/Slicer/SlicerTestingData/releases/download/SHA256/998cb522173839c78657f4bc0ea907cea09fd04e44601f17c82ea27927937b95',
+        'FileName': 't_ApplyThreshold1.nrrd',
+        'Checksum': 'SHA256:998cb522173839c78657f4bc0ea907cea09fd04e44601f17c82ea27927937b95'},
+    't_ApplyThreshold2': {
+        'Uri': 'https://github.com/Slicer/SlicerTestingData/releases/download/SHA256/1a64f3f422eb3d1c9b093d1a18da354b13bcf307907c66317e2463ee530b7a97',
+        'FileName': 't_ApplyThreshold2.nrrd',
+        'Checksum': 'SHA256:1a64f3f422eb3d1c9b093d1a18da354b13bcf307907c66317e2463ee530b7a97'},
+}
+
 '''=================================================================================================================='''
 '''=================================================================================================================='''
 #
@@ -28,8 +82,8 @@ This file was originally developed by Jean-Christophe Fillion-Robin, Kitware Inc
 and Steve Pieper, Isomics, Inc. and was partially funded by NIH grant 3P41RR013218-12S1.
 """
 
-        # Additional initialization step after application startup is complete
-        slicer.app.connect("startupCompleted()", registerSampleData)
+        # Sample data sources are registered on first use of the module (widget setup or test), not at every
+        #   application start: see registerSampleDataOnce()
 
         print("t_ApplyThreshold(ScriptedLoadableModule):    __init__(self, parent)")
 
@@ -46,7 +100,10 @@ class t_ApplyThresholdWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         VTKObservationMixin.__init__(self)  # needed for parameter node observation
         self.logic = None
         self._parameterNode = None # SingleTon initialized through self.setParameterNode(self.logic.getParameterNode())
+        self._parameters = None    # Typed, cached view of self._parameterNode, see t_ApplyThresholdLogic.obtainParameters
         self._updatingGUIFromParameterNode = False
+        self._float_LivePreviewThreshold = None   # Latest slider value while dragging, see onLivePreviewTimer_Timeout
+        self._dict_GUIState = None      # Parameter values and reference IDs shown in the GUI, see updateGUIFromParameterNode
         print("**Widget.__init__(self, parent)")
 
     # ------------------------------------------------------------------------------------------------------------------
@@ -58,6 +115,7 @@ class t_ApplyThresholdWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
 
         # 01. Load widget from .ui file (created by Qt Designer).
         #       Additional widgets can be instantiated manually and added to self.layout.
+        registerSampleDataOnce()
         uiWidget = slicer.util.loadUI(self.resourcePath('UI/t_ApplyThreshold.ui'))
         self.layout.addWidget(uiWidget)
         self.ui = slicer.util.childWidgetVariables(uiWidget)
@@ -82,8 +140,32 @@ class t_ApplyThresholdWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         self.ui.imageThresholdSliderWidget.connect("valueChanged(double)", self.updateParameterNodeFromGUI)
         self.ui.invertOutputCheckBox.connect("toggled(bool)", self.updateParameterNodeFromGUI)
         self.ui.invertedOutputSelector.connect("currentNodeChanged(vtkMRMLNode*)", self.updateParameterNodeFromGUI)
+        self.ui.livePreviewCheckBox.connect("toggled(bool)", self.updateParameterNodeFromGUI)
+        self.ui.binaryMaskCheckBox.connect("toggled(bool)", self.updateParameterNodeFromGUI)
+        self.ui.runInBackgroundCheckBox.connect("toggled(bool)", self.updateParameterNodeFromGUI)
+        self.ui.autoThresholdMethodComboBox.connect("currentIndexChanged(int)", self.updateParameterNodeFromGUI)
+        self.ui.autoThresholdPercentileSpinBox.connect("valueChanged(double)", self.updateParameterNodeFromGUI)
 
         self.ui.applyButton.connect('clicked(bool)', self.onApplyButton)
+        self.ui.autoThresholdButton.connect('clicked(bool)', self.onAutoThresholdButton)
+        self.ui.applyProgressBar.visible = False   # Shown during a background run only, see onApplyButton
+        for str_Method in (STR_AutoThreshold_Otsu, STR_AutoThreshold_Percentile, STR_AutoThreshold_Valley):
+            self.ui.autoThresholdMethodComboBox.addItem(str_Method)
+
+        #       05-B. Live preview: slider dragged (tracking off) -> debounced recompute of the visible slices only;
+        #                           slider released           -> recompute of the whole volume
+        self.timer_LivePreview = qt.QTimer()
+        self.timer_LivePreview.setSingleShot(True)
+        self.timer_LivePreview.setInterval(INT_LivePreviewDebounce_ms)
+        self.timer_LivePreview.connect('timeout()', self.onLivePreviewTimer_Timeout)
+        self.ui.imageThresholdSliderWidget.connect("valueIsChanging(double)", self.onThresholdSlider_ValueIsChanging)
+        self.ui.imageThresholdSliderWidget.connect("valueChanged(double)", self.onThresholdSlider_ValueChanged)
+
+        #       05-C. Parameter node modified -> one GUI refresh at the next turn of the event loop (0 ms single shot)
+        self.timer_GUIRefresh = qt.QTimer()
+        self.timer_GUIRefresh.setSingleShot(True)
+        self.timer_GUIRefresh.setInterval(0)
+        self.timer_GUIRefresh.connect('timeout()', self.onGUIRefreshTimer_Timeout)
 
         # 06. Needed for programmer-friendly  Module-Reload   where the Module had already been enter(self)-ed;
         #                                     Otherwise,      will initial through function     enter(self)
@@ -95,6 +177,9 @@ class t_ApplyThresholdWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         """    Called when the application closes and the module widget is destroyed.    """
         print("**Widget.cleanup(self)")
         self.removeObservers()
+        self.timer_GUIRefresh.stop()
+        if self.logic:
+            self.logic.cancelAsync()
 
     # ------------------------------------------------------------------------------------------------------------------
     def enter(self):
@@ -110,12 +195,18 @@ class t_ApplyThresholdWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         """    Called each time the user opens a different module.    """
         print("**Widget.exit(self)")
         # Slicer. Do not react to parameter node changes (GUI will be updated when the user enters into the module)
-        self.removeObserver(self._parameterNode, vtk.vtkCommand.ModifiedEvent, self.updateGUIFromParameterNode)
+        self.removeObserver(self._parameterNode, vtk.vtkCommand.ModifiedEvent, self.onParameterNodeModified)
+        # No queued GUI refresh once the module is left: enter() refreshes the GUI anyway
+        self.timer_GUIRefresh.stop()
 
     # ------------------------------------------------------------------------------------------------------------------
     def onSceneStartClose(self, caller, event):
         """    Called just before the scene is closed.    """
         print("**Widget.onSceneStartClose(self, caller, event)")
+        # A background threshold would publish its result into nodes of the closed scene
+        self.logic.cancelAsync()
+        # Cached results of the volumes of the closed scene would stay in memory until evicted
+        self.logic.clearResultCache()
 
         # Slicer. Parameter node will be reset, do not use it anymore
         self.setParameterNode(None)
@@ -155,44 +246,95 @@ class t_ApplyThresholdWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
 
         # 01. Unobserve previously selected SingleTon ParameterNode
         if self._parameterNode is not None:
-            self.removeObserver(self._parameterNode, vtk.vtkCommand.ModifiedEvent, self.updateGUIFromParameterNode)
-        # 02. Set new SingleTon ParameterNode and  Add an observer to the newly selected -> immediate GUI reflection
+            self.removeObserver(self._parameterNode, vtk.vtkCommand.ModifiedEvent, self.onParameterNodeModified)
+        # 02. Set new SingleTon ParameterNode and  Add an observer to the newly selected -> GUI reflection, coalesced
         self._parameterNode = inputParameterNode
+        self._parameters = self.logic.obtainParameters(inputParameterNode) if inputParameterNode else None
         if self._parameterNode is not None:
-            self.addObserver(self._parameterNode, vtk.vtkCommand.ModifiedEvent, self.updateGUIFromParameterNode)
-        # 03. Initial GUI update; need to do this GUI update whenever there is a change from the SingleTon ParameterNode
+            self.addObserver(self._parameterNode, vtk.vtkCommand.ModifiedEvent, self.onParameterNodeModified)
+        # 03. Initial GUI update, of all the widgets; later updates only set the widgets of what changed
+        self._dict_GUIState = None
+        self.updateGUIFromParameterNode()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def onParameterNodeModified(self, caller=None, event=None):
+        """    Observer of the parameter node: queue one GUI refresh for the next turn of the event loop, however many
+                  modifications (e.g. of a script setting parameters one by one) happen before it.    """
+        if not self.timer_GUIRefresh.isActive():
+            self.timer_GUIRefresh.start()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def onGUIRefreshTimer_Timeout(self):
+        """    The queued GUI refresh, at the first event-loop turn after the parameter node modifications.    """
         self.updateGUIFromParameterNode()
 
     # ------------------------------------------------------------------------------------------------------------------
     def updateGUIFromParameterNode(self, caller=None, event=None):
-        """   This method is called whenever parameter node is changed.
-              The module GUI is updated to show the current state of the parameter node.    """
+        """   This method is called once per event-loop turn in which the parameter node changed (onParameterNodeModified).
+              The module GUI is updated to show the current state of the parameter node: only the widgets of the
+              parameters and node references that changed since the previous update are set (all after setParameterNode).
+              :return: set of the parameter names and reference roles whose widgets were updated    """
         # 00. Check self._updatingGUIFromParameterNode to prevent from GUI changes
         #       (it could cause infinite loop:  GUI change -> UpdateParamNode -> Update GUI -> UpdateParamNode)
         if self._parameterNode is None or self._updatingGUIFromParameterNode:
-            return
+            return set()
+        self.timer_GUIRefresh.stop()    # A direct call serves the refresh that may be queued
+        dict_State = self._parameters.obtainState()     # Typed values; parsed again only if their string changed
+        set_Changed = {str_Key for str_Key, value in dict_State.items()
+                       if self._dict_GUIState is None or self._dict_GUIState.get(str_Key) != value}
+        self._dict_GUIState = dict_State
+        if not set_Changed:
+            return set_Changed
 
         # I. Open-Brace:  Make sure GUI changes do not call updateParameterNodeFromGUI__ (it could cause infinite loop)
         self._updatingGUIFromParameterNode = True
         # --------------------------------------------------------------------------------------------------------------
         # II. SL_Developer.  In-Brace,   Update UI widgets ()
-        print("**Widget.updateGUIFromParameterNode(self, caller=None, event=None), \tSL_Developer")
         #       II-01. Update node selectors and sliders
-        self.ui.inputSelector.setCurrentNode(self._parameterNode.GetNodeReference("InputVolume"))
-        self.ui.outputSelector.setCurrentNode(self._parameterNode.GetNodeReference("OutputVolume"))
-        self.ui.invertedOutputSelector.setCurrentNode(self._parameterNode.GetNodeReference("OutputVolumeInverse"))
-        self.ui.imageThresholdSliderWidget.value = float(self._parameterNode.GetParameter("Threshold"))
-        self.ui.invertOutputCheckBox.checked = (self._parameterNode.GetParameter("Invert") == "true")
+        if "InputVolume" in set_Changed:
+            self.ui.inputSelector.setCurrentNode(self._parameters.getNode("InputVolume"))
+            self.ui.autoThresholdButton.enabled = dict_State["InputVolume"] is not None
+        if "OutputVolume" in set_Changed:
+            self.ui.outputSelector.setCurrentNode(self._parameters.getNode("OutputVolume"))
+        if "OutputVolumeInverse" in set_Changed:
+            self.ui.invertedOutputSelector.setCurrentNode(self._parameters.getNode("OutputVolumeInverse"))
+        if "Threshold" in set_Changed:
+            self.ui.imageThresholdSliderWidget.value = dict_State["Threshold"]
+        if "Invert" in set_Changed:
+            self.ui.invertOutputCheckBox.checked = dict_State["Invert"]
+        if "LivePreview" in set_Changed:
+            self.ui.livePreviewCheckBox.checked = dict_State["LivePreview"]
+            #   With tracking off, the slider emits valueIsChanging while dragged, and valueChanged once released
+            self.ui.imageThresholdSliderWidget.tracking = not self.ui.livePreviewCheckBox.checked
+        if "OutputMode" in set_Changed:
+            self.ui.binaryMaskCheckBox.checked = (dict_State["OutputMode"] == STR_OutputMode_BinaryMask)
+        if "RunInBackground" in set_Changed:
+            self.ui.runInBackgroundCheckBox.checked = dict_State["RunInBackground"]
+        if "AutoThresholdMethod" in set_Changed:
+            self.ui.autoThresholdMethodComboBox.currentText = dict_State["AutoThresholdMethod"]
+            self.ui.autoThresholdPercentileSpinBox.enabled = (self.ui.autoThresholdMethodComboBox.currentText == STR_AutoThreshold_Percentile)
+        if "AutoThresholdPercentile" in set_Changed:
+            self.ui.autoThresholdPercentileSpinBox.value = dict_State["AutoThresholdPercentile"]
         #       II-02. Update buttons states and tooltips
-        if self._parameterNode.GetNodeReference("InputVolume") and self._parameterNode.GetNodeReference("OutputVolume"):
+        if "InputVolume" in set_Changed or "OutputVolume" in set_Changed:
+            self.uiUpdate_ApplyButton()
+        # --------------------------------------------------------------------------------------------------------------
+        # III. Close-Brace: All the GUI updates are done
+        self._updatingGUIFromParameterNode = False
+        return set_Changed
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def uiUpdate_ApplyButton(self):
+        """    State and tooltip of the Apply button: "Cancel" during a background run, else enabled with input and output.  """
+        if self.logic.isAsyncRunning():
+            self.ui.applyButton.toolTip = "Cancel the running threshold"
+            self.ui.applyButton.enabled = True
+        elif self._parameters.getNode("InputVolume") and self._parameters.getNode("OutputVolume"):
             self.ui.applyButton.toolTip = "Compute output volume"
             self.ui.applyButton.enabled = True
         else:
             self.ui.applyButton.toolTip = "Select input and output volume nodes"
             self.ui.applyButton.enabled = False
-        # --------------------------------------------------------------------------------------------------------------
-        # III. Close-Brace: All the GUI updates are done
-        self._updatingGUIFromParameterNode = False
 
     # ------------------------------------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------------------------
@@ -200,37 +342,148 @@ class t_ApplyThresholdWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         """ Read GUI Method:   Method updateParameterNodeFromGUI__ is called when users makes any change in the GUI.
               Changes are saved into the parameter node (so that they are restored when the scene is saved and loaded).
         """
-        print(f"**Widget.updateParameterNodeFromGUI(self, caller=None, event=None),     \t SL_Developer")
         if self._parameterNode is None or self._updatingGUIFromParameterNode:
             return
 
-        # I. Before  updating the SingleTon ParameterNode; Disable Modify events, e.g., vtk.vtkCommand.ModifiedEvent
-        wasModified = self._parameterNode.StartModify()  # Modify all properties in a single batch
+        # I. Before  updating the SingleTon ParameterNode; Disable Modify events: all the writes in a single batch
+        with self._parameters.batch() as parameters:
+            # II.   Update the SingleTon ParameterNode; only the values that differ are written (no string formatting
+            #       nor parsing of the unchanged ones); No updateGUIFromParameterNode triggered in this step
+            parameters.setNodeID("InputVolume", self.ui.inputSelector.currentNodeID)
+            parameters.setNodeID("OutputVolume", self.ui.outputSelector.currentNodeID)
+            parameters.set("Threshold", self.ui.imageThresholdSliderWidget.value)
+            parameters.set("Invert", self.ui.invertOutputCheckBox.checked)
+            parameters.setNodeID("OutputVolumeInverse", self.ui.invertedOutputSelector.currentNodeID)
+            parameters.set("LivePreview", self.ui.livePreviewCheckBox.checked)
+            parameters.set("OutputMode", STR_OutputMode_BinaryMask if self.ui.binaryMaskCheckBox.checked
+                                         else STR_OutputMode_KeepValues)
+            parameters.set("RunInBackground", self.ui.runInBackgroundCheckBox.checked)
+            parameters.set("AutoThresholdMethod", self.ui.autoThresholdMethodComboBox.currentText)
+            parameters.set("AutoThresholdPercentile", self.ui.autoThresholdPercentileSpinBox.value)
+        # III. After   updating the SingleTon ParameterNode; Modify events enabled again by the end of the batch
 
-        # II.   Update the SingleTon ParameterNode; No updateGUIFromParameterNode triggered in this step
-        self._parameterNode.SetNodeReferenceID("InputVolume", self.ui.inputSelector.currentNodeID)
-        self._parameterNode.SetNodeReferenceID("OutputVolume", self.ui.outputSelector.currentNodeID)
-        self._parameterNode.SetParameter("Threshold", str(self.ui.imageThresholdSliderWidget.value))
-        self._parameterNode.SetParameter("Invert", "true" if self.ui.invertOutputCheckBox.checked else "false")
-        self._parameterNode.SetNodeReferenceID("OutputVolumeInverse", self.ui.invertedOutputSelector.currentNodeID)
+    # ------------------------------------------------------------------------------------------------------------------
+    def onApplyButton(self):
+        """ SL_Developer. Run processing when user clicks "Apply" button; "Cancel" while a background run is going.     """
+        if self.logic.isAsyncRunning():
+            self.logic.cancelAsync()
+            return
 
-        # III. After   updating the SingleTon ParameterNode; Enable Modify events, e.g., vtk.vtkCommand.ModifiedEvent
-        self._parameterNode.EndModify(wasModified)
+        if self.ui.runInBackgroundCheckBox.checked:
+            self.startAsyncProcess(self.ui.imageThresholdSliderWidget.value,
+                                   invertedOutputVolume=self.ui.invertedOutputSelector.currentNode())
+            return
+        self.processWholeVolume(self.ui.imageThresholdSliderWidget.value)
 
     # ------------------------------------------------------------------------------------------------------------------
-    def onApplyButton(self):
-        """ SL_Developer. Run processing when user clicks "Apply" button.     """
+    def processWholeVolume(self, imageThreshold):
+        """ SL_Developer. Compute the output, and the inverted output if one is selected, on the main thread.   """
         with slicer.util.tryWithErrorDisplay("Failed to compute results.", waitCursor=True):
 
-            # Compute output
-            self.logic.process(self.ui.inputSelector.currentNode(), self.ui.outputSelector.currentNode(),
-                               self.ui.imageThresholdSliderWidget.value, self.ui.invertOutputCheckBox.checked)
-
-            # Compute inverted output (if needed)
             if self.ui.invertedOutputSelector.currentNode():
-                # If additional output volume is selected then result with inverted threshold is written there
-                self.logic.process(self.ui.inputSelector.currentNode(), self.ui.invertedOutputSelector.currentNode(),
-                                   self.ui.imageThresholdSliderWidget.value, not self.ui.invertOutputCheckBox.checked, showResult=False)
+                # Compute output and inverted output (written in the additional volume) from one read of the input
+                self.logic.processWithInvertedOutput(self.ui.inputSelector.currentNode(),
+                                                     self.ui.outputSelector.currentNode(),
+                                                     self.ui.invertedOutputSelector.currentNode(),
+                                                     imageThreshold,
+                                                     self.ui.invertOutputCheckBox.checked,
+                                                     outputMode=self._parameters.get("OutputMode"))
+            else:
+                # Compute output, thresholded values or uint8 mask
+                self.logic.process(self.ui.inputSelector.currentNode(), self.ui.outputSelector.currentNode(),
+                                   imageThreshold, self.ui.invertOutputCheckBox.checked,
+                                   outputMode=self._parameters.get("OutputMode"))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def onAutoThresholdButton(self):
+        """ SL_Developer. Set the threshold slider to the threshold suggested for the input volume.     """
+        with slicer.util.tryWithErrorDisplay("Failed to compute the automatic threshold.", waitCursor=True):
+            value = self.logic.obtainSuggestedThreshold(self.ui.inputSelector.currentNode(),
+                                                        self.ui.autoThresholdMethodComboBox.currentText,
+                                                        self.ui.autoThresholdPercentileSpinBox.value)
+            slider = self.ui.imageThresholdSliderWidget
+            slider.minimum, slider.maximum = min(slider.minimum, value), max(slider.maximum, value)
+            slider.value = value
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def startAsyncProcess(self, imageThreshold, invertedOutputVolume=None):
+        """ SL_Developer. Compute on a background thread: the GUI stays responsive, the button turns into "Cancel".   """
+        with slicer.util.tryWithErrorDisplay("Failed to compute results."):
+            self.logic.processAsync(self.ui.inputSelector.currentNode(), self.ui.outputSelector.currentNode(),
+                                    imageThreshold, self.ui.invertOutputCheckBox.checked,
+                                    outputMode=self._parameters.get("OutputMode"),
+                                    invertedOutputVolume=invertedOutputVolume,
+                                    fn_Progress=self.onAsyncThreshold_Progress,
+                                    fn_Finished=self.onAsyncThreshold_Finished)
+            self.ui.applyButton.text = "Cancel"
+            self.ui.applyProgressBar.value = 0
+            self.ui.applyProgressBar.visible = True
+            self.uiUpdate_ApplyButton()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def onAsyncThreshold_Progress(self, float_Progress):
+        """ SL_Developer. Background threshold progress, on the main thread.   """
+        self.ui.applyProgressBar.value = int(round(100 * float_Progress))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def onAsyncThreshold_Finished(self, bool_Completed, str_Error):
+        """ SL_Developer. Background threshold completed, cancelled or failed: "Cancel" turns back into "Apply".   """
+        self.ui.applyButton.text = "Apply"
+        self.ui.applyProgressBar.visible = False
+        self.uiUpdate_ApplyButton()
+        if not bool_Completed and str_Error != 'Cancelled':
+            slicer.util.errorDisplay(f"Failed to compute results: {str_Error}")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def onThresholdSlider_ValueIsChanging(self, value):
+        """ SL_Developer. Slider dragged with live preview on: (re-)start the debounce timer of the preview.   """
+        if self._parameterNode is None or self._updatingGUIFromParameterNode or not self.ui.livePreviewCheckBox.checked:
+            return
+        self._float_LivePreviewThreshold = value
+        self.timer_LivePreview.start()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def onLivePreviewTimer_Timeout(self):
+        """ SL_Developer. Recompute only the slices shown in the slice views, with the latest dragged value.   """
+        inputVolume, outputVolume = self.ui.inputSelector.currentNode(), self.ui.outputSelector.currentNode()
+        if not inputVolume or not outputVolume or self._float_LivePreviewThreshold is None:
+            return
+        # A background recompute of a previous release would overwrite the preview with its older threshold
+        if self.logic.isAsyncRunning():
+            self.logic.cancelAsync()
+        try:
+            self.logic.processVisibleSlices(inputVolume, outputVolume, self._float_LivePreviewThreshold,
+                                            self.ui.invertOutputCheckBox.checked, self.obtainSliceNodes_InLayout(),
+                                            outputMode=self._parameters.get("OutputMode"))
+        except Exception as e:
+            logging.error(f'Live preview failed: {e}')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def onThresholdSlider_ValueChanged(self, value):
+        """ SL_Developer. Slider released with live preview on: drop the pending preview, recompute the whole volume
+              (and the inverted output, if selected); on the background thread if "Run in background" is checked,
+              so that the release does not block the GUI.
+              Only after a drag: a value typed in the spin box emits valueChanged per keystroke, without valueIsChanging.   """
+        if self._parameterNode is None or self._updatingGUIFromParameterNode or not self.ui.livePreviewCheckBox.checked:
+            return
+        if self._float_LivePreviewThreshold is None:    # Set by valueIsChanging only, i.e. while the slider is dragged
+            return
+        self.timer_LivePreview.stop()
+        self._float_LivePreviewThreshold = None
+        if not self.ui.inputSelector.currentNode() or not self.ui.outputSelector.currentNode():
+            return
+        if self.ui.runInBackgroundCheckBox.checked:
+            self.startAsyncProcess(value, invertedOutputVolume=self.ui.invertedOutputSelector.currentNode())
+        else:
+            self.processWholeVolume(value)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainSliceNodes_InLayout(self):
+        """ Slice nodes of the slice views of the current layout.    """
+        layoutManager = slicer.app.layoutManager()
+        if not layoutManager:
+            return []
+        return [layoutManager.sliceWidget(str_ViewName).mrmlSliceNode() for str_ViewName in layoutManager.sliceViewNames()]
 
 
 '''=================================================================================================================='''
@@ -238,7 +491,7 @@ class t_ApplyThresholdWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
 #
 # t_ApplyThresholdLogic
 #
-class t_ApplyThresholdLogic(ScriptedLoadableModuleLogic):
+class t_ApplyThresholdLogic(ScriptedLoadableModuleLogic, VTKObservationMixin):
     """   The Logic class is :  to facilitate dynamic reloading of the module without restarting the application.
           This class should implement all the actual computation done by your module.  
           The interface should be such that other python code can import this class 
@@ -250,21 +503,182 @@ class t_ApplyThresholdLogic(ScriptedLoadableModuleLogic):
     def __init__(self):
         """    Called when the logic class is instantiated. Can be used for initializing member variables.    """
         ScriptedLoadableModuleLogic.__init__(self)
+        VTKObservationMixin.__init__(self)  # needed for input volume observation of the threshold index
         print("**Logic.__init__(self)")
 
+        # Threads of the NumPy engine, over slabs of the voxel array; 1 is the serial path, see setNumberOfThreads()
+        self.int_NumberOfThreads = 1
+        # Optional SortedVoxelIndex per input volume ID, see buildThresholdIndex()
+        self.dict_ThresholdIndex = {}
+        # LRU cache of NumPy engine outputs, keyed by obtainResultCacheKey(); opt-in, see setResultCacheBudgetBytes()
+        self.resultCache = ThresholdResultCache(INT_ResultCacheBudgetBytes_Default)
+        # Bool scratch of the threshold mask, one slab per thread, reused while its shape holds, see obtainMaskScratch()
+        self._arr_MaskScratch = None
+        # Allocation measurement of process(), see obtainAllocationStats()
+        self.bool_MeasureAllocations = False
+        self.dict_LastAllocationStats = None
+        # Background threshold of processAsync(): the running task, its poll timer and its output nodes/callbacks
+        self.asyncTask = None
+        self.timer_AsyncPoll = None
+        self._dict_AsyncRun = None
+        # IntensityHistogram per input volume ID, with the image data MTime it was counted at; see obtainIntensityHistogram()
+        self.dict_Histogram = {}
+        # Typed, cached view of the parameter node, see obtainParameters()
+        self._parameters = None
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def setNumberOfThreads(self, int_NumberOfThreads=None):
+        """    SL_Developer.  Threads of the NumPy engine; None for one thread per CPU core.
+                  NumPy releases the GIL in the threshold kernel, so slabs run concurrently on a thread pool.    """
+        if int_NumberOfThreads is None:
+            int_NumberOfThreads = os.cpu_count() or 1
+        if int_NumberOfThreads < 1:
+            raise ValueError(f'SL_Alert! Invalid int_NumberOfThreads = {int_NumberOfThreads}')
+        self.int_NumberOfThreads = int(int_NumberOfThreads)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def buildThresholdIndex(self, inputVolume):
+        """    SL_Developer.  Precompute a SortedVoxelIndex of inputVolume, so that the next process() calls with
+                  another threshold only touch the voxels whose state flips. Costs one argsort, and about
+                  (itemsize + 4) bytes per voxel; invalidated when the image data of inputVolume is modified.
+                  :return: bytes used by the index    """
+        self.removeThresholdIndex(inputVolume)
+        index = SortedVoxelIndex(slicer.util.arrayFromVolume(inputVolume))
+        self.dict_ThresholdIndex[inputVolume.GetID()] = index
+        self.addObserver(inputVolume, slicer.vtkMRMLVolumeNode.ImageDataModifiedEvent, self.onIndexedVolume_Modified)
+        logging.info(f'Threshold index of {inputVolume.GetName()}: {index.obtainMemoryBytes() / 2**20:.1f} MB, '
+                     f'total {self.obtainThresholdIndexMemoryBytes() / 2**20:.1f} MB')
+        return index.obtainMemoryBytes()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def removeThresholdIndex(self, inputVolume):
+        """    SL_Developer.  Drop the SortedVoxelIndex of inputVolume, if any.    """
+        if self.dict_ThresholdIndex.pop(inputVolume.GetID(), None) is not None:
+            self.removeObserver(inputVolume, slicer.vtkMRMLVolumeNode.ImageDataModifiedEvent, self.onIndexedVolume_Modified)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def onIndexedVolume_Modified(self, caller, event):
+        """    Voxels of an indexed input volume changed: its index is stale.    """
+        logging.info(f'Threshold index invalidated: {caller.GetName()}')
+        self.removeThresholdIndex(caller)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainThresholdIndexMemoryBytes(self):
+        """    Bytes used by all threshold indices.    """
+        return sum(index.obtainMemoryBytes() for index in self.dict_ThresholdIndex.values())
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def setResultCacheBudgetBytes(self, int_BudgetBytes):
+        """    SL_Developer.  Memory budget of the result cache; 0 (the default) disables it.    """
+        self.resultCache.setBudgetBytes(int_BudgetBytes)
+        if not int_BudgetBytes:
+            self.clearResultCache()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def putResultCache(self, key_ResultCache, arr):
+        """    Store arr under key_ResultCache, see obtainResultCacheKey(). The results of older voxels of the same input
+                  are dropped (their key can no longer be hit), and so are all its results once it leaves the scene.    """
+        if not self.resultCache.isStorable(arr.nbytes):
+            return
+        str_InputID, int_MTime = key_ResultCache[:2]
+        self.resultCache.removeEntries(lambda key: key[0] == str_InputID and key[1] != int_MTime)
+        self.resultCache.put(key_ResultCache, arr)
+        if not self.hasObserver(slicer.mrmlScene, slicer.mrmlScene.NodeRemovedEvent, self.onSceneNode_Removed):
+            self.addObserver(slicer.mrmlScene, slicer.mrmlScene.NodeRemovedEvent, self.onSceneNode_Removed)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @vtk.calldata_type(vtk.VTK_OBJECT)
+    def onSceneNode_Removed(self, caller, event, removedNode):
+        """    A node left the scene: drop the cached results of which it is the input.    """
+        str_NodeID = removedNode.GetID()
+        if self.resultCache.removeEntries(lambda key: key[0] == str_NodeID):
+            logging.info(f'Result cache entries dropped: {removedNode.GetName()} removed')
+        if not self.resultCache.dict_Entries:
+            self.removeObserver(slicer.mrmlScene, slicer.mrmlScene.NodeRemovedEvent, self.onSceneNode_Removed)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def clearResultCache(self):
+        """    SL_Developer.  Drop all the cached results, e.g. before the scene is closed.    """
+        self.resultCache.clear()
+        self.removeObserver(slicer.mrmlScene, slicer.mrmlScene.NodeRemovedEvent, self.onSceneNode_Removed)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def loadSampleVolume(self, str_SampleName):
+        """    SL_Developer.  Load a sample of DICT_SampleDataSources through the local, checksum-verified sample cache:
+                  downloaded once, or resolved offline (see SampleDataCache), then read from the cache.    """
+        dict_Source = DICT_SampleDataSources[str_SampleName]
+        str_Path = obtainSampleDataCache().obtainSample(dict_Source['Checksum'], dict_Source['Uri'], dict_Source['FileName'])
+        return slicer.util.loadVolume(str_Path, {'name': str_SampleName})
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainIntensityHistogram(self, inputVolume):
+        """    SL_Developer.  IntensityHistogram of inputVolume, counted in one slab-wise pass over its voxels on the
+                  scalar range VTK keeps for display. Cached per input, until its image data is modified.    """
+        imageData = inputVolume.GetImageData()
+        int_MTime = imageData.GetMTime()
+        tuple_Cached = self.dict_Histogram.get(inputVolume.GetID())
+        if tuple_Cached and tuple_Cached[0] == int_MTime:
+            return tuple_Cached[1]
+        value_Min, value_Max = imageData.GetScalarRange()
+        histogram = IntensityHistogram(slicer.util.arrayFromVolume(inputVolume), INT_HistogramBins_Default,
+                                       value_Min, value_Max, self.int_NumberOfThreads)
+        self.dict_Histogram[inputVolume.GetID()] = (imageData.GetMTime(), histogram)
+        return histogram
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainSuggestedThreshold(self, inputVolume, str_Method=STR_AutoThreshold_Otsu, float_Percentile=50.0):
+        """    SL_Developer.  Threshold for process() suggested by str_Method on the histogram of inputVolume:
+                  STR_AutoThreshold_Otsu, STR_AutoThreshold_Percentile (float_Percentile %) or STR_AutoThreshold_Valley.
+                  Instant once the histogram of inputVolume is cached.    """
+        if not inputVolume or not inputVolume.GetImageData():
+            raise ValueError("Input volume is invalid")
+        histogram = self.obtainIntensityHistogram(inputVolume)
+        if str_Method == STR_AutoThreshold_Otsu:
+            return histogram.obtainOtsuThreshold()
+        if str_Method == STR_AutoThreshold_Percentile:
+            return histogram.obtainPercentileThreshold(float_Percentile)
+        if str_Method == STR_AutoThreshold_Valley:
+            return histogram.obtainValleyThreshold()
+        raise ValueError(f'SL_Alert! Invalid automatic threshold method = {str_Method}')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainResultCacheKey(self, inputVolume, imageThreshold, invert, outputMode=STR_OutputMode_KeepValues):
+        """    (input ID, input voxels modification time, threshold cast to the scalar type, invert, output mode).
+                  The modification time of vtkImageData includes its scalars, so any change of the voxels gives a new key.    """
+        imageData = inputVolume.GetImageData()
+        value = castThresholdToScalarType(imageThreshold, slicer.util.arrayFromVolume(inputVolume).dtype)
+        return (inputVolume.GetID(), imageData.GetMTime(), value.item(), bool(invert), outputMode)
+
     # ------------------------------------------------------------------------------------------------------------------
     def setDefaultParameters(self, parameterNode):
         """    SL_Developer:    Initialize parameter node, Re-Enter, Re-Load.    """''''''
         print("\t\t\t**Logic.setDefaultParameters(self, parameterNode), \tSL_Developer");
 
         """        Initialize parameter node with default settings.       """
-        if not parameterNode.GetParameter("Threshold"):
-            parameterNode.SetParameter("Threshold", "100.0")
-        if not parameterNode.GetParameter("Invert"):
-            parameterNode.SetParameter("Invert", "false")
+        with self.obtainParameters(parameterNode).batch() as parameters:
+            parameters.setDefault("Threshold", 100.0)
+            parameters.setDefault("Invert", False)
+            parameters.setDefault("LivePreview", False)
+            parameters.setDefault("OutputMode", STR_OutputMode_KeepValues)
+            parameters.setDefault("RunInBackground", False)
+            parameters.setDefault("AutoThresholdMethod", STR_AutoThreshold_Otsu)
+            parameters.setDefault("AutoThresholdPercentile", 50.0)
 
     # ------------------------------------------------------------------------------------------------------------------
-    def process(self, inputVolume, outputVolume, imageThreshold, invert=False, showResult=True):
+    def obtainParameters(self, parameterNode=None):
+        """    Typed, cached view of parameterNode (default: the parameter node of the module), see TypedParameterNode.
+                  The same view is returned while the parameter node is the same; a new one after a scene close.    """
+        if parameterNode is None:
+            parameterNode = self.getParameterNode()
+        if self._parameters is None or self._parameters.parameterNode is not parameterNode:
+            if self._parameters is not None:
+                self._parameters.release()
+            self._parameters = TypedParameterNode(parameterNode, DICT_ParameterTypes, TUPLE_ReferenceRoles)
+        return self._parameters
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def process(self, inputVolume, outputVolume, imageThreshold, invert=False, showResult=True,
+                engine=STR_ThresholdEngine_NumPy, outputMode=STR_OutputMode_KeepValues, str_MaskSidecarPath=None):
         """
         Run the processing algorithm.
         Can be used without GUI widget.
@@ -273,15 +687,618 @@ class t_ApplyThresholdLogic(ScriptedLoadableModuleLogic):
         :param imageThreshold: values above/below this threshold will be set to 0
         :param invert: if True then values above the threshold will be set to 0, otherwise values below are set to 0
         :param showResult: show output volume in slice viewers
+        :param engine: STR_ThresholdEngine_NumPy (in-process, default) or STR_ThresholdEngine_CLI (fallback)
+        :param outputMode: STR_OutputMode_KeepValues (default), STR_OutputMode_BinaryMask (uint8 outputVolume)
+                           or STR_OutputMode_BitPackedMask (str_MaskSidecarPath is written, outputVolume may be None)
+        :param str_MaskSidecarPath: .npz file of the bit-packed mask, see t_ApplyThresholdLib.loadBitPackedMask
+        """
+
+        if outputMode not in (STR_OutputMode_KeepValues, STR_OutputMode_BinaryMask, STR_OutputMode_BitPackedMask):
+            raise ValueError(f'SL_Alert! Invalid output mode = {outputMode}')
+        if not inputVolume or (not outputVolume and outputMode != STR_OutputMode_BitPackedMask):
+            raise ValueError("Input or output volume is invalid")
+        if outputMode == STR_OutputMode_BitPackedMask and not str_MaskSidecarPath:
+            raise ValueError("Mask sidecar path is required for the bit-packed output mode")
+        if engine not in (STR_ThresholdEngine_NumPy, STR_ThresholdEngine_CLI):
+            raise ValueError(f'SL_Alert! Invalid threshold engine = {engine}')
+        if engine == STR_ThresholdEngine_CLI and outputMode != STR_OutputMode_KeepValues:
+            raise ValueError(f'SL_Alert! Output mode {outputMode} needs the {STR_ThresholdEngine_NumPy} engine')
+
+        import time
+        startTime = time.time()
+        logging.info(f'Processing started, engine = {engine}')
+
+        if outputMode == STR_OutputMode_BitPackedMask:
+            self.processBitPackedMask(inputVolume, str_MaskSidecarPath, imageThreshold, invert)
+            logging.info(f'Processing completed in {time.time()-startTime:.2f} seconds')
+            return
+
+        if self.bool_MeasureAllocations:
+            dict_Before = self.startAllocationMeasurement(outputVolume)
+        if engine == STR_ThresholdEngine_CLI:
+            self.processWithCLI(inputVolume, outputVolume, imageThreshold, invert, showResult)
+        elif outputMode == STR_OutputMode_BinaryMask:
+            self.processBinaryMask(inputVolume, outputVolume, imageThreshold, invert, showResult)
+        else:
+            self.processWithNumPy(inputVolume, outputVolume, imageThreshold, invert, showResult)
+        if self.bool_MeasureAllocations:
+            self.dict_LastAllocationStats = self.stopAllocationMeasurement(outputVolume, dict_Before)
+            logging.info(f'Allocations: {self.dict_LastAllocationStats}')
+
+        stopTime = time.time()
+        logging.info(f'Processing completed in {stopTime-startTime:.2f} seconds')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def processWithNumPy(self, inputVolume, outputVolume, imageThreshold, invert=False, showResult=True):
+        """    SL_Developer. In-process threshold: one vectorized pass over the voxel array of inputVolume.
+                  No CLI process launch, no volume serialization, no temporary CLI node in the scene.    """
+        # 00-A. Same input voxels, threshold and invert as a cached result: copy it, no threshold pass
+        key_ResultCache = self.obtainResultCacheKey(inputVolume, imageThreshold, invert)
+        arr_Cached = self.resultCache.get(key_ResultCache)
+        if arr_Cached is not None:
+            self.updateOutputFromArray(outputVolume, arr_Cached)
+            outputVolume.CopyOrientation(inputVolume)
+            if showResult:
+                slicer.util.setSliceViewerLayers(background=outputVolume)
+            return
+
+        # 00-B. With a threshold index, only update the voxels whose state flips since the previous threshold
+        index = self.dict_ThresholdIndex.get(inputVolume.GetID())
+        if index and self.processWithThresholdIndex(index, outputVolume, imageThreshold, invert):
+            if showResult:
+                slicer.util.setSliceViewerLayers(background=outputVolume)
+            return
+
+        # 01. Threshold the voxel array, same 'Above'/'Below' semantics as the "Threshold Scalar Volume" CLI
+        #       01-A. Zero-copy: outputVolume already has the dimensions and scalar type, write through a NumPy view
+        #             of its vtkImageData buffer, then only signal Modified
+        arr_Input = slicer.util.arrayFromVolume(inputVolume)
+        arr_MaskSlabs = self.obtainMaskScratch(arr_Input)
+        if self.isOutputMatchingInput(inputVolume, outputVolume):
+            arr_Output = slicer.util.arrayFromVolume(outputVolume)
+            thresholdArrayParallel(arr_Input, imageThreshold, invert, arr_Output, self.int_NumberOfThreads, arr_MaskSlabs)
+            slicer.util.arrayFromVolumeModified(outputVolume)
+            if self.resultCache.isStorable(arr_Output.nbytes):
+                self.putResultCache(key_ResultCache, arr_Output.copy())    # The view follows outputVolume, copy it
+        #       01-B. Otherwise allocate, and let updateVolumeFromArray allocate the image data of outputVolume
+        else:
+            arr_Output = thresholdArrayParallel(arr_Input, imageThreshold, invert, None, self.int_NumberOfThreads,
+                                                arr_MaskSlabs)
+            slicer.util.updateVolumeFromArray(outputVolume, arr_Output)
+            self.putResultCache(key_ResultCache, arr_Output)   # arr_Output was copied into outputVolume, cache owns it
+
+        # 02. Geometry (origin, spacing, directions) of inputVolume
+        outputVolume.CopyOrientation(inputVolume)
+        if index:
+            index.dict_OutputState[outputVolume.GetID()] = (imageThreshold, invert, outputVolume.GetImageData().GetMTime())
+
+        # 03. Show output volume in slice viewers, as the CLI does with update_display
+        if showResult:
+            slicer.util.setSliceViewerLayers(background=outputVolume)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def processAsync(self, inputVolume, outputVolume, imageThreshold, invert=False, showResult=True,
+                     outputMode=STR_OutputMode_KeepValues, invertedOutputVolume=None, fn_Progress=None, fn_Finished=None):
+        """    SL_Developer. process() on a background thread (NumPy engine): returns at once, and the Qt event loop
+                  keeps running (slice views pan and zoom) while the threshold runs.
+                  The worker only reads the voxels of inputVolume and writes its own arrays; the output nodes are
+                  updated on the main thread, by a QTimer polling the task, once it completes.
+                  Do not modify inputVolume while the task runs. A task already running is cancelled first.
+                  :param invertedOutputVolume: optional, receives the threshold with 'not invert', as processWithInvertedOutput
+                  :param fn_Progress: fn_Progress(float_Progress in [0, 1]), called on the main thread
+                  :param fn_Finished: fn_Finished(bool_Completed, str_Error), called on the main thread
+                  :return: the BackgroundThresholdTask    """
+        if not inputVolume or not outputVolume:
+            raise ValueError("Input or output volume is invalid")
+        if outputMode not in (STR_OutputMode_KeepValues, STR_OutputMode_BinaryMask):
+            raise ValueError(f'SL_Alert! Invalid output mode for a background threshold = {outputMode}')
+        self.cancelAsync()
+
+        task = BackgroundThresholdTask(slicer.util.arrayFromVolume(inputVolume), imageThreshold, invert,
+                                       outputMode == STR_OutputMode_BinaryMask, invertedOutputVolume is not None)
+        self.asyncTask = task
+        self._dict_AsyncRun = {'Input': inputVolume, 'Output': outputVolume, 'OutputInverted': invertedOutputVolume,
+                               'ShowResult': showResult, 'Progress': fn_Progress, 'Finished': fn_Finished}
+        if self.timer_AsyncPoll is None:
+            self.timer_AsyncPoll = qt.QTimer()
+            self.timer_AsyncPoll.setInterval(INT_AsyncPoll_ms)
+            self.timer_AsyncPoll.connect('timeout()', self.onAsyncPollTimer_Timeout)
+        logging.info('Background processing started')
+        task.start()
+        self.timer_AsyncPoll.start()
+        return task
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def isAsyncRunning(self):
+        """    True while a processAsync() task has not been finished on the main thread.    """
+        return self.asyncTask is not None
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def cancelAsync(self):
+        """    SL_Developer. Cancel the running processAsync() task: the output nodes are left untouched,
+                  fn_Finished(False, 'Cancelled') is called before returning. Waits at most one slab.    """
+        if self.asyncTask is None:
+            return
+        self.asyncTask.cancel()
+        self.asyncTask.wait()
+        self.finishAsync(bool_Completed=False, str_Error='Cancelled')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def onAsyncPollTimer_Timeout(self):
+        """    Main thread: report progress of the running task, and hand its result over once it is done.    """
+        task = self.asyncTask
+        if task is None:
+            self.timer_AsyncPoll.stop()
+            return
+        fn_Progress = self._dict_AsyncRun['Progress']
+        if fn_Progress:
+            fn_Progress(task.float_Progress)
+        if not task.isDone():
+            return
+        if task.exception is not None:
+            self.finishAsync(bool_Completed=False, str_Error=str(task.exception))
+        elif task.arr_Output is None:
+            self.finishAsync(bool_Completed=False, str_Error='Cancelled')
+        else:
+            self.finishAsync(bool_Completed=True)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def finishAsync(self, bool_Completed, str_Error=None):
+        """    Main thread: publish the result of the task into the output nodes if completed, then call fn_Finished.    """
+        task, dict_Run = self.asyncTask, self._dict_AsyncRun
+        self.asyncTask, self._dict_AsyncRun = None, None
+        self.timer_AsyncPoll.stop()
+        if bool_Completed:
+            inputVolume = dict_Run['Input']
+            for outputVolume, arr_Output in ((dict_Run['Output'], task.arr_Output),
+                                             (dict_Run['OutputInverted'], task.arr_OutputInverted)):
+                if outputVolume is None:
+                    continue
+                self.updateOutputFromArray(outputVolume, arr_Output)
+                outputVolume.CopyOrientation(inputVolume)
+            if dict_Run['ShowResult']:
+                slicer.util.setSliceViewerLayers(background=dict_Run['Output'])
+            logging.info('Background processing completed')
+        else:
+            logging.info(f'Background processing stopped: {str_Error}')
+        if dict_Run['Finished']:
+            dict_Run['Finished'](bool_Completed, str_Error)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def processBinaryMask(self, inputVolume, outputVolume, imageThreshold, invert=False, showResult=True):
+        """    SL_Developer. uint8 mask of the voxels kept by the threshold (1 byte per voxel instead of the input
+                  scalar type, e.g. 4x smaller for float). Same dimensions and geometry as inputVolume.    """
+        # 00. Same input voxels, threshold and invert as a cached mask: copy it, no threshold pass
+        key_ResultCache = self.obtainResultCacheKey(inputVolume, imageThreshold, invert, STR_OutputMode_BinaryMask)
+        arr_Mask = self.resultCache.get(key_ResultCache)
+        arr_Input = slicer.util.arrayFromVolume(inputVolume)
+
+        # 01. Write in place if outputVolume already is a uint8 volume of the input dimensions, else allocate
+        if self.isOutputMatchingInput(inputVolume, outputVolume, vtk.VTK_UNSIGNED_CHAR):
+            arr_Output = slicer.util.arrayFromVolume(outputVolume)
+            if arr_Mask is not None:
+                arr_Output[:] = arr_Mask
+            else:
+                runOverSlabs(lambda slab: thresholdMaskArray(arr_Input[slab], imageThreshold, invert, arr_Output[slab]),
+                             arr_Input.shape[0], obtainSlabDepth(arr_Input), self.int_NumberOfThreads)
+                if self.resultCache.isStorable(arr_Output.nbytes):
+                    self.putResultCache(key_ResultCache, arr_Output.copy())
+            slicer.util.arrayFromVolumeModified(outputVolume)
+        else:
+            if arr_Mask is None:
+                arr_Mask = thresholdMaskArray(arr_Input, imageThreshold, invert)
+                self.putResultCache(key_ResultCache, arr_Mask)
+            slicer.util.updateVolumeFromArray(outputVolume, arr_Mask)
+
+        # 02. Geometry (origin, spacing, directions) of inputVolume
+        outputVolume.CopyOrientation(inputVolume)
+        if showResult:
+            slicer.util.setSliceViewerLayers(background=outputVolume)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def processBitPackedMask(self, inputVolume, str_MaskSidecarPath, imageThreshold, invert=False):
+        """    SL_Developer. Bit-packed mask (1 bit per voxel) of the voxels kept by the threshold, written with the
+                  voxel array shape and the IJKToRAS of inputVolume to the sidecar file str_MaskSidecarPath.
+                  No output node: for volumes whose full-size output would not fit in memory.    """
+        arr_Input = slicer.util.arrayFromVolume(inputVolume)
+        arr_Packed = thresholdMaskArrayBitPacked(arr_Input, imageThreshold, invert, self.int_NumberOfThreads)
+        mat_IJKToRAS = vtk.vtkMatrix4x4()
+        inputVolume.GetIJKToRASMatrix(mat_IJKToRAS)
+        saveBitPackedMask(str_MaskSidecarPath, arr_Packed, arr_Input.shape, slicer.util.arrayFromVTKMatrix(mat_IJKToRAS))
+        logging.info(f'Bit-packed mask: {arr_Packed.nbytes} bytes for {arr_Input.nbytes} input bytes '
+                     f'-> {str_MaskSidecarPath}')
+        return arr_Packed
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def processMultiLevel(self, inputVolume, outputLabelVolume, list_CutPoints, showResult=True):
+        """
+        SL_Developer. Several thresholds in one pass: label map of the intensity bands between sorted cut points
+        (e.g. air / soft tissue / bone), instead of chaining process() once per threshold.
+        :param inputVolume: volume to be classified
+        :param outputLabelVolume: label map result (vtkMRMLLabelMapVolumeNode, or a scalar volume), geometry of inputVolume
+        :param list_CutPoints: strictly increasing thresholds; label i holds list_CutPoints[i-1] <= voxel < list_CutPoints[i]
+        :param showResult: show the label map over inputVolume in slice viewers
+        :return: one dict per label:  'Label', 'Lower', 'Upper' (None if unbounded), 'VoxelCount', 'Volume_mm3'
         """
+        if not inputVolume or not outputLabelVolume:
+            raise ValueError("Input or output volume is invalid")
+
+        import time
+        startTime = time.time()
+        arr_Labels, arr_Counts = thresholdMultiLevelArray(slicer.util.arrayFromVolume(inputVolume), list_CutPoints,
+                                                          None, self.int_NumberOfThreads)
+        slicer.util.updateVolumeFromArray(outputLabelVolume, arr_Labels)
+        outputLabelVolume.CopyOrientation(inputVolume)
+
+        float_VoxelVolume_mm3 = float(inputVolume.GetSpacing()[0] * inputVolume.GetSpacing()[1] * inputVolume.GetSpacing()[2])
+        list_Bounds = [None] + list(list_CutPoints) + [None]
+        list_LabelStats = [{'Label': idx_Label, 'Lower': list_Bounds[idx_Label], 'Upper': list_Bounds[idx_Label + 1],
+                            'VoxelCount': int(arr_Counts[idx_Label]),
+                            'Volume_mm3': int(arr_Counts[idx_Label]) * float_VoxelVolume_mm3}
+                           for idx_Label in range(len(arr_Counts))]
+
+        if showResult:
+            if outputLabelVolume.IsA("vtkMRMLLabelMapVolumeNode"):
+                slicer.util.setSliceViewerLayers(background=inputVolume, label=outputLabelVolume)
+            else:
+                slicer.util.setSliceViewerLayers(background=outputLabelVolume)
+        logging.info(f'Multi-level threshold, {len(arr_Counts)} labels, completed in {time.time()-startTime:.2f} seconds')
+        return list_LabelStats
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainMaskScratch(self, arr_Input):
+        """    Bool slab masks of thresholdArrayParallel() for arr_Input, one per thread, kept between calls so that a
+                  repeated Apply on the same input allocates nothing. A few MB whatever the volume size, instead of the
+                  1 byte per voxel of a whole-volume mask.    """
+        import numpy as np
+        tuple_Shape = obtainMaskSlabsShape(arr_Input, self.int_NumberOfThreads)
+        if self._arr_MaskScratch is None or self._arr_MaskScratch.shape != tuple_Shape:
+            self._arr_MaskScratch = None    # Release the previous buffer before allocating the new one
+            self._arr_MaskScratch = np.empty(tuple_Shape, dtype=bool)
+        return self._arr_MaskScratch
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def startAllocationMeasurement(self, outputVolume):
+        """    Baseline of obtainAllocationStats(): traced NumPy/Python memory and the output scalars buffer.    """
+        import tracemalloc
+        bool_WasTracing = tracemalloc.is_tracing()
+        if not bool_WasTracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        return {'WasTracing': bool_WasTracing,
+                'TracedBytes': tracemalloc.get_traced_memory()[0],
+                'Snapshot': tracemalloc.take_snapshot(),
+                'Scalars': self.obtainScalarsBufferAddress(outputVolume)}
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def stopAllocationMeasurement(self, outputVolume, dict_Before):
+        """    Allocations of one process() call:
+                  'TracedPeakBytes'       peak of NumPy/Python memory above the baseline (temporaries included)
+                  'TracedRetainedBytes'   NumPy/Python memory still held afterwards (e.g. result cache entries)
+                  'RetainedBlocks'        new blocks of at least 64 KB still held afterwards
+                  'VTKBuffersAllocated'   1 if the scalars buffer of outputVolume was (re)allocated, else 0
+                  'AllocatedBytes' / 'Allocations'   totals of the above    """
+        import tracemalloc
+        int_Traced, int_TracedPeak = tracemalloc.get_traced_memory()
+        list_StatDiffs = tracemalloc.take_snapshot().compare_to(dict_Before['Snapshot'], 'traceback')
+        int_RetainedBlocks = sum(max(stat.count_diff, 0) for stat in list_StatDiffs if stat.size_diff >= 64 * 1024)
+        if not dict_Before['WasTracing']:
+            tracemalloc.stop()
+
+        int_VTKBuffers = int(self.obtainScalarsBufferAddress(outputVolume) != dict_Before['Scalars'])
+        imageData = outputVolume.GetImageData()
+        int_VTKBytes = imageData.GetPointData().GetScalars().GetActualMemorySize() * 1024 if int_VTKBuffers and imageData else 0
+        int_TracedPeakBytes = max(int_TracedPeak - dict_Before['TracedBytes'], 0)
+        return {
+            'TracedPeakBytes': int_TracedPeakBytes,
+            'TracedRetainedBytes': max(int_Traced - dict_Before['TracedBytes'], 0),
+            'RetainedBlocks': int_RetainedBlocks,
+            'VTKBuffersAllocated': int_VTKBuffers,
+            'VTKBytesAllocated': int_VTKBytes,
+            'AllocatedBytes': int_TracedPeakBytes + int_VTKBytes,
+            'Allocations': int_RetainedBlocks + int_VTKBuffers,
+        }
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainScalarsBufferAddress(self, volumeNode):
+        """    Address of the voxel buffer of volumeNode, None without image data.    """
+        imageData = volumeNode.GetImageData()
+        if not imageData or not imageData.GetPointData().GetScalars():
+            return None
+        return imageData.GetPointData().GetScalars().GetVoidPointer(0)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainAllocationStats(self):
+        """    SL_Developer. Allocation statistics of the last process() call, measured if bool_MeasureAllocations.    """
+        return self.dict_LastAllocationStats
 
+    # ------------------------------------------------------------------------------------------------------------------
+    def processWithThresholdIndex(self, index, outputVolume, imageThreshold, invert=False):
+        """    Incremental update of outputVolume through the SortedVoxelIndex of its input.
+                  Only possible if outputVolume still holds the result of the previous threshold of this index
+                  (same invert, not modified since); otherwise returns False and the caller computes the whole volume.    """
+        tuple_State = index.dict_OutputState.get(outputVolume.GetID())
+        imageData_Output = outputVolume.GetImageData()
+        if tuple_State is None or imageData_Output is None:
+            return False
+        threshold_Old, invert_Old, int_OutputMTime = tuple_State
+        if invert_Old != invert or imageData_Output.GetMTime() != int_OutputMTime:
+            return False
+        arr_Output = slicer.util.arrayFromVolume(outputVolume)
+        if arr_Output.shape != index.tuple_Shape or arr_Output.dtype != index.dtype:
+            return False
+
+        int_Voxels = index.updateThresholdedArray(arr_Output, threshold_Old, imageThreshold, invert)
+        if int_Voxels:
+            slicer.util.arrayFromVolumeModified(outputVolume)
+        index.dict_OutputState[outputVolume.GetID()] = (imageThreshold, invert, imageData_Output.GetMTime())
+        logging.info(f'Threshold index: {int_Voxels} of {arr_Output.size} voxels updated')
+        return True
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def processVisibleSlices(self, inputVolume, outputVolume, imageThreshold, invert=False, list_SliceNodes=None,
+                             outputMode=STR_OutputMode_KeepValues):
+        """
+        Live preview: threshold only the voxels cut by the slice views, in place in outputVolume.
+        The rest of outputVolume keeps its previous values until the next process().
+        If outputVolume does not have the geometry and scalar type of the output mode yet (the input scalar type, or
+        uint8 for a binary mask), the whole volume is computed once with process().
+        :param list_SliceNodes: slice nodes of the views to update; None for all slice nodes of the scene
+        :param outputMode: STR_OutputMode_KeepValues (default) or STR_OutputMode_BinaryMask, as in process()
+        :return: number of voxels recomputed
+        """
         if not inputVolume or not outputVolume:
             raise ValueError("Input or output volume is invalid")
+        if outputMode not in (STR_OutputMode_KeepValues, STR_OutputMode_BinaryMask):
+            raise ValueError(f'SL_Alert! Invalid output mode for a live preview = {outputMode}')
+        bool_BinaryMask = (outputMode == STR_OutputMode_BinaryMask)
+        if not self.isOutputMatchingInput(inputVolume, outputVolume, vtk.VTK_UNSIGNED_CHAR if bool_BinaryMask else None):
+            self.process(inputVolume, outputVolume, imageThreshold, invert, showResult=True, outputMode=outputMode)
+            return inputVolume.GetImageData().GetNumberOfPoints()
+        if list_SliceNodes is None:
+            list_SliceNodes = slicer.util.getNodesByClass('vtkMRMLSliceNode')
+
+        arr_Input = slicer.util.arrayFromVolume(inputVolume)
+        arr_Output = slicer.util.arrayFromVolume(outputVolume)
+        fn_Threshold = thresholdMaskArray if bool_BinaryMask else thresholdArray
+        int_Voxels = 0
+        for region in self.obtainVisibleSliceRegions(inputVolume, list_SliceNodes):
+            fn_Threshold(arr_Input[region], imageThreshold, invert, arr_Output[region])
+            int_Voxels += arr_Input[region].size
+        if int_Voxels:
+            slicer.util.arrayFromVolumeModified(outputVolume)
+        return int_Voxels
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainVisibleSliceRegions(self, volumeNode, list_SliceNodes):
+        """    NumPy index tuples of the [K, J, I] voxel array cut by the field of view of each slice node:
+                  along the IJK axis closest to the slice normal, the range of slices between the view corners;
+                  one slice for a view aligned with the volume axes.    """
+        import numpy as np
+        mat_RASToIJK = vtk.vtkMatrix4x4()
+        volumeNode.GetRASToIJKMatrix(mat_RASToIJK)
+        arr_RASToIJK = slicer.util.arrayFromVTKMatrix(mat_RASToIJK)
+        tuple_DimensionsIJK = volumeNode.GetImageData().GetDimensions()
+
+        list_Regions = []
+        for sliceNode in list_SliceNodes:
+            arr_XYToIJK = arr_RASToIJK @ slicer.util.arrayFromVTKMatrix(sliceNode.GetXYToRAS())
+            int_Width, int_Height, _ = sliceNode.GetDimensions()
+            arr_CornersXY = np.array([[0, 0, 0, 1], [int_Width, 0, 0, 1], [0, int_Height, 0, 1],
+                                      [int_Width, int_Height, 0, 1]], dtype=float).T
+            arr_CornersIJK = (arr_XYToIJK @ arr_CornersXY)[:3]
+            int_Axis = int(np.argmax(np.abs(arr_XYToIJK[:3, 2])))   # IJK axis closest to the slice normal
+            idx_Min = max(int(np.floor(arr_CornersIJK[int_Axis].min() + 0.5)), 0)
+            idx_Max = min(int(np.floor(arr_CornersIJK[int_Axis].max() + 0.5)), tuple_DimensionsIJK[int_Axis] - 1)
+            if idx_Min > idx_Max:
+                continue    # The slice view does not cut the volume
+            list_Region = [slice(None)] * 3
+            list_Region[2 - int_Axis] = slice(idx_Min, idx_Max + 1)     # I, J, K are the NumPy axes 2, 1, 0
+            list_Regions.append(tuple(list_Region))
+        return list_Regions
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def updateOutputFromArray(self, outputVolume, arr):
+        """    Voxels of outputVolume set to arr: copied into its existing buffer if it has the shape and scalar type
+                  of arr already (no new VTK buffer), else through updateVolumeFromArray.    """
+        imageData = outputVolume.GetImageData()
+        if imageData and imageData.GetPointData().GetScalars():
+            arr_Existing = slicer.util.arrayFromVolume(outputVolume)
+            if arr_Existing.shape == arr.shape and arr_Existing.dtype == arr.dtype:
+                arr_Existing[:] = arr
+                slicer.util.arrayFromVolumeModified(outputVolume)
+                return
+        slicer.util.updateVolumeFromArray(outputVolume, arr)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def isOutputMatchingInput(self, inputVolume, outputVolume, int_ScalarType=None):
+        """    True if outputVolume already has image data with the dimensions and scalar type of inputVolume
+                  (or int_ScalarType, a VTK scalar type, if given).    """
+        imageData_Input, imageData_Output = inputVolume.GetImageData(), outputVolume.GetImageData()
+        if not imageData_Input or not imageData_Output:
+            return False
+        if int_ScalarType is None:
+            int_ScalarType = imageData_Input.GetScalarType()
+        return (imageData_Input.GetDimensions() == imageData_Output.GetDimensions()
+                and int_ScalarType == imageData_Output.GetScalarType()
+                and imageData_Input.GetNumberOfScalarComponents() == imageData_Output.GetNumberOfScalarComponents())
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def processWithInvertedOutput(self, inputVolume, outputVolume, invertedOutputVolume, imageThreshold, invert=False,
+                                  showResult=True, engine=STR_ThresholdEngine_NumPy, outputMode=STR_OutputMode_KeepValues):
+        """
+        Compute the thresholded volume and the inverted-threshold volume from one read of the input.
+        Can be used without GUI widget.
+        :param inputVolume: volume to be thresholded
+        :param outputVolume: thresholding result with the 'invert' setting
+        :param invertedOutputVolume: thresholding result with the opposite of the 'invert' setting
+        :param imageThreshold: values above/below this threshold will be set to 0
+        :param invert: if True then values above the threshold will be set to 0 in outputVolume (below in invertedOutputVolume)
+        :param showResult: show output volume in slice viewers
+        :param engine: STR_ThresholdEngine_NumPy (one sweep, default) or STR_ThresholdEngine_CLI (two CLI runs)
+        :param outputMode: STR_OutputMode_KeepValues (default) or STR_OutputMode_BinaryMask (both outputs uint8 masks),
+                           as in process()
+        """
+        if not inputVolume or not outputVolume or not invertedOutputVolume:
+            raise ValueError("Input, output or inverted output volume is invalid")
+        if outputMode not in (STR_OutputMode_KeepValues, STR_OutputMode_BinaryMask):
+            raise ValueError(f'SL_Alert! Invalid output mode for an inverted output = {outputMode}')
+        if engine == STR_ThresholdEngine_CLI and outputMode != STR_OutputMode_KeepValues:
+            raise ValueError(f'SL_Alert! Output mode {outputMode} needs the {STR_ThresholdEngine_NumPy} engine')
+        if engine == STR_ThresholdEngine_CLI:
+            self.process(inputVolume, outputVolume, imageThreshold, invert, showResult, engine)
+            self.process(inputVolume, invertedOutputVolume, imageThreshold, not invert, False, engine)
+            return
+        if engine != STR_ThresholdEngine_NumPy:
+            raise ValueError(f'SL_Alert! Invalid threshold engine = {engine}')
 
         import time
         startTime = time.time()
-        logging.info('Processing started')
+        logging.info('Processing started, normal + inverted output in one sweep')
+
+        # 01. One slab-wise sweep over the input writes both outputs; in place into the voxel buffer of an output that
+        #       already has the dimensions and scalar type (of the input, or uint8 for a mask), as processWithNumPy()
+        arr_Input = slicer.util.arrayFromVolume(inputVolume)
+        bool_BinaryMask = (outputMode == STR_OutputMode_BinaryMask)
+        tuple_InPlace = tuple(self.isOutputMatchingInput(inputVolume, node_Output,
+                                                         vtk.VTK_UNSIGNED_CHAR if bool_BinaryMask else None)
+                              for node_Output in (outputVolume, invertedOutputVolume))
+        arr_Output, arr_OutputInverted = thresholdArrayWithInverted(
+            arr_Input, imageThreshold, invert,
+            slicer.util.arrayFromVolume(outputVolume) if tuple_InPlace[0] else None,
+            slicer.util.arrayFromVolume(invertedOutputVolume) if tuple_InPlace[1] else None,
+            self.int_NumberOfThreads, bool_BinaryMask)
+
+        # 02. Write voxels (unless written in place) and geometry of inputVolume into both outputs
+        for node_Output, arr, bool_InPlace in zip((outputVolume, invertedOutputVolume), (arr_Output, arr_OutputInverted),
+                                                  tuple_InPlace):
+            if bool_InPlace:
+                slicer.util.arrayFromVolumeModified(node_Output)
+            else:
+                slicer.util.updateVolumeFromArray(node_Output, arr)
+            node_Output.CopyOrientation(inputVolume)
+        if showResult:
+            slicer.util.setSliceViewerLayers(background=outputVolume)
 
+        stopTime = time.time()
+        logging.info(f'Processing completed in {stopTime-startTime:.2f} seconds')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def processFileStreaming(self, str_InputPath, str_OutputPath, imageThreshold, invert=False,
+                             int_SlabBytes=INT_StreamingSlabBytes_Default):
+        """
+        Streaming threshold from file to file, for volumes that approach or exceed the RAM.
+        Can be used without GUI widget, and without MRML scene.
+        The input is read, and the output written, slab by slab along the slowest axis through memory-mapped windows
+        of about int_SlabBytes, so that peak memory stays bounded whatever the size of the volume.
+        :param str_InputPath: raw-encoded NRRD file (attached or detached header), e.g. saved with compression off
+        :param str_OutputPath: NRRD file (attached header) with the input geometry and scalar type
+        :param imageThreshold: values above/below this threshold will be set to 0
+        :param invert: if True then values above the threshold will be set to 0, otherwise values below are set to 0
+        :param int_SlabBytes: bytes of input voxels per memory-mapped slab
+        :return: dict of statistics, see t_ApplyThresholdLib.thresholdRawFileStreaming
+        """
+        logging.info(f'Streaming processing started: {str_InputPath}')
+        dict_Stats = thresholdNrrdFileStreaming(str_InputPath, str_OutputPath, imageThreshold, invert, int_SlabBytes)
+        logging.info(f'Streaming processing completed in {dict_Stats["Seconds"]:.2f} seconds, '
+                     f'{dict_Stats["Slabs"]} slabs, mapped windows of {dict_Stats["MappedWindowBytes"] / 2**20:.1f} MB')
+        return dict_Stats
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def processBatch(self, list_Inputs, str_OutputDir, imageThreshold, invert=False, int_NumberOfProcesses=None,
+                     str_OutputSuffix='_Threshold'):
+        """
+        Threshold many volumes with the same settings on a process pool; each worker writes its result to disk.
+        Can be used without GUI widget. A failing volume is reported and does not stop the batch.
+        Scene volumes are written to temporary raw NRRD files that the workers map, instead of being pickled to them;
+        at most INT_BatchInFlightPerProcess volumes per process are submitted (and written) at a time.
+        :param list_Inputs: NRRD file paths (raw or gzip) and/or scalar volume nodes of the scene
+        :param str_OutputDir: folder of the outputs, named <input file or node name><str_OutputSuffix>.nrrd
+        :param imageThreshold: values above/below this threshold will be set to 0
+        :param invert: if True then values above the threshold will be set to 0, otherwise values below are set to 0
+        :param int_NumberOfProcesses: worker processes; None for one per CPU core
+        :param str_OutputSuffix: appended to the input name for the output file name
+        :return: list (in the order of list_Inputs) of dict   {'Input', 'Output', 'Seconds', 'Error'}
+        """
+        import shutil
+        import tempfile
+        import time
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+        os.makedirs(str_OutputDir, exist_ok=True)
+        startTime = time.time()
+        logging.info(f'Batch processing started: {len(list_Inputs)} volumes')
+        int_NumberOfProcesses = int_NumberOfProcesses or os.cpu_count() or 1
+        str_TempDir = tempfile.mkdtemp(prefix='t_ApplyThreshold_Batch_', dir=slicer.app.temporaryPath)
+
+        list_Results = [None] * len(list_Inputs)
+        dict_Future_to_Task = {}
+
+        def collect(future):
+            # A crashed worker (e.g. out of memory) is reported as the error of its volume
+            idx, str_Input, str_OutputPath, str_TempPath = dict_Future_to_Task.pop(future)
+            try:
+                list_Results[idx] = future.result()
+            except Exception as e:
+                list_Results[idx] = {'Input': str_Input, 'Output': str_OutputPath, 'Seconds': None, 'Error': repr(e)}
+            if str_TempPath:
+                os.remove(str_TempPath)
+            if list_Results[idx]['Error']:
+                logging.error(f'Batch volume failed: {str_Input}\n{list_Results[idx]["Error"]}')
+            else:
+                logging.info(f'Batch volume done in {list_Results[idx]["Seconds"]:.2f} seconds: {str_Input}')
+
+        try:
+            with ProcessPoolExecutor(max_workers=int_NumberOfProcesses,
+                                     mp_context=self.obtainBatchProcessContext()) as executor:
+                for idx, inputItem in enumerate(list_Inputs):
+                    # 01. Bounded in flight: wait for a volume to finish before submitting (and writing) the next one
+                    while len(dict_Future_to_Task) >= INT_BatchInFlightPerProcess * int_NumberOfProcesses:
+                        for future in wait(dict_Future_to_Task, return_when=FIRST_COMPLETED).done:
+                            collect(future)
+                    # 02. Input file of the worker: the file itself, or a temporary raw NRRD of the scene volume node
+                    str_TempPath = None
+                    if isinstance(inputItem, str):
+                        str_Input = str_InputPath = inputItem
+                        str_Name = os.path.splitext(os.path.basename(inputItem))[0]
+                    else:
+                        str_Input = inputItem.GetID()
+                        str_Name = slicer.app.ioManager().forceFileNameValidCharacters(inputItem.GetName())
+                        mat_IJKToRAS = vtk.vtkMatrix4x4()
+                        inputItem.GetIJKToRASMatrix(mat_IJKToRAS)
+                        str_TempPath = str_InputPath = os.path.join(str_TempDir, f'{idx}.nrrd')
+                        writeArrayToNrrdFile(str_TempPath, slicer.util.arrayFromVolume(inputItem),
+                                             slicer.util.arrayFromVTKMatrix(mat_IJKToRAS))
+                    str_OutputPath = os.path.join(str_OutputDir, str_Name + str_OutputSuffix + '.nrrd')
+                    # 03. Submit; runBatchTask() catches the errors of the volume inside the worker
+                    future = executor.submit(runBatchTask, thresholdNrrdFile, str_Input, str_OutputPath,
+                                             str_InputPath, str_OutputPath, imageThreshold, invert)
+                    dict_Future_to_Task[future] = (idx, str_Input, str_OutputPath, str_TempPath)
+
+                # 04. Collect the volumes still in flight
+                for future in list(dict_Future_to_Task):
+                    collect(future)
+        finally:
+            shutil.rmtree(str_TempDir, ignore_errors=True)
+
+        int_Failed = sum(1 for dict_Result in list_Results if dict_Result['Error'])
+        logging.info(f'Batch processing completed in {time.time()-startTime:.2f} seconds, {int_Failed} failed')
+        return list_Results
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainBatchProcessContext(self):
+        """    SL_Developer. 'spawn' context whose workers run PythonSlicer (not the Slicer application),
+                  and import the worker functions from t_ApplyThresholdLib, which has no Slicer import.    """
+        import multiprocessing
+        import shutil
+        context = multiprocessing.get_context('spawn')
+        str_PythonSlicer = shutil.which('PythonSlicer', path=os.path.join(slicer.app.slicerHome, 'bin'))
+        if str_PythonSlicer:
+            context.set_executable(str_PythonSlicer)
+        return context
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def processWithCLI(self, inputVolume, outputVolume, imageThreshold, invert=False, showResult=True):
+        """    SL_Developer. Fallback threshold through the "Threshold Scalar Volume" CLI module.    """
         # Compute the thresholded output volume using the "Threshold Scalar Volume" CLI module
         cliParams = {
             'InputVolume': inputVolume.GetID(),
@@ -293,8 +1310,6 @@ class t_ApplyThresholdLogic(ScriptedLoadableModuleLogic):
         # We don't need the CLI module node anymore, remove it to not clutter the scene with it
         slicer.mrmlScene.RemoveNode(cliNode)
 
-        stopTime = time.time()
-        logging.info(f'Processing completed in {stopTime-startTime:.2f} seconds')
 
 ''' ================================================================================================================='''
 ''' ================================================================================================================='''
@@ -316,6 +1331,33 @@ class t_ApplyThresholdTest(ScriptedLoadableModuleTest):
         """
         self.setUp()
         self.test_t_ApplyThreshold1()
+        self.test_t_ApplyThreshold_NumPyEngine()
+        self.test_t_ApplyThreshold_InvertedOutputBenchmark()
+        self.test_t_ApplyThreshold_InvertedOutputModes()
+        self.test_t_ApplyThreshold_Streaming()
+        self.test_t_ApplyThreshold_ParallelScalingBenchmark()
+        self.test_t_ApplyThreshold_Batch()
+        self.test_t_ApplyThreshold_LivePreview()
+        self.test_t_ApplyThreshold_SortedVoxelIndex()
+        self.test_t_ApplyThreshold_ResultCache()
+        self.test_t_ApplyThreshold_ZeroCopyOutput()
+        self.test_t_ApplyThreshold_CompactOutput()
+        self.test_t_ApplyThreshold_AsyncProcess()
+        self.test_t_ApplyThreshold_MultiLevel()
+        self.test_t_ApplyThreshold_AutoThreshold()
+        self.test_t_ApplyThreshold_Headless()
+        self.test_t_ApplyThreshold_SampleDataCache()
+        self.test_t_ApplyThreshold_CoalescedGUIUpdate()
+        self.test_t_ApplyThreshold_TypedParameters()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def createSyntheticVolume(self, tuple_Shape=(64, 128, 128), arr_Synthetic=None):
+        """ Input volume of the tests: int16 voxels drawn uniformly in [-1000, 2000) with seed 0, of tuple_Shape [K, J, I];
+              or the voxels of arr_Synthetic if given.     :return: (arr_Synthetic, inputVolume)    """
+        import numpy as np
+        if arr_Synthetic is None:
+            arr_Synthetic = np.random.default_rng(0).integers(-1000, 2000, size=tuple_Shape, dtype=np.int16)
+        return arr_Synthetic, slicer.util.addVolumeFromArray(arr_Synthetic, name='t_ApplyThreshold_Synthetic')
 
     # ------------------------------------------------------------------------------------------------------------------
     def test_t_ApplyThreshold1(self):
@@ -334,9 +1376,7 @@ class t_ApplyThresholdTest(ScriptedLoadableModuleTest):
 
         # Get/create input data
 
-        import SampleData
-        registerSampleData()
-        inputVolume = SampleData.downloadSample('t_ApplyThreshold1')
+        inputVolume = t_ApplyThresholdLogic().loadSampleVolume('t_ApplyThreshold1')
         self.delayDisplay('Loaded test data set')
 
         inputScalarRange = inputVolume.GetImageData().GetScalarRange()
@@ -364,6 +1404,797 @@ class t_ApplyThresholdTest(ScriptedLoadableModuleTest):
 
         self.delayDisplay('Test passed')
 
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_NumPyEngine(self):
+        """ The in-process NumPy engine must give the same voxels and geometry as the CLI fallback. """
+        self.delayDisplay("Starting the test: NumPy engine vs CLI")
+
+        import numpy as np
+        inputVolume = t_ApplyThresholdLogic().loadSampleVolume('t_ApplyThreshold1')
+
+        outputVolume_NumPy = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        outputVolume_CLI = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        logic = t_ApplyThresholdLogic()
+
+        for threshold in (100, 100.5, -3):
+            for invert in (False, True):
+                logic.process(inputVolume, outputVolume_NumPy, threshold, invert, showResult=False,
+                              engine=STR_ThresholdEngine_NumPy)
+                logic.process(inputVolume, outputVolume_CLI, threshold, invert, showResult=False,
+                              engine=STR_ThresholdEngine_CLI)
+                arr_NumPy = slicer.util.arrayFromVolume(outputVolume_NumPy)
+                arr_CLI = slicer.util.arrayFromVolume(outputVolume_CLI)
+                self.assertEqual(arr_NumPy.dtype, arr_CLI.dtype)
+                self.assertTrue(np.array_equal(arr_NumPy, arr_CLI))
+                self.assertEqual(outputVolume_NumPy.GetSpacing(), inputVolume.GetSpacing())
+                self.assertEqual(outputVolume_NumPy.GetOrigin(), inputVolume.GetOrigin())
+
+        with self.assertRaises(ValueError):
+            logic.process(inputVolume, outputVolume_NumPy, 100, engine='Unknown')
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_InvertedOutputBenchmark(self):
+        """ Normal + inverted output: one sweep (processWithInvertedOutput) vs the former two process() calls.
+              Both paths must give identical voxels, and the NumPy sweep must beat the NumPy two calls by a margin
+              (best of INT_Repeat runs each, so that one slow run does not decide).    """
+        self.delayDisplay("Starting the benchmark: normal + inverted output")
+
+        import time
+        import numpy as np
+        arr_Synthetic, inputVolume = self.createSyntheticVolume((256, 256, 256))
+        outputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        invertedOutputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        logic = t_ApplyThresholdLogic()
+        logic.setResultCacheBudgetBytes(0)     # Timed paths compute, none is served (or slowed down) by the cache
+        threshold = 100
+        INT_Repeat = 3
+        FLOAT_Margin = 0.9     # One sweep reads the input once instead of twice: at least 10 % faster
+
+        # 01. Former path of onApplyButton: two process() calls, each reads the whole input
+        dict_Seconds = {}
+        for engine in (STR_ThresholdEngine_CLI, STR_ThresholdEngine_NumPy):
+            list_Seconds = []
+            for idx_Repeat in range(INT_Repeat):
+                startTime = time.perf_counter()
+                logic.process(inputVolume, outputVolume, threshold, False, showResult=False, engine=engine)
+                logic.process(inputVolume, invertedOutputVolume, threshold, True, showResult=False, engine=engine)
+                list_Seconds.append(time.perf_counter() - startTime)
+            dict_Seconds[f'TwoCalls_{engine}'] = min(list_Seconds)
+        arr_Expected = slicer.util.arrayFromVolume(outputVolume).copy()
+        arr_ExpectedInverted = slicer.util.arrayFromVolume(invertedOutputVolume).copy()
+
+        # 02. One sweep writes both outputs
+        list_Seconds = []
+        for idx_Repeat in range(INT_Repeat):
+            startTime = time.perf_counter()
+            logic.processWithInvertedOutput(inputVolume, outputVolume, invertedOutputVolume, threshold, False, showResult=False)
+            list_Seconds.append(time.perf_counter() - startTime)
+        dict_Seconds['OneSweep_NumPy'] = min(list_Seconds)
+
+        self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(outputVolume), arr_Expected))
+        self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(invertedOutputVolume), arr_ExpectedInverted))
+        for str_Path, sec in dict_Seconds.items():
+            logging.info(f'{str_Path}: {sec:.3f} s,\t{sec / dict_Seconds["OneSweep_NumPy"]:.2f} x OneSweep_NumPy')
+        self.assertLess(dict_Seconds['OneSweep_NumPy'], FLOAT_Margin * dict_Seconds[f'TwoCalls_{STR_ThresholdEngine_NumPy}'],
+                        f'One sweep is not faster than two calls: {dict_Seconds}')
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_InvertedOutputModes(self):
+        """ Apply with an inverted output selected: both outputs follow the output mode, on the synchronous and on the
+              background path alike.    """
+        self.delayDisplay("Starting the test: inverted output and output modes")
+
+        import time
+        import numpy as np
+        arr_Synthetic, inputVolume = self.createSyntheticVolume((32, 64, 64))
+        outputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        invertedOutputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+
+        widget = slicer.util.getModuleWidget('t_ApplyThreshold')
+        widget.enter()
+        try:
+            widget.ui.inputSelector.setCurrentNode(inputVolume)
+            widget.ui.outputSelector.setCurrentNode(outputVolume)
+            widget.ui.invertedOutputSelector.setCurrentNode(invertedOutputVolume)
+            widget.ui.livePreviewCheckBox.checked = False
+            widget.ui.invertOutputCheckBox.checked = False
+            widget.ui.imageThresholdSliderWidget.value = 100
+            for bool_Background in (False, True):
+                widget.ui.runInBackgroundCheckBox.checked = bool_Background
+                for outputMode in (STR_OutputMode_KeepValues, STR_OutputMode_BinaryMask):
+                    widget.ui.binaryMaskCheckBox.checked = (outputMode == STR_OutputMode_BinaryMask)
+                    widget.onApplyButton()
+                    while widget.logic.isAsyncRunning():
+                        slicer.app.processEvents()
+                        time.sleep(0.001)
+                    fn_Expected = thresholdMaskArray if outputMode == STR_OutputMode_BinaryMask else thresholdArray
+                    arr_Output = slicer.util.arrayFromVolume(outputVolume)
+                    arr_OutputInverted = slicer.util.arrayFromVolume(invertedOutputVolume)
+                    self.assertEqual(arr_Output.dtype, fn_Expected(arr_Synthetic[:1], 100).dtype)
+                    self.assertTrue(np.array_equal(arr_Output, fn_Expected(arr_Synthetic, 100, False)))
+                    self.assertTrue(np.array_equal(arr_OutputInverted, fn_Expected(arr_Synthetic, 100, True)))
+        finally:
+            widget.ui.runInBackgroundCheckBox.checked = False
+            widget.ui.binaryMaskCheckBox.checked = False
+            widget.ui.invertedOutputSelector.setCurrentNode(None)
+            widget.exit()
+
+        # No sidecar path for two bit-packed outputs
+        with self.assertRaises(ValueError):
+            t_ApplyThresholdLogic().processWithInvertedOutput(inputVolume, outputVolume, invertedOutputVolume, 100,
+                                                              outputMode=STR_OutputMode_BitPackedMask)
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_Streaming(self):
+        """ Streaming file-to-file threshold: same voxels as in memory, peak memory independent of the volume size. """
+        self.delayDisplay("Starting the test: streaming threshold")
+
+        import shutil
+        import tempfile
+        import tracemalloc
+        import numpy as np
+        logic = t_ApplyThresholdLogic()
+        str_TempDir = tempfile.mkdtemp()
+        list_PeakBytes = []
+        try:
+            for int_Slices in (32, 128):
+                arr_Synthetic, inputVolume = self.createSyntheticVolume((int_Slices, 128, 128))
+                str_InputPath = os.path.join(str_TempDir, f'Input_{int_Slices}.nrrd')
+                str_OutputPath = os.path.join(str_TempDir, f'Output_{int_Slices}.nrrd')
+                self.assertTrue(slicer.util.saveNode(inputVolume, str_InputPath, {'useCompression': 0}))
+
+                # Peak of the NumPy/Python allocations of the sweep, traced here only (not in the production path)
+                bool_WasTracing = tracemalloc.is_tracing()
+                if not bool_WasTracing:
+                    tracemalloc.start()
+                tracemalloc.reset_peak()
+                int_TracedBefore = tracemalloc.get_traced_memory()[0]
+                try:
+                    dict_Stats = logic.processFileStreaming(str_InputPath, str_OutputPath, 100,
+                                                            int_SlabBytes=128 * 128 * 2 * 8)
+                    int_PeakTracedBytes = tracemalloc.get_traced_memory()[1] - int_TracedBefore
+                finally:
+                    if not bool_WasTracing:
+                        tracemalloc.stop()
+                self.assertEqual(dict_Stats['Slabs'], int_Slices // 8)
+                self.assertEqual(dict_Stats['MappedWindowBytes'], 2 * 128 * 128 * 2 * 8)
+                list_PeakBytes.append(int_PeakTracedBytes)
+                logging.info(f'Streaming {int_Slices} slices: traced peak {int_PeakTracedBytes} bytes, '
+                             f'{arr_Synthetic.nbytes} voxel bytes')
+
+                outputVolume = slicer.util.loadVolume(str_OutputPath)
+                self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(outputVolume), thresholdArray(arr_Synthetic, 100)))
+                self.assertEqual(outputVolume.GetSpacing(), inputVolume.GetSpacing())
+                slicer.mrmlScene.RemoveNode(outputVolume)   # Releases the output file before the folder is removed
+
+            # 4x the volume, about the same peak memory, well below the voxels of the larger volume
+            self.assertLess(list_PeakBytes[1], 1.5 * max(list_PeakBytes[0], 1))
+            self.assertLess(list_PeakBytes[1], 128 * 128 * 128 * 2 // 2)
+
+            # Detached header with line skip + byte skip: the voxels start after both
+            dict_Header, str_DataPath, int_DataOffset = readNrrdHeader(str_InputPath)
+            dtype, tuple_Shape = obtainNrrdArrayType(dict_Header)
+            str_RawPath = os.path.join(str_TempDir, 'Skipped.raw')
+            with open(str_DataPath, 'rb') as f_In, open(str_RawPath, 'wb') as f_Out:
+                f_In.seek(int_DataOffset)
+                f_Out.write(b'first line\nsecond line\n' + b'\0' * 3 + f_In.read())
+            str_SkippedPath = os.path.join(str_TempDir, 'Skipped.nhdr')
+            with open(str_SkippedPath, 'w') as f:
+                f.write(f'NRRD0004\ntype: {dict_Header["type"]}\ndimension: 3\nsizes: {dict_Header["sizes"]}\n'
+                        f'endian: little\nencoding: raw\nline skip: 2\nbyte skip: 3\ndata file: Skipped.raw\n\n')
+            self.assertTrue(np.array_equal(readNrrdArray(str_SkippedPath), arr_Synthetic))
+            str_OutputPath = os.path.join(str_TempDir, 'Output_Skipped.nrrd')
+            thresholdNrrdFileStreaming(str_SkippedPath, str_OutputPath, 100)
+            self.assertTrue(np.array_equal(readNrrdArray(str_OutputPath), thresholdArray(arr_Synthetic, 100)))
+        finally:
+            shutil.rmtree(str_TempDir, ignore_errors=True)
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_ParallelScalingBenchmark(self):
+        """ Thread pool over slabs: byte-identical to the serial path; wall time reported for 1, 2, 4 and N threads. """
+        self.delayDisplay("Starting the benchmark: parallel threshold scaling")
+
+        import time
+        arr_Synthetic, inputVolume = self.createSyntheticVolume((256, 256, 256))
+        outputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        logic = t_ApplyThresholdLogic()
+        logic.setResultCacheBudgetBytes(0)     # Every call computes: no cache hit after the first thread count
+        bytes_Serial = thresholdArray(arr_Synthetic, 100).tobytes()
+
+        dict_Seconds = {}
+        for int_NumberOfThreads in sorted({1, 2, 4, os.cpu_count() or 1}):
+            logic.setNumberOfThreads(int_NumberOfThreads)
+            startTime = time.perf_counter()
+            logic.process(inputVolume, outputVolume, 100, showResult=False)
+            dict_Seconds[int_NumberOfThreads] = time.perf_counter() - startTime
+            self.assertEqual(slicer.util.arrayFromVolume(outputVolume).tobytes(), bytes_Serial)
+
+        for int_NumberOfThreads, sec in dict_Seconds.items():
+            logging.info(f'Threads = {int_NumberOfThreads}: {sec:.3f} s,\tspeed-up = {dict_Seconds[1] / sec:.2f}')
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_Batch(self):
+        """ Batch over files and scene nodes on a process pool: outputs on disk, a failing input does not stop it.
+              One process: at most INT_BatchInFlightPerProcess volumes in flight, the others wait for a free slot. """
+        self.delayDisplay("Starting the test: batch threshold")
+
+        import shutil
+        import tempfile
+        import numpy as np
+        logic = t_ApplyThresholdLogic()
+        str_TempDir = tempfile.mkdtemp()
+        try:
+            arr_Synthetic, inputVolume = self.createSyntheticVolume((16, 64, 64))
+            inputVolume.SetSpacing(0.5, 0.5, 2.0)
+            str_RawPath = os.path.join(str_TempDir, 'Raw.nrrd')
+            str_GzipPath = os.path.join(str_TempDir, 'Gzip.nrrd')
+            self.assertTrue(slicer.util.saveNode(inputVolume, str_RawPath, {'useCompression': 0}))
+            self.assertTrue(slicer.util.saveNode(inputVolume, str_GzipPath, {'useCompression': 1}))
+            str_MissingPath = os.path.join(str_TempDir, 'Missing.nrrd')
+
+            list_Results = logic.processBatch([str_RawPath, str_MissingPath, str_GzipPath, inputVolume],
+                                              os.path.join(str_TempDir, 'Output'), 100, int_NumberOfProcesses=1)
+            self.assertEqual([dict_Result['Input'] for dict_Result in list_Results],
+                             [str_RawPath, str_MissingPath, str_GzipPath, inputVolume.GetID()])
+            self.assertIsNotNone(list_Results[1]['Error'])
+            for dict_Result in (list_Results[0], list_Results[2], list_Results[3]):
+                self.assertIsNone(dict_Result['Error'])
+                outputVolume = slicer.util.loadVolume(dict_Result['Output'])
+                self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(outputVolume), thresholdArray(arr_Synthetic, 100)))
+                self.assertEqual(outputVolume.GetSpacing(), inputVolume.GetSpacing())
+                slicer.mrmlScene.RemoveNode(outputVolume)
+        finally:
+            shutil.rmtree(str_TempDir, ignore_errors=True)
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_LivePreview(self):
+        """ Live preview recomputes only the slices cut by the slice views; the full process() gives the rest. """
+        self.delayDisplay("Starting the test: live preview of the visible slices")
+
+        import time
+        import numpy as np
+        arr_Synthetic, inputVolume = self.createSyntheticVolume((64, 128, 128))
+        outputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        logic = t_ApplyThresholdLogic()
+        logic.process(inputVolume, outputVolume, 0, showResult=False)
+
+        # Red slice view: axial, on the K = 20 slice of the volume
+        sliceNode_Red = slicer.mrmlScene.GetNodeByID('vtkMRMLSliceNodeRed')
+        sliceNode_Red.SetOrientationToAxial()
+        sliceNode_Red.JumpSliceByCentering(*inputVolume.GetImageData().GetCenter()[:2], 20)
+
+        startTime = time.perf_counter()
+        int_Voxels = logic.processVisibleSlices(inputVolume, outputVolume, 100, list_SliceNodes=[sliceNode_Red])
+        logging.info(f'Live preview update: {(time.perf_counter() - startTime) * 1000:.1f} ms, {int_Voxels} voxels')
+        self.assertEqual(int_Voxels, 128 * 128)
+
+        arr_Output = slicer.util.arrayFromVolume(outputVolume)
+        self.assertTrue(np.array_equal(arr_Output[20], thresholdArray(arr_Synthetic[20], 100)))
+        self.assertTrue(np.array_equal(arr_Output[21], thresholdArray(arr_Synthetic[21], 0)))
+
+        # Slices of a 512^3 volume (512 x 512 voxels; 8 of them, the cost of a view does not depend on the others)
+        arr_Wide, wideVolume = self.createSyntheticVolume((8, 512, 512))
+        logic.process(wideVolume, outputVolume, 0, showResult=False)
+        sliceNode_Red.JumpSliceByCentering(*wideVolume.GetImageData().GetCenter()[:2], 4)
+        list_Seconds = []
+        for threshold in range(100, 120):
+            startTime = time.perf_counter()
+            int_Voxels = logic.processVisibleSlices(wideVolume, outputVolume, threshold, list_SliceNodes=[sliceNode_Red])
+            list_Seconds.append(time.perf_counter() - startTime)
+        self.assertEqual(int_Voxels, 512 * 512)
+        self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(outputVolume)[4], thresholdArray(arr_Wide[4], 119)))
+        logging.info(f'Live preview update of a 512 x 512 slice: median {sorted(list_Seconds)[10] * 1000:.2f} ms')
+
+        # Binary mask output mode: the preview writes the uint8 mask of the visible slices, not thresholded values
+        sliceNode_Red.JumpSliceByCentering(*inputVolume.GetImageData().GetCenter()[:2], 20)
+        maskVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        logic.process(inputVolume, maskVolume, 0, showResult=False, outputMode=STR_OutputMode_BinaryMask)
+        int_Voxels = logic.processVisibleSlices(inputVolume, maskVolume, 100, list_SliceNodes=[sliceNode_Red],
+                                                outputMode=STR_OutputMode_BinaryMask)
+        self.assertEqual(int_Voxels, 128 * 128)
+        arr_Mask = slicer.util.arrayFromVolume(maskVolume)
+        self.assertEqual(arr_Mask.dtype, np.uint8)
+        self.assertTrue(np.array_equal(arr_Mask[20], thresholdMaskArray(arr_Synthetic[20], 100)))
+        self.assertTrue(np.array_equal(arr_Mask[21], thresholdMaskArray(arr_Synthetic[21], 0)))
+        with self.assertRaises(ValueError):
+            logic.processVisibleSlices(inputVolume, maskVolume, 100, outputMode=STR_OutputMode_BitPackedMask)
+
+        # Widget: a slider release recomputes the inverted output too; a value typed in the spin box (valueChanged
+        #   without a drag before it) recomputes nothing
+        invertedOutputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        widget = slicer.util.getModuleWidget('t_ApplyThreshold')
+        widget.enter()
+        try:
+            widget.ui.inputSelector.setCurrentNode(inputVolume)
+            widget.ui.outputSelector.setCurrentNode(outputVolume)
+            widget.ui.invertedOutputSelector.setCurrentNode(invertedOutputVolume)
+            widget.ui.invertOutputCheckBox.checked = False
+            widget.ui.binaryMaskCheckBox.checked = False
+            widget.ui.runInBackgroundCheckBox.checked = False
+            widget.ui.livePreviewCheckBox.checked = True
+            widget.onThresholdSlider_ValueIsChanging(150)
+            widget.onThresholdSlider_ValueChanged(150)
+            self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(outputVolume), thresholdArray(arr_Synthetic, 150)))
+            self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(invertedOutputVolume),
+                                           thresholdArray(arr_Synthetic, 150, invert=True)))
+            widget.onThresholdSlider_ValueChanged(250)
+            self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(outputVolume), thresholdArray(arr_Synthetic, 150)))
+        finally:
+            widget.ui.livePreviewCheckBox.checked = False
+            widget.ui.invertedOutputSelector.setCurrentNode(None)
+            widget.exit()
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_SortedVoxelIndex(self):
+        """ Threshold sweep through the sorted-voxel index: same output as a full pass; invalidated by input changes. """
+        self.delayDisplay("Starting the test: sorted-voxel index")
+
+        import numpy as np
+        arr_Synthetic, inputVolume = self.createSyntheticVolume((32, 64, 64))
+        outputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        logic = t_ApplyThresholdLogic()
+
+        int_IndexBytes = logic.buildThresholdIndex(inputVolume)
+        self.assertEqual(int_IndexBytes, arr_Synthetic.size * (arr_Synthetic.itemsize + 4))
+        for invert in (False, True):
+            for threshold in (100, 150.5, -20, -20, 1999, 100):
+                logic.process(inputVolume, outputVolume, threshold, invert, showResult=False)
+                self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(outputVolume),
+                                               thresholdArray(arr_Synthetic, threshold, invert)))
+
+        # Modified input voxels: the index is dropped, and the output follows the new voxels
+        slicer.util.arrayFromVolume(inputVolume)[0] = 0
+        slicer.util.arrayFromVolumeModified(inputVolume)
+        self.assertEqual(logic.obtainThresholdIndexMemoryBytes(), 0)
+        logic.process(inputVolume, outputVolume, 100, showResult=False)
+        self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(outputVolume),
+                                       thresholdArray(slicer.util.arrayFromVolume(inputVolume), 100)))
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_ResultCache(self):
+        """ Result cache: hit on an identical request, miss after the input changes, eviction within the budget. """
+        self.delayDisplay("Starting the test: result cache")
+
+        import numpy as np
+        arr_Synthetic, inputVolume = self.createSyntheticVolume((32, 64, 64))
+        outputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        logic = t_ApplyThresholdLogic()
+        logic.setResultCacheBudgetBytes(2 * arr_Synthetic.nbytes)
+
+        logic.process(inputVolume, outputVolume, 100, showResult=False)
+        logic.process(inputVolume, outputVolume, 100, showResult=False)
+        self.assertEqual((logic.resultCache.int_Hits, logic.resultCache.int_Misses), (1, 1))
+        self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(outputVolume), thresholdArray(arr_Synthetic, 100)))
+
+        # Modified input voxels: new key, not served from the cache
+        slicer.util.arrayFromVolume(inputVolume)[0] = 0
+        slicer.util.arrayFromVolumeModified(inputVolume)
+        logic.process(inputVolume, outputVolume, 100, showResult=False)
+        self.assertEqual((logic.resultCache.int_Hits, logic.resultCache.int_Misses), (1, 2))
+
+        # Results of the former voxels can no longer be hit: dropped when the new ones are stored
+        self.assertEqual(logic.resultCache.obtainStats()['Entries'], 1)
+
+        # Budget of two results: the third evicts the least recently used
+        logic.process(inputVolume, outputVolume, 200, showResult=False)
+        logic.process(inputVolume, outputVolume, 300, showResult=False)
+        self.assertEqual(logic.resultCache.obtainStats()['Evictions'], 1)
+        self.assertLessEqual(logic.resultCache.int_Bytes, logic.resultCache.int_BudgetBytes)
+
+        # Input removed from the scene: its results are dropped;   opt-in: no budget, no cache, by default
+        slicer.mrmlScene.RemoveNode(inputVolume)
+        self.assertEqual(logic.resultCache.obtainStats()['Entries'], 0)
+        self.assertEqual(logic.resultCache.int_Bytes, 0)
+        self.assertEqual(t_ApplyThresholdLogic().resultCache.int_BudgetBytes, 0)
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_ZeroCopyOutput(self):
+        """ A repeated Apply on a matching output writes into its existing buffer and allocates nothing. """
+        self.delayDisplay("Starting the test: zero-copy output")
+
+        import numpy as np
+        arr_Synthetic, inputVolume = self.createSyntheticVolume((64, 128, 128))
+        outputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        logic = t_ApplyThresholdLogic()     # Default settings: the result cache is off, nothing is copied into it
+        logic.bool_MeasureAllocations = True
+
+        # First Apply: the output image data is allocated
+        logic.process(inputVolume, outputVolume, 100, showResult=False)
+        self.assertEqual(logic.obtainAllocationStats()['VTKBuffersAllocated'], 1)
+
+        # Repeated Apply, also with another threshold: same buffer, no voxel-sized allocation
+        for threshold in (100, 300):
+            logic.process(inputVolume, outputVolume, threshold, showResult=False)
+            dict_Stats = logic.obtainAllocationStats()
+            self.assertEqual(dict_Stats['Allocations'], 0)
+            self.assertLess(dict_Stats['AllocatedBytes'], arr_Synthetic.nbytes // 100)
+            self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(outputVolume), thresholdArray(arr_Synthetic, threshold)))
+
+        # Inverted output and background threshold: written into the existing buffers of the outputs as well
+        invertedOutputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        logic.processWithInvertedOutput(inputVolume, outputVolume, invertedOutputVolume, 100, showResult=False)
+        tuple_Buffers = tuple(logic.obtainScalarsBufferAddress(node) for node in (outputVolume, invertedOutputVolume))
+        logic.processWithInvertedOutput(inputVolume, outputVolume, invertedOutputVolume, 300, showResult=False)
+        self.assertEqual(tuple(logic.obtainScalarsBufferAddress(node) for node in (outputVolume, invertedOutputVolume)),
+                         tuple_Buffers)
+        self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(invertedOutputVolume),
+                                       thresholdArray(arr_Synthetic, 300, invert=True)))
+        logic.processAsync(inputVolume, outputVolume, 200, showResult=False, invertedOutputVolume=invertedOutputVolume)
+        logic.asyncTask.wait()
+        logic.onAsyncPollTimer_Timeout()
+        self.assertEqual(tuple(logic.obtainScalarsBufferAddress(node) for node in (outputVolume, invertedOutputVolume)),
+                         tuple_Buffers)
+        self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(outputVolume), thresholdArray(arr_Synthetic, 200)))
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_CompactOutput(self):
+        """ uint8 mask and bit-packed mask outputs: same kept voxels as KeepValues, input geometry, smaller output. """
+        self.delayDisplay("Starting the test: compact output modes")
+
+        import shutil
+        import tempfile
+        import numpy as np
+        arr_Synthetic, inputVolume = self.createSyntheticVolume(
+            arr_Synthetic=np.random.default_rng(0).standard_normal(size=(30, 64, 70)).astype(np.float32) * 500)
+        inputVolume.SetSpacing(0.5, 0.7, 1.5)
+        inputVolume.SetOrigin(10, -20, 30)
+        logic = t_ApplyThresholdLogic()
+        mat_IJKToRAS = vtk.vtkMatrix4x4()
+        inputVolume.GetIJKToRASMatrix(mat_IJKToRAS)
+
+        for invert in (False, True):
+            arr_Expected = (arr_Synthetic <= 100) if invert else (arr_Synthetic >= 100)
+
+            # uint8 mask in the output node, 1 byte per voxel, geometry of the input
+            maskVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+            for _ in range(2):      # Second run writes in place into the uint8 output
+                logic.process(inputVolume, maskVolume, 100, invert, showResult=False, outputMode=STR_OutputMode_BinaryMask)
+                arr_Mask = slicer.util.arrayFromVolume(maskVolume)
+                self.assertEqual(arr_Mask.dtype, np.uint8)
+                self.assertTrue(np.array_equal(arr_Mask, arr_Expected))
+            mat_Mask = vtk.vtkMatrix4x4()
+            maskVolume.GetIJKToRASMatrix(mat_Mask)
+            self.assertTrue(np.allclose(slicer.util.arrayFromVTKMatrix(mat_Mask), slicer.util.arrayFromVTKMatrix(mat_IJKToRAS)))
+
+            # Bit-packed sidecar, 1 bit per voxel, no output node
+            str_TempDir = tempfile.mkdtemp()
+            try:
+                str_MaskPath = os.path.join(str_TempDir, 'Mask.npz')
+                logic.process(inputVolume, None, 100, invert, outputMode=STR_OutputMode_BitPackedMask,
+                              str_MaskSidecarPath=str_MaskPath)
+                with np.load(str_MaskPath) as npz:
+                    int_PackedBytes = npz['Packed'].nbytes
+                arr_Unpacked, arr_MaskIJKToRAS = loadBitPackedMask(str_MaskPath)
+            finally:
+                shutil.rmtree(str_TempDir, ignore_errors=True)
+            self.assertEqual(int_PackedBytes, (arr_Synthetic.size + 7) // 8)
+            self.assertTrue(np.array_equal(arr_Unpacked, arr_Expected))
+            self.assertTrue(np.allclose(arr_MaskIJKToRAS, slicer.util.arrayFromVTKMatrix(mat_IJKToRAS)))
+            logging.info(f'Output bytes: KeepValues {arr_Synthetic.nbytes}, BinaryMask {arr_Mask.nbytes}, '
+                         f'BitPackedMask {int_PackedBytes}')
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_AsyncProcess(self):
+        """ Background threshold: same output as process(), progress on the main thread, cancel leaves the output as is. """
+        self.delayDisplay("Starting the test: background threshold")
+
+        import time
+        import numpy as np
+        arr_Synthetic, inputVolume = self.createSyntheticVolume((128, 256, 256))
+        outputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        invertedOutputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        logic = t_ApplyThresholdLogic()
+
+        # Completed run: the event loop keeps running while waiting, the result is published on the main thread
+        list_Progress, list_Finished = [], []
+        logic.processAsync(inputVolume, outputVolume, 100, showResult=False, invertedOutputVolume=invertedOutputVolume,
+                           fn_Progress=list_Progress.append, fn_Finished=lambda *args: list_Finished.append(args))
+        int_EventLoopTurns = 0
+        while logic.isAsyncRunning():
+            slicer.app.processEvents()
+            int_EventLoopTurns += 1
+            time.sleep(0.001)
+        self.assertEqual(list_Finished, [(True, None)])
+        self.assertEqual(list_Progress, sorted(list_Progress))
+        self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(outputVolume), thresholdArray(arr_Synthetic, 100)))
+        self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(invertedOutputVolume),
+                                       thresholdArray(arr_Synthetic, 100, invert=True)))
+        logging.info(f'Event loop turns during the background threshold: {int_EventLoopTurns}')
+
+        # Cancelled run: no result published, the output node keeps its previous voxels
+        list_Finished = []
+        cancelledOutputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        logic.processAsync(inputVolume, cancelledOutputVolume, 300, showResult=False,
+                           fn_Finished=lambda *args: list_Finished.append(args))
+        logic.cancelAsync()
+        self.assertFalse(logic.isAsyncRunning())
+        self.assertEqual(list_Finished, [(False, 'Cancelled')])
+        self.assertIsNone(cancelledOutputVolume.GetImageData())
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_MultiLevel(self):
+        """ One-pass label map of intensity bands: same bands as chained process() calls, counts and volumes. """
+        self.delayDisplay("Starting the test: multi-level threshold")
+
+        import numpy as np
+        arr_Synthetic, inputVolume = self.createSyntheticVolume((64, 128, 128))
+        inputVolume.SetSpacing(0.5, 0.5, 2.0)
+        labelVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLLabelMapVolumeNode")
+        logic = t_ApplyThresholdLogic()
+        list_CutPoints = [-500, 200, 1200]      # air | soft tissue | bone | above
+
+        list_LabelStats = logic.processMultiLevel(inputVolume, labelVolume, list_CutPoints, showResult=False)
+        arr_Labels = slicer.util.arrayFromVolume(labelVolume)
+        self.assertTrue(np.array_equal(arr_Labels, np.digitize(arr_Synthetic, list_CutPoints)))
+
+        # Label >= i  is the voxel set kept by process() with threshold list_CutPoints[i-1]
+        outputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+        for idx_Label, cutPoint in enumerate(list_CutPoints, start=1):
+            logic.process(inputVolume, outputVolume, cutPoint, showResult=False, outputMode=STR_OutputMode_BinaryMask)
+            self.assertTrue(np.array_equal(arr_Labels >= idx_Label, slicer.util.arrayFromVolume(outputVolume) == 1))
+
+        # Per-label counts and volumes
+        self.assertEqual([d['VoxelCount'] for d in list_LabelStats], list(np.bincount(arr_Labels.ravel(), minlength=4)))
+        self.assertEqual(sum(d['VoxelCount'] for d in list_LabelStats), arr_Synthetic.size)
+        self.assertAlmostEqual(list_LabelStats[1]['Volume_mm3'], list_LabelStats[1]['VoxelCount'] * 0.5)
+        self.assertEqual((list_LabelStats[0]['Lower'], list_LabelStats[0]['Upper']), (None, -500))
+        with self.assertRaises(ValueError):
+            logic.processMultiLevel(inputVolume, labelVolume, [200, -500], showResult=False)
+        with self.assertRaises(ValueError):     # Same cut point once cast to the int16 voxels: label 1 would be empty
+            logic.processMultiLevel(inputVolume, labelVolume, [100.2, 100.7], showResult=False)
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_AutoThreshold(self):
+        """ Otsu / percentile / valley suggestions from the cached histogram of the input. """
+        self.delayDisplay("Starting the test: automatic threshold")
+
+        import time
+        import numpy as np
+        rng = np.random.default_rng(0)
+        arr_Synthetic = np.concatenate([rng.normal(100, 20, 64 * 64 * 40), rng.normal(600, 50, 64 * 64 * 24)])
+        arr_Synthetic, inputVolume = self.createSyntheticVolume(
+            arr_Synthetic=arr_Synthetic.astype(np.int16).reshape(64, 64, 64))
+        logic = t_ApplyThresholdLogic()
+
+        # Both modes are separated by the Otsu and valley thresholds
+        float_Fraction_Upper = 24 / 64
+        for str_Method in (STR_AutoThreshold_Otsu, STR_AutoThreshold_Valley):
+            value = logic.obtainSuggestedThreshold(inputVolume, str_Method)
+            self.assertAlmostEqual((arr_Synthetic >= value).mean(), float_Fraction_Upper, places=3)
+        value = logic.obtainSuggestedThreshold(inputVolume, STR_AutoThreshold_Percentile, 25.0)
+        self.assertLessEqual(abs(value - np.percentile(arr_Synthetic, 25.0)), 1.0)
+
+        # Cached per input: instant on re-entry, recounted once the voxels change
+        histogram = logic.obtainIntensityHistogram(inputVolume)
+        startTime = time.time()
+        logic.obtainSuggestedThreshold(inputVolume, STR_AutoThreshold_Otsu)
+        logging.info(f'Cached automatic threshold: {1000 * (time.time() - startTime):.3f} ms')
+        self.assertIs(logic.obtainIntensityHistogram(inputVolume), histogram)
+        slicer.util.updateVolumeFromArray(inputVolume, arr_Synthetic + 10)
+        self.assertIsNot(logic.obtainIntensityHistogram(inputVolume), histogram)
+        with self.assertRaises(ValueError):
+            logic.obtainSuggestedThreshold(inputVolume, 'Unknown')
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_Headless(self):
+        """ Headless entry point: NRRD in, NRRD out, same voxels as process(), load/compute/save timing. """
+        self.delayDisplay("Starting the test: headless entry point")
+
+        import shutil
+        import tempfile
+        import numpy as np
+        from t_ApplyThresholdLib.Headless import main, runHeadlessThreshold
+        arr_Synthetic, inputVolume = self.createSyntheticVolume((64, 128, 128))
+        str_TempDir = tempfile.mkdtemp()
+        try:
+            str_InputPath = os.path.join(str_TempDir, 'Input.nrrd')
+            self.assertTrue(slicer.util.saveNode(inputVolume, str_InputPath))
+
+            for invert in (False, True):
+                str_OutputPath = os.path.join(str_TempDir, f'Output_{invert}.nrrd')
+                dict_Report = runHeadlessThreshold(str_InputPath, str_OutputPath, 100, invert)
+                self.assertEqual(dict_Report['Engine'], 'NumPy')
+                self.assertAlmostEqual(dict_Report['TotalSeconds'], dict_Report['LoadSeconds'] + dict_Report['ComputeSeconds']
+                                       + dict_Report['SaveSeconds'], places=6)
+                logging.info(f'Headless threshold: {dict_Report}')
+                self.assertTrue(np.array_equal(readNrrdArray(str_OutputPath), thresholdArray(arr_Synthetic, 100, invert)))
+
+            # Command line: status 0, and 1 on a missing input
+            self.assertEqual(main(['-i', str_InputPath, '-o', os.path.join(str_TempDir, 'Output_Cli.nrrd'), '-t', '100']), 0)
+            self.assertEqual(main(['-i', os.path.join(str_TempDir, 'Missing.nrrd'), '-o', str_InputPath + '.out.nrrd',
+                                   '-t', '100']), 1)
+        finally:
+            shutil.rmtree(str_TempDir, ignore_errors=True)
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_SampleDataCache(self):
+        """ Local sample cache: offline directory and HTTP stand-in sources, checksum verified, no network. """
+        self.delayDisplay("Starting the test: sample data cache")
+
+        import filecmp
+        import shutil
+        import tempfile
+        from t_ApplyThresholdLib.SampleDataCache import computeFileSHA256, serveSampleDirectory
+        str_TempDir = tempfile.mkdtemp()
+        try:
+            str_OfflineDir = os.path.join(str_TempDir, 'Offline')
+            os.makedirs(str_OfflineDir)
+            bytes_Sample = os.urandom(3 * 1024 * 1024)
+            with open(os.path.join(str_OfflineDir, 'Sample.nrrd'), 'wb') as f:
+                f.write(bytes_Sample)
+            str_Checksum = 'SHA256:' + computeFileSHA256(os.path.join(str_OfflineDir, 'Sample.nrrd'))
+
+            # Offline directory: resolved by file name, copied into the cache, then served from the cache only
+            cache = SampleDataCache(os.path.join(str_TempDir, 'Cache'), str_OfflineDir)
+            str_Path = cache.obtainSample(str_Checksum, 'https://unreachable.invalid/Sample.nrrd', 'Sample.nrrd')
+            os.remove(os.path.join(str_OfflineDir, 'Sample.nrrd'))
+            self.assertEqual(cache.obtainSample(str_Checksum, None, 'Sample.nrrd'), str_Path)
+            with open(str_Path, 'rb') as f:
+                self.assertEqual(f.read(), bytes_Sample)
+
+            # A file that does not match its checksum never enters the cache
+            with open(os.path.join(str_OfflineDir, 'Corrupted.nrrd'), 'wb') as f:
+                f.write(bytes_Sample[:-1])
+            with self.assertRaises(ValueError):
+                cache.obtainSample('SHA256:' + '0' * 64, None, 'Corrupted.nrrd')
+            self.assertEqual(os.listdir(os.path.dirname(str_Path)), [os.path.basename(str_Path)])
+
+            # Local HTTP stand-in serving the first cache, as the offline source of a second one
+            server, str_BaseUrl = serveSampleDirectory(cache.str_CacheDir)
+            try:
+                cache_Remote = SampleDataCache(os.path.join(str_TempDir, 'Cache2'), str_BaseUrl)
+                self.assertTrue(filecmp.cmp(cache_Remote.obtainSample(str_Checksum), str_Path, shallow=False))
+                self.assertTrue(cache_Remote.verify(str_Checksum))
+            finally:
+                server.shutdown()
+                server.server_close()     # Releases the listening socket
+        finally:
+            shutil.rmtree(str_TempDir, ignore_errors=True)
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_CoalescedGUIUpdate(self):
+        """ Parameter node modified many times in one event-loop turn: one GUI refresh, of the changed widgets only. """
+        self.delayDisplay("Starting the test: coalesced parameter node -> GUI updates")
+
+        widget = slicer.util.getModuleWidget('t_ApplyThreshold')
+        widget.enter()
+        parameterNode = widget.logic.getParameterNode()
+        slicer.app.processEvents()
+
+        list_Refreshes = []
+        fn_Update = widget.updateGUIFromParameterNode
+        widget.updateGUIFromParameterNode = lambda *args: list_Refreshes.append(fn_Update(*args))
+        try:
+            # A script setting the threshold 50 times, one ModifiedEvent each: nothing refreshed synchronously
+            for int_Step in range(50):
+                parameterNode.SetParameter("Threshold", str(float(10 + int_Step)))
+            self.assertEqual(list_Refreshes, [])
+            slicer.app.processEvents()
+            self.assertEqual(list_Refreshes, [{"Threshold"}])
+            self.assertEqual(widget.ui.imageThresholdSliderWidget.value, 59.0)
+
+            # Several parameters in the same turn: one refresh of exactly those widgets; no change, no refresh
+            list_Refreshes.clear()
+            parameterNode.SetParameter("Invert", "true" if parameterNode.GetParameter("Invert") == "false" else "false")
+            parameterNode.SetParameter("AutoThresholdPercentile", "75.0")
+            slicer.app.processEvents()
+            self.assertEqual(list_Refreshes, [{"Invert", "AutoThresholdPercentile"}])
+            self.assertEqual(widget.ui.invertOutputCheckBox.checked, parameterNode.GetParameter("Invert") == "true")
+            self.assertEqual(widget.ui.autoThresholdPercentileSpinBox.value, 75.0)
+            list_Refreshes.clear()
+            parameterNode.Modified()
+            slicer.app.processEvents()
+            self.assertEqual(list_Refreshes, [set()])
+        finally:
+            del widget.updateGUIFromParameterNode
+            widget.exit()
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_t_ApplyThreshold_TypedParameters(self):
+        """ Typed parameter view: same strings as before in the node, cache invalidated by outside writes, one
+            ModifiedEvent per batch, unchanged values not written; get/set cost against the string round trips. """
+        self.delayDisplay("Starting the test: typed, cached parameter node access")
+
+        import time
+        logic = t_ApplyThresholdLogic()
+        parameterNode = logic.getParameterNode()
+        parameterNode.UnsetParameter("Threshold")
+        parameterNode.UnsetParameter("Invert")
+        logic.setDefaultParameters(parameterNode)
+        parameters = logic.obtainParameters()
+        self.assertIs(parameters, logic.obtainParameters(parameterNode))
+
+        # Stored strings are unchanged (scenes saved before remain readable), values come back typed
+        self.assertEqual(parameterNode.GetParameter("Threshold"), "100.0")
+        self.assertEqual(parameterNode.GetParameter("Invert"), "false")
+        self.assertEqual(parameters.get("Threshold"), 100.0)
+        self.assertIs(parameters.get("Invert"), False)
+
+        # A write from outside the view (older code, a script) invalidates its cache
+        parameterNode.SetParameter("Threshold", "42.5")
+        self.assertEqual(parameters.get("Threshold"), 42.5)
+
+        # Batched writes: one ModifiedEvent; writing the current value: no event at all
+        list_Events = []
+        int_Tag = parameterNode.AddObserver(vtk.vtkCommand.ModifiedEvent, lambda caller, event: list_Events.append(event))
+        try:
+            inputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+            with parameters.batch():
+                parameters.set("Threshold", 120.0)
+                parameters.set("Invert", True)
+                parameters.setNodeID("InputVolume", inputVolume.GetID())
+            self.assertEqual(len(list_Events), 1)
+            self.assertEqual(parameterNode.GetParameter("Invert"), "true")
+            self.assertIs(parameters.getNode("InputVolume"), inputVolume)
+            self.assertFalse(parameters.set("Threshold", 120.0))
+            self.assertFalse(parameters.setNodeID("InputVolume", inputVolume.GetID()))
+            self.assertEqual(len(list_Events), 1)
+        finally:
+            parameterNode.RemoveObserver(int_Tag)
+
+        # Microbenchmark: get and set, typed view against GetParameter + float() and SetParameter(str())
+        int_Repeat = 10000
+        startTime = time.perf_counter()
+        for _ in range(int_Repeat):
+            float(parameterNode.GetParameter("Threshold"))
+        float_RawGet_us = 1e6 * (time.perf_counter() - startTime) / int_Repeat
+        startTime = time.perf_counter()
+        for _ in range(int_Repeat):
+            parameters.get("Threshold")
+        float_TypedGet_us = 1e6 * (time.perf_counter() - startTime) / int_Repeat
+        startTime = time.perf_counter()
+        for idx in range(int_Repeat):
+            parameterNode.SetParameter("Threshold", str(float(idx % 2)))
+        float_RawSet_us = 1e6 * (time.perf_counter() - startTime) / int_Repeat
+        startTime = time.perf_counter()
+        for idx in range(int_Repeat):
+            parameters.set("Threshold", float(idx % 2))
+        float_TypedSet_us = 1e6 * (time.perf_counter() - startTime) / int_Repeat
+        startTime = time.perf_counter()
+        for _ in range(int_Repeat):
+            parameters.set("Threshold", 1.0)
+        float_TypedSetUnchanged_us = 1e6 * (time.perf_counter() - startTime) / int_Repeat
+        logging.info(f'Parameter get: string {float_RawGet_us:.2f} us, typed {float_TypedGet_us:.2f} us;  '
+                     f'set: string {float_RawSet_us:.2f} us, typed {float_TypedSet_us:.2f} us, '
+                     f'typed unchanged {float_TypedSetUnchanged_us:.2f} us')
+        self.assertLess(float_TypedGet_us, float_RawGet_us)
+
+        self.delayDisplay('Test passed')
+
 # ======================================================================================================================
 # ======================================================================================================================
 # ------------     Unit-Test:   Load Data        -----------------------------------------------------------------------
@@ -371,12 +2202,39 @@ class t_ApplyThresholdTest(ScriptedLoadableModuleTest):
 #
 # Register sample data sets in Sample Data module
 #
+_bool_SampleDataRegistered = False
+
+def registerSampleDataOnce():
+    """
+    registerSampleData() on the first call only: SampleData is imported when the module is first used,
+    instead of at every application start.
+    """
+    global _bool_SampleDataRegistered
+    if not _bool_SampleDataRegistered:
+        registerSampleData()
+        _bool_SampleDataRegistered = True
+
+def obtainSampleDataCache():
+    """
+    Local sample cache of the module: $T_APPLYTHRESHOLD_SAMPLE_CACHE, else the default folder of SampleDataCache,
+    the same as in headless scripts. Offline mode with $T_APPLYTHRESHOLD_SAMPLE_OFFLINE, see SampleDataCache.
+    """
+    return SampleDataCache()
+
+def downloadSampleFromCache(source):
+    """
+    customDownloader of the samples registered in Sample Data module: the sample is resolved through the local
+    sample cache (cached file, offline source or download URL) when it is loaded, not when it is registered.
+    """
+    return t_ApplyThresholdLogic().loadSampleVolume(source.sampleName)
+
 def registerSampleData():
     """
     Add data sets to Sample Data module.
     """
     # It is always recommended to provide sample data for users to make it easy to try the module,
-    # but if no sample data is available then this method (and associated startupCompeted signal connection) can be removed.
+    # but if no sample data is available then this method (and registerSampleDataOnce(), which calls it on the first
+    # widget setup or test run) can be removed.
 
     import SampleData
     iconsPath = os.path.join(os.path.dirname(__file__), 'Resources/Icons')
@@ -393,11 +2251,13 @@ def registerSampleData():
         # It can be created by Screen Capture module, "Capture all views" option enabled, "Number of images" set to "Single".
         thumbnailFileName=os.path.join(iconsPath, 't_ApplyThreshold1.png'),
         # Download URL and target file name
-        uris="https://github.com/Slicer/SlicerTestingData/releases/download/SHA256/998cb522173839c78657f4bc0ea907cea09fd04e44601f17c82ea27927937b95",
-        fileNames='t_ApplyThreshold1.nrrd',
+        #   (loaded through the local sample cache, see downloadSampleFromCache)
+        uris=DICT_SampleDataSources['t_ApplyThreshold1']['Uri'],
+        customDownloader=downloadSampleFromCache,
+        fileNames=DICT_SampleDataSources['t_ApplyThreshold1']['FileName'],
         # Checksum to ensure file integrity. Can be computed by this command:
-        #  import hashlib; print(hashlib.sha256(open(filename, "rb").read()).hexdigest())
-        checksums='SHA256:998cb522173839c78657f4bc0ea907cea09fd04e44601f17c82ea27927937b95',
+        #  from t_ApplyThresholdLib.SampleDataCache import computeFileSHA256; print(computeFileSHA256(filename))
+        checksums=DICT_SampleDataSources['t_ApplyThreshold1']['Checksum'],
         # This node name will be used when the data set is loaded
         nodeNames='t_ApplyThreshold1'
     )
@@ -409,9 +2269,10 @@ def registerSampleData():
         sampleName='t_ApplyThreshold2',
         thumbnailFileName=os.path.join(iconsPath, 't_ApplyThreshold2.png'),
         # Download URL and target file name
-        uris="https://github.com/Slicer/SlicerTestingData/releases/download/SHA256/1a64f3f422eb3d1c9b093d1a18da354b13bcf307907c66317e2463ee530b7a97",
-        fileNames='t_ApplyThreshold2.nrrd',
-        checksums='SHA256:1a64f3f422eb3d1c9b093d1a18da354b13bcf307907c66317e2463ee530b7a97',
+        uris=DICT_SampleDataSources['t_ApplyThreshold2']['Uri'],
+        customDownloader=downloadSampleFromCache,
+        fileNames=DICT_SampleDataSources['t_ApplyThreshold2']['FileName'],
+        checksums=DICT_SampleDataSources['t_ApplyThreshold2']['Checksum'],
         # This node name will be used when the data set is loaded
         nodeNames='t_ApplyThreshold2'
     )
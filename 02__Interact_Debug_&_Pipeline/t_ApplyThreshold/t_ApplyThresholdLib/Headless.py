@@ -0,0 +1,125 @@
+import os
+import sys
+
+if __package__:
+    from .ThresholdEngine import *
+else:
+    # Run as a script (python Headless.py, Slicer --python-script Headless.py): import the package from its folder
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from t_ApplyThresholdLib.ThresholdEngine import *
+
+'''=================================================================================================================='''
+'''=================================================================================================================='''
+#
+# t_ApplyThresholdLib.Headless
+#       Command-line entry point of t_ApplyThreshold, with no widget, no .ui resource and no scene view:
+#           python -m t_ApplyThresholdLib.Headless  -i in.nrrd -o out.nrrd -t 100 [--invert]
+#           PythonSlicer t_ApplyThresholdLib/Headless.py  -i in.nrrd -o out.nrrd -t 100
+#           Slicer --no-main-window --python-script t_ApplyThresholdLib/Headless.py  -i in.nii.gz -o out.nii.gz -t 100
+#       NRRD files go through the pure NumPy engine (no Slicer needed); other formats need Slicer for reading and
+#       writing, and go through t_ApplyThresholdLogic without its widget.
+#
+'''------------------------- STRING Macro of  Headless --------------------------------------------------------------'''
+'''------------------------------------------------------------------------------------------------------------------'''
+TUPLE_NrrdExtensions                    = ('.nrrd', '.nhdr')
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Headless Threshold:   load / compute / save, timed separately  -------------------------------------
+def runHeadlessThreshold(str_InputPath, str_OutputPath, imageThreshold, invert=False, int_NumberOfThreads=1):
+    """    Threshold the volume file str_InputPath into str_OutputPath, same semantics as t_ApplyThresholdLogic.process.
+              :return: dict   {'LoadSeconds', 'ComputeSeconds', 'SaveSeconds', 'TotalSeconds', 'Engine', 'Voxels'}    """
+    bool_Nrrd = (str_InputPath.lower().endswith(TUPLE_NrrdExtensions)
+                 and str_OutputPath.lower().endswith(TUPLE_NrrdExtensions))
+    if bool_Nrrd:
+        return runHeadlessThreshold_NumPy(str_InputPath, str_OutputPath, imageThreshold, invert, int_NumberOfThreads)
+    return runHeadlessThreshold_Slicer(str_InputPath, str_OutputPath, imageThreshold, invert, int_NumberOfThreads)
+
+# ----------------------------------------------------------------------------------------------------------------------
+def runHeadlessThreshold_NumPy(str_InputPath, str_OutputPath, imageThreshold, invert=False, int_NumberOfThreads=1):
+    """    NRRD to NRRD with the ThresholdEngine only: no Slicer, VTK or Qt import.
+              The output is an attached-header raw NRRD with the geometry and scalar type of the input.    """
+    import time
+    import numpy      # Imported before the timer, so that 'LoadSeconds' is the file read only
+    time_Start = time.perf_counter()
+    arr_Input = readNrrdArray(str_InputPath)
+    time_Loaded = time.perf_counter()
+    arr_Output = thresholdArrayParallel(arr_Input, imageThreshold, invert, None, int_NumberOfThreads)
+    time_Computed = time.perf_counter()
+    int_OutputOffset = writeNrrdHeaderForRawOutput(str_InputPath, str_OutputPath)
+    with open(str_OutputPath, 'r+b') as f:
+        f.seek(int_OutputOffset)
+        arr_Output.tofile(f)
+    time_Saved = time.perf_counter()
+    return {'LoadSeconds': time_Loaded - time_Start, 'ComputeSeconds': time_Computed - time_Loaded,
+            'SaveSeconds': time_Saved - time_Computed, 'TotalSeconds': time_Saved - time_Start,
+            'Engine': 'NumPy', 'Voxels': int(arr_Input.size)}
+
+# ----------------------------------------------------------------------------------------------------------------------
+def runHeadlessThreshold_Slicer(str_InputPath, str_OutputPath, imageThreshold, invert=False, int_NumberOfThreads=1):
+    """    Any format Slicer reads/writes: loadVolume, t_ApplyThresholdLogic.process, saveNode.
+              Only the logic class is used; the widget and its .ui file are never loaded.    """
+    import time
+    try:
+        import slicer
+    except ImportError:
+        raise RuntimeError(f'SL_Alert! Only NRRD files can be processed without Slicer: {str_InputPath}')
+    from t_ApplyThreshold import t_ApplyThresholdLogic
+
+    time_Start = time.perf_counter()
+    inputVolume = slicer.util.loadVolume(str_InputPath, {'show': False})
+    time_Loaded = time.perf_counter()
+    outputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+    logic = t_ApplyThresholdLogic()
+    logic.setNumberOfThreads(int_NumberOfThreads)
+    logic.process(inputVolume, outputVolume, imageThreshold, invert, showResult=False)
+    time_Computed = time.perf_counter()
+    if not slicer.util.saveNode(outputVolume, str_OutputPath):
+        raise RuntimeError(f'SL_Alert! Failed to save {str_OutputPath}')
+    time_Saved = time.perf_counter()
+    int_Voxels = int(slicer.util.arrayFromVolume(inputVolume).size)
+    slicer.mrmlScene.RemoveNode(outputVolume)
+    slicer.mrmlScene.RemoveNode(inputVolume)
+    return {'LoadSeconds': time_Loaded - time_Start, 'ComputeSeconds': time_Computed - time_Loaded,
+            'SaveSeconds': time_Saved - time_Computed, 'TotalSeconds': time_Saved - time_Start,
+            'Engine': 'Slicer', 'Voxels': int_Voxels}
+
+# ----------------------------------------------------------------------------------------------------------------------
+def main(list_Args=None):
+    """    Parse the command line, run runHeadlessThreshold and report the timing.   :return: exit status    """
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(prog='t_ApplyThresholdLib.Headless',
+                                     description='Threshold a volume file without the Slicer GUI.')
+    parser.add_argument('-i', '--input', required=True, help='input volume file')
+    parser.add_argument('-o', '--output', required=True, help='output volume file')
+    parser.add_argument('-t', '--threshold', required=True, type=float, help='voxels below it are set to 0')
+    parser.add_argument('--invert', action='store_true', help='set the voxels above the threshold to 0 instead')
+    parser.add_argument('--threads', type=int, default=1, help='threads of the NumPy engine, 0 for one per CPU core')
+    parser.add_argument('--json', action='store_true', help='print the timing report as JSON')
+    args = parser.parse_args(list_Args)
+
+    int_NumberOfThreads = args.threads if args.threads > 0 else (os.cpu_count() or 1)
+    try:
+        dict_Report = runHeadlessThreshold(args.input, args.output, args.threshold, args.invert, int_NumberOfThreads)
+    except Exception as e:
+        print(f'Failed to threshold {args.input}: {e}', file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(dict_Report))
+    else:
+        print(f'{args.input} -> {args.output}   ({dict_Report["Engine"]}, {dict_Report["Voxels"]} voxels)\n'
+              f'    load {dict_Report["LoadSeconds"]:.3f} s   compute {dict_Report["ComputeSeconds"]:.3f} s   '
+              f'save {dict_Report["SaveSeconds"]:.3f} s   total {dict_Report["TotalSeconds"]:.3f} s')
+    return 0
+
+
+if __name__ == '__main__':
+    int_Status = main()
+    if 'slicer' in sys.modules:
+        # Slicer --python-script: quit the application with the status, instead of staying in its event loop
+        import slicer
+        slicer.util.exit(int_Status)
+    else:
+        sys.exit(int_Status)
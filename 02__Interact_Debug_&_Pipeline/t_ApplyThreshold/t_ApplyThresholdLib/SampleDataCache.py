@@ -0,0 +1,157 @@
+import os
+
+'''=================================================================================================================='''
+'''=================================================================================================================='''
+#
+# t_ApplyThresholdLib.SampleDataCache
+#       Content-addressed local cache of the sample data files, keyed by their SHA256 checksum:
+#           <cache dir>/SHA256/<sha256 hex>
+#       A file enters the cache only after its checksum is verified, hashed chunk by chunk while it is copied or
+#       downloaded (never read whole into memory). Offline mode resolves files from a local directory or from a
+#       local HTTP stand-in (serveSampleDirectory) instead of the download URLs.
+#       No Slicer import: usable in headless scripts and build farms.
+#
+'''------------------------- STRING Macro of  SampleDataCache -------------------------------------------------------'''
+'''------------------------------------------------------------------------------------------------------------------'''
+# Environment variables: cache directory, and offline source (local directory, or base URL of an HTTP stand-in)
+STR_SampleCacheDir_EnvVar               = 'T_APPLYTHRESHOLD_SAMPLE_CACHE'
+STR_SampleOffline_EnvVar                = 'T_APPLYTHRESHOLD_SAMPLE_OFFLINE'
+STR_SampleCacheDir_Default              = os.path.join(os.path.expanduser('~'), '.cache', 't_ApplyThreshold')
+
+# Chunk of the streamed checksum verification
+INT_HashChunkBytes                      = 1024 * 1024
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Checksum:   streamed SHA256  ------------------------------------------------------------------------
+def parseChecksum(str_Checksum):
+    """    'SHA256:<hex>' (the checksums= format of SampleData)  ->  lower-case hex digest.    """
+    str_Algorithm, _, str_Digest = str_Checksum.partition(':')
+    if str_Algorithm.upper() != 'SHA256' or len(str_Digest) != 64:
+        raise ValueError(f'SL_Alert! Only SHA256 checksums are supported: {str_Checksum}')
+    return str_Digest.lower()
+
+# ----------------------------------------------------------------------------------------------------------------------
+def computeFileSHA256(str_Path, int_ChunkBytes=INT_HashChunkBytes):
+    """    SHA256 hex digest of a file, read chunk by chunk.    """
+    import hashlib
+    sha256 = hashlib.sha256()
+    with open(str_Path, 'rb') as f:
+        for bytes_Chunk in iter(lambda: f.read(int_ChunkBytes), b''):
+            sha256.update(bytes_Chunk)
+    return sha256.hexdigest()
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Sample Data Cache  -----------------------------------------------------------------------------------
+class SampleDataCache:
+    """    Local, checksum-verified store of sample files.
+              str_CacheDir:       cache directory; default $T_APPLYTHRESHOLD_SAMPLE_CACHE, else ~/.cache/t_ApplyThreshold
+              str_OfflineSource:  None for online; a local directory, or the http:// base URL of a stand-in, to never
+                                  contact the download URLs; default $T_APPLYTHRESHOLD_SAMPLE_OFFLINE    """
+
+    def __init__(self, str_CacheDir=None, str_OfflineSource=None):
+        self.str_CacheDir = str_CacheDir or os.environ.get(STR_SampleCacheDir_EnvVar) or STR_SampleCacheDir_Default
+        self.str_OfflineSource = str_OfflineSource or os.environ.get(STR_SampleOffline_EnvVar) or None
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def isOffline(self):
+        return self.str_OfflineSource is not None
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainCachePath(self, str_SHA256):
+        """    Content-addressed path of a file in the cache, whether it is there or not.    """
+        return os.path.join(self.str_CacheDir, 'SHA256', str_SHA256)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainCachedPath(self, str_Checksum):
+        """    Path of the cached file of str_Checksum, or None if it is not cached.    """
+        str_Path = self.obtainCachePath(parseChecksum(str_Checksum))
+        return str_Path if os.path.isfile(str_Path) else None
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainSample(self, str_Checksum, str_Uri=None, str_FileName=None):
+        """    Path of the verified local file of str_Checksum: from the cache, else from the offline source
+                  (offline mode), else downloaded from str_Uri. Raises if it cannot be found or does not verify.    """
+        str_CachedPath = self.obtainCachedPath(str_Checksum)
+        if str_CachedPath:
+            return str_CachedPath
+        str_SHA256 = parseChecksum(str_Checksum)
+        if not self.isOffline():
+            if not str_Uri:
+                raise ValueError(f'SL_Alert! No URI for the sample {str_FileName or str_SHA256}')
+            return self.insertFromUri(str_Uri, str_SHA256)
+        if self.str_OfflineSource.startswith(('http://', 'https://')):
+            return self.insertFromUri(self.str_OfflineSource.rstrip('/') + '/SHA256/' + str_SHA256, str_SHA256)
+        for str_Path in (os.path.join(self.str_OfflineSource, 'SHA256', str_SHA256),
+                         os.path.join(self.str_OfflineSource, str_SHA256),
+                         os.path.join(self.str_OfflineSource, str_FileName) if str_FileName else None):
+            if str_Path and os.path.isfile(str_Path):
+                with open(str_Path, 'rb') as f:
+                    return self.insertFromStream(f, str_SHA256)
+        raise FileNotFoundError(f'SL_Alert! Sample {str_FileName or str_SHA256} not found in {self.str_OfflineSource}')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def insertFromUri(self, str_Uri, str_SHA256):
+        """    Download str_Uri into the cache, verified while streamed.    """
+        import urllib.request
+        with urllib.request.urlopen(str_Uri) as response:
+            return self.insertFromStream(response, str_SHA256)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def insertFromStream(self, fileobj, str_SHA256):
+        """    Copy a binary stream into the cache chunk by chunk, hashing each chunk as it is written.
+                  The file gets its content-addressed name only once the checksum matches (atomic rename), so the
+                  cache never holds a partial or corrupted file.   :return: path in the cache    """
+        import hashlib
+        import tempfile
+        str_CachePath = self.obtainCachePath(str_SHA256)
+        os.makedirs(os.path.dirname(str_CachePath), exist_ok=True)
+        sha256 = hashlib.sha256()
+        int_Fd, str_TempPath = tempfile.mkstemp(dir=os.path.dirname(str_CachePath), suffix='.part')
+        try:
+            with os.fdopen(int_Fd, 'wb') as f:
+                for bytes_Chunk in iter(lambda: fileobj.read(INT_HashChunkBytes), b''):
+                    sha256.update(bytes_Chunk)
+                    f.write(bytes_Chunk)
+            if sha256.hexdigest() != str_SHA256:
+                raise ValueError(f'SL_Alert! Checksum mismatch: expected SHA256:{str_SHA256}, got SHA256:{sha256.hexdigest()}')
+            os.replace(str_TempPath, str_CachePath)
+        finally:
+            if os.path.exists(str_TempPath):
+                os.remove(str_TempPath)
+        return str_CachePath
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def verify(self, str_Checksum):
+        """    Re-hash a cached file (streamed); a file that does not match is removed.   :return: True if it matches    """
+        str_CachedPath = self.obtainCachedPath(str_Checksum)
+        if not str_CachedPath:
+            return False
+        if computeFileSHA256(str_CachedPath) == parseChecksum(str_Checksum):
+            return True
+        os.remove(str_CachedPath)
+        return False
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Local HTTP Stand-In  ---------------------------------------------------------------------------------
+def serveSampleDirectory(str_Directory, int_Port=0):
+    """    Serve str_Directory over HTTP on localhost, on a background thread, as a stand-in for the download server:
+              a SampleDataCache directory (or any folder with a SHA256/<hex> layout) is the offline source
+              'http://127.0.0.1:<port>' of other caches.   :return: (server, str_BaseUrl); stop with server.shutdown()    """
+    import functools
+    import http.server
+    import threading
+
+    class QuietHandler(http.server.SimpleHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', int_Port),
+                                             functools.partial(QuietHandler, directory=str_Directory))
+    threading.Thread(target=server.serve_forever, name='SampleDataStandIn', daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
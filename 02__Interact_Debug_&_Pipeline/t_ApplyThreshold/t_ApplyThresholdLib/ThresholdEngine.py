@@ -0,0 +1,814 @@
+import os
+
+'''=================================================================================================================='''
+'''=================================================================================================================='''
+#
+# t_ApplyThresholdLib.ThresholdEngine
+#       Pure NumPy threshold functions of t_ApplyThresholdLogic: no Slicer, VTK or Qt import, so that they can run
+#       in the worker processes of a batch (PythonSlicer) and in headless scripts.
+#
+'''------------------------- STRING Macro of  ThresholdEngine -------------------------------------------------------'''
+'''------------------------------------------------------------------------------------------------------------------'''
+# Slab-wise sweep along the slowest axis (K) of the voxel array; a slab of this size stays in the CPU cache
+INT_SlabBytes_Default                   = 4 * 1024 * 1024
+# Streaming mode reads/writes memory-mapped windows of this size, so peak memory does not grow with the volume
+INT_StreamingSlabBytes_Default          = 64 * 1024 * 1024
+# Memory budget of the LRU cache of threshold results; 0, i.e. disabled unless the caller opts in with a budget
+INT_ResultCacheBudgetBytes_Default      = 0
+# Bins of the intensity histogram of automatic thresholds (integer inputs of a narrower range get one bin per value)
+INT_HistogramBins_Default               = 1024
+
+# NRRD 'type' field  ->  NumPy scalar type (without byte order, which comes from the 'endian' field)
+DICT_NrrdType_to_NumPyType = {
+    'signed char': 'i1', 'int8': 'i1', 'int8_t': 'i1',
+    'uchar': 'u1', 'unsigned char': 'u1', 'uint8': 'u1', 'uint8_t': 'u1',
+    'short': 'i2', 'short int': 'i2', 'signed short': 'i2', 'signed short int': 'i2', 'int16': 'i2', 'int16_t': 'i2',
+    'ushort': 'u2', 'unsigned short': 'u2', 'unsigned short int': 'u2', 'uint16': 'u2', 'uint16_t': 'u2',
+    'int': 'i4', 'signed int': 'i4', 'int32': 'i4', 'int32_t': 'i4',
+    'uint': 'u4', 'unsigned int': 'u4', 'uint32': 'u4', 'uint32_t': 'u4',
+    'longlong': 'i8', 'long long': 'i8', 'long long int': 'i8', 'signed long long': 'i8',
+    'signed long long int': 'i8', 'int64': 'i8', 'int64_t': 'i8',
+    'ulonglong': 'u8', 'unsigned long long': 'u8', 'unsigned long long int': 'u8', 'uint64': 'u8', 'uint64_t': 'u8',
+    'float': 'f4', 'double': 'f8',
+}
+
+# NumPy scalar type (kind + itemsize)  ->  NRRD 'type' field, for writing
+DICT_NumPyType_to_NrrdType = {
+    'i1': 'int8', 'u1': 'uint8', 'i2': 'int16', 'u2': 'uint16', 'i4': 'int32', 'u4': 'uint32',
+    'i8': 'int64', 'u8': 'uint64', 'f4': 'float', 'f8': 'double',
+}
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     NumPy Threshold Engine:   pure array functions, no MRML node  --------------------------------------
+def castThresholdToScalarType(imageThreshold, dtype):
+    """    Cast the threshold to the voxel scalar type, as the CLI does with ThresholdValue:
+              truncate toward zero for integer types, clamped to the range of the type.    """
+    import numpy as np
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        return dtype.type(min(max(int(imageThreshold), info.min), info.max))
+    return dtype.type(imageThreshold)
+
+# ----------------------------------------------------------------------------------------------------------------------
+def thresholdArray(arr_Input, imageThreshold, invert=False, arr_Output=None, arr_Mask=None):
+    """    Vectorized "Threshold Scalar Volume" on a voxel array, output keeps the scalar type of arr_Input.
+              'Below' (invert=False):   voxels  < imageThreshold are set to 0
+              'Above' (invert=True):    voxels  > imageThreshold are set to 0
+           Writes into arr_Output (same shape and dtype as arr_Input) if given, and returns the output array.
+           arr_Mask (bool, same shape) is an optional scratch buffer, so that no temporary array is allocated.    """
+    import numpy as np
+    value = castThresholdToScalarType(imageThreshold, arr_Input.dtype)
+    mask_SetToZero = np.greater(arr_Input, value, out=arr_Mask) if invert else np.less(arr_Input, value, out=arr_Mask)
+    if arr_Output is None:
+        arr_Output = np.empty_like(arr_Input)
+    np.copyto(arr_Output, arr_Input)
+    np.copyto(arr_Output, 0, where=mask_SetToZero)
+    return arr_Output
+
+# ----------------------------------------------------------------------------------------------------------------------
+def obtainSlabDepth(arr_Input, int_SlabBytes=INT_SlabBytes_Default):
+    """    Number of slices along axis 0 (K, the slowest axis) per slab, so that a slab holds about int_SlabBytes.    """
+    int_SliceBytes = max(arr_Input[:1].nbytes, 1)
+    return max(int_SlabBytes // int_SliceBytes, 1)
+
+# ----------------------------------------------------------------------------------------------------------------------
+def iterSlabSlices(int_NumberOfSlices, int_SlabDepth):
+    """    Yield slice objects that split range(int_NumberOfSlices) into consecutive slabs of int_SlabDepth slices.    """
+    for idx_Start in range(0, int_NumberOfSlices, int_SlabDepth):
+        yield slice(idx_Start, min(idx_Start + int_SlabDepth, int_NumberOfSlices))
+
+# ----------------------------------------------------------------------------------------------------------------------
+def runOverSlabs(fn_Slab, int_NumberOfSlices, int_SlabDepth, int_NumberOfThreads=1):
+    """    Call fn_Slab(slab) for every slab of iterSlabSlices(), serially or on a pool of int_NumberOfThreads.
+              Slabs are disjoint, so the result does not depend on the order in which the threads run them.    """
+    list_Slabs = list(iterSlabSlices(int_NumberOfSlices, int_SlabDepth))
+    if int_NumberOfThreads <= 1 or len(list_Slabs) <= 1:
+        for slab in list_Slabs:
+            fn_Slab(slab)
+        return
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(int_NumberOfThreads, len(list_Slabs))) as executor:
+        for future in [executor.submit(fn_Slab, slab) for slab in list_Slabs]:
+            future.result()     # re-raise in the caller any exception of a worker
+
+# ----------------------------------------------------------------------------------------------------------------------
+def thresholdArrayParallel(arr_Input, imageThreshold, invert=False, arr_Output=None, int_NumberOfThreads=1,
+                           arr_MaskSlabs=None):
+    """    thresholdArray() split into slabs along axis 0, run on int_NumberOfThreads threads.
+              Output is byte-identical to the serial thresholdArray().
+              arr_MaskSlabs (bool, obtainMaskSlabsShape()) is an optional scratch of one slab mask per thread, so that
+              no temporary array is allocated: a slab takes a free one of them and gives it back once thresholded.    """
+    import numpy as np
+    if arr_MaskSlabs is None and int_NumberOfThreads <= 1:
+        return thresholdArray(arr_Input, imageThreshold, invert, arr_Output)
+    if arr_Output is None:
+        arr_Output = np.empty_like(arr_Input)
+    if arr_MaskSlabs is None:
+        runOverSlabs(lambda slab: thresholdArray(arr_Input[slab], imageThreshold, invert, arr_Output[slab]),
+                     arr_Input.shape[0], obtainSlabDepth(arr_Input), int_NumberOfThreads)
+        return arr_Output
+
+    import queue
+    queue_FreeMasks = queue.SimpleQueue()
+    for arr_MaskSlab in arr_MaskSlabs:
+        queue_FreeMasks.put(arr_MaskSlab)
+
+    def thresholdSlab(slab):
+        arr_MaskSlab = queue_FreeMasks.get()
+        try:
+            thresholdArray(arr_Input[slab], imageThreshold, invert, arr_Output[slab],
+                           arr_MaskSlab[:slab.stop - slab.start])
+        finally:
+            queue_FreeMasks.put(arr_MaskSlab)
+
+    runOverSlabs(thresholdSlab, arr_Input.shape[0], arr_MaskSlabs.shape[1], min(int_NumberOfThreads, len(arr_MaskSlabs)))
+    return arr_Output
+
+# ----------------------------------------------------------------------------------------------------------------------
+def obtainMaskSlabsShape(arr_Input, int_NumberOfThreads=1):
+    """    Shape of the arr_MaskSlabs scratch of thresholdArrayParallel(): one slab of obtainSlabDepth() slices per
+              thread (no more than the slabs of arr_Input), i.e. about INT_SlabBytes_Default / itemsize bytes each.    """
+    int_SlabDepth = min(obtainSlabDepth(arr_Input), max(arr_Input.shape[0], 1))
+    int_NumberOfSlabs = -(-arr_Input.shape[0] // int_SlabDepth)
+    return (max(min(int_NumberOfThreads, int_NumberOfSlabs), 1), int_SlabDepth) + tuple(arr_Input.shape[1:])
+
+# ----------------------------------------------------------------------------------------------------------------------
+def thresholdArrayWithInverted(arr_Input, imageThreshold, invert=False, arr_Output=None, arr_OutputInverted=None,
+                               int_NumberOfThreads=1, bool_BinaryMask=False):
+    """    thresholdArray() with 'invert' and with 'not invert' in one sweep over arr_Input;
+              thresholdMaskArray() of both (uint8 outputs) if bool_BinaryMask.
+              The sweep goes slab by slab: each input slab is read from memory once and, while cached, compared once
+              (mask of the voxels < imageThreshold) and written into both outputs: the 'Below' output keeps ~mask,
+              the 'Above' output keeps mask, plus the voxels equal to the threshold, which both outputs keep.
+              Integer voxels are multiplied by the mask (exact, and without the branches of a masked copy);
+              float voxels go through copyto where=mask, so that -0.0, inf and NaN are kept as thresholdArray() does.
+              Masks are the two comparisons of thresholdMaskArray() on the cached slab.
+              Returns (arr_Output, arr_OutputInverted).    """
+    import numpy as np
+    dtype_Output = np.uint8 if bool_BinaryMask else arr_Input.dtype
+    if arr_Output is None:
+        arr_Output = np.empty(arr_Input.shape, dtype=dtype_Output)
+    if arr_OutputInverted is None:
+        arr_OutputInverted = np.empty(arr_Input.shape, dtype=dtype_Output)
+    value = castThresholdToScalarType(imageThreshold, arr_Input.dtype)
+    bool_Integer = np.issubdtype(arr_Input.dtype, np.integer)
+    # 'Below' output: voxels < value set to 0;   'Above' output: voxels > value set to 0
+    arr_Below, arr_Above = (arr_OutputInverted, arr_Output) if invert else (arr_Output, arr_OutputInverted)
+
+    def thresholdSlab(slab):
+        arr_Slab, arr_SlabBelow, arr_SlabAbove = arr_Input[slab], arr_Below[slab], arr_Above[slab]
+        if bool_BinaryMask:
+            np.greater_equal(arr_Slab, value, out=arr_SlabBelow)
+            np.less_equal(arr_Slab, value, out=arr_SlabAbove)
+            return
+        mask_Less = np.less(arr_Slab, value)
+        if bool_Integer:
+            np.multiply(arr_Slab, mask_Less, out=arr_SlabAbove)
+            np.logical_not(mask_Less, out=mask_Less)
+            np.multiply(arr_Slab, mask_Less, out=arr_SlabBelow)
+        else:
+            np.copyto(arr_SlabBelow, arr_Slab)
+            np.copyto(arr_SlabBelow, 0, where=mask_Less)
+            np.copyto(arr_SlabAbove, 0)
+            np.copyto(arr_SlabAbove, arr_Slab, where=mask_Less)
+            np.copyto(arr_SlabAbove, arr_Slab, where=np.isnan(arr_Slab))     # NaN: neither < nor >, kept by both
+        #   Ties, in the mask scratch (no longer needed): voxels == value, kept by the 'Above' output as well
+        np.copyto(arr_SlabAbove, arr_Slab, where=np.equal(arr_Slab, value, out=mask_Less))
+
+    runOverSlabs(thresholdSlab, arr_Input.shape[0], obtainSlabDepth(arr_Input), int_NumberOfThreads)
+    return arr_Output, arr_OutputInverted
+
+# ----------------------------------------------------------------------------------------------------------------------
+def thresholdMaskArray(arr_Input, imageThreshold, invert=False, arr_Output=None):
+    """    Binary mask of the voxels that thresholdArray() keeps, as uint8 (1 byte per voxel, whatever the input type):
+              'Below' (invert=False):   1 where voxel >= imageThreshold, else 0
+              'Above' (invert=True):    1 where voxel <= imageThreshold, else 0
+           Writes into arr_Output (uint8, same shape as arr_Input) if given, and returns the mask array.    """
+    import numpy as np
+    value = castThresholdToScalarType(imageThreshold, arr_Input.dtype)
+    if arr_Output is None:
+        arr_Output = np.empty(arr_Input.shape, dtype=np.uint8)
+    if invert:
+        np.less_equal(arr_Input, value, out=arr_Output)
+    else:
+        np.greater_equal(arr_Input, value, out=arr_Output)
+    return arr_Output
+
+# ----------------------------------------------------------------------------------------------------------------------
+def thresholdMaskArrayBitPacked(arr_Input, imageThreshold, invert=False, int_NumberOfThreads=1):
+    """    thresholdMaskArray() packed 8 voxels per byte (np.packbits of the C-order flat mask, big bit order).
+              Slab by slab, so the full uint8 mask is never allocated: only the packed array and one slab mask.    """
+    import numpy as np
+    int_SliceVoxels = max(int(np.prod(arr_Input.shape[1:], dtype=np.int64)), 1)
+    arr_Packed = np.empty((arr_Input.size + 7) // 8, dtype=np.uint8)
+    # Slabs of a multiple of 8 slices start on a byte of arr_Packed, whatever the slice size
+    int_SlabDepth = -(-obtainSlabDepth(arr_Input) // 8) * 8
+
+    def packSlab(slab):
+        arr_Mask = thresholdMaskArray(arr_Input[slab], imageThreshold, invert)
+        idx_Start = slab.start * int_SliceVoxels // 8
+        arr_Packed[idx_Start:idx_Start + (arr_Mask.size + 7) // 8] = np.packbits(arr_Mask.reshape(-1))
+
+    runOverSlabs(packSlab, arr_Input.shape[0], int_SlabDepth, int_NumberOfThreads)
+    return arr_Packed
+
+# ----------------------------------------------------------------------------------------------------------------------
+def thresholdMultiLevelArray(arr_Input, list_CutPoints, arr_Output=None, int_NumberOfThreads=1):
+    """    Label map of the intensity bands between sorted cut points, in one slab-wise pass over arr_Input:
+              label 0 for voxels < list_CutPoints[0],  label i for list_CutPoints[i-1] <= voxel < list_CutPoints[i],
+              label n for voxels >= list_CutPoints[-1]   (each cut point is a 'Below' threshold of thresholdArray()).
+           Cut points are cast with castThresholdToScalarType(), and must still be strictly increasing once cast
+           (e.g. 100.2 and 100.7 are both 100 for an integer input, and would leave a label empty).
+           The label histogram is counted on each slab while it is in the CPU cache, so the counts cost no extra pass
+           over the volume.
+           :return: (arr_Labels uint8, or uint16 above 255 labels;   arr_Counts int64, voxels per label 0..n)    """
+    import numpy as np
+    if len(list_CutPoints) == 0:
+        raise ValueError(f'SL_Alert! Cut points must be a non-empty, strictly increasing list: {list_CutPoints}')
+    int_NumberOfLabels = len(list_CutPoints) + 1
+    arr_Cuts = np.array([castThresholdToScalarType(c, arr_Input.dtype) for c in list_CutPoints], dtype=arr_Input.dtype)
+    if not np.all(arr_Cuts[1:] > arr_Cuts[:-1]):
+        raise ValueError(f'SL_Alert! Cut points must be strictly increasing in the scalar type {arr_Input.dtype}: '
+                         f'{list_CutPoints} -> {arr_Cuts.tolist()}')
+    if arr_Output is None:
+        arr_Output = np.empty(arr_Input.shape, dtype=np.uint8 if int_NumberOfLabels <= 256 else np.uint16)
+    dict_SlabCounts = {}
+
+    def labelSlab(slab):
+        arr_SlabLabels = np.searchsorted(arr_Cuts, arr_Input[slab], side='right')
+        arr_Output[slab] = arr_SlabLabels
+        dict_SlabCounts[slab.start] = np.bincount(arr_SlabLabels.reshape(-1), minlength=int_NumberOfLabels)
+
+    runOverSlabs(labelSlab, arr_Input.shape[0], obtainSlabDepth(arr_Input), int_NumberOfThreads)
+    arr_Counts = np.zeros(int_NumberOfLabels, dtype=np.int64)
+    for arr_SlabCounts in dict_SlabCounts.values():
+        arr_Counts += arr_SlabCounts
+    return arr_Output, arr_Counts
+
+# ----------------------------------------------------------------------------------------------------------------------
+def saveBitPackedMask(str_OutputPath, arr_Packed, tuple_Shape, arr_IJKToRAS):
+    """    Sidecar file (.npz, uncompressed) of a thresholdMaskArrayBitPacked() mask, with the voxel array shape
+              (K, J, I) and the IJKToRAS matrix of the input, so that the mask keeps the geometry of the input.    """
+    import numpy as np
+    with open(str_OutputPath, 'wb') as file:
+        np.savez(file, Packed=arr_Packed, Shape=np.asarray(tuple_Shape, dtype=np.int64),
+                 IJKToRAS=np.asarray(arr_IJKToRAS, dtype=np.float64))
+
+# ----------------------------------------------------------------------------------------------------------------------
+def loadBitPackedMask(str_MaskPath):
+    """    Read a saveBitPackedMask() sidecar.   :return: (arr_Mask uint8 of the saved shape, arr_IJKToRAS)    """
+    import numpy as np
+    with np.load(str_MaskPath) as npz:
+        tuple_Shape = tuple(int(n) for n in npz['Shape'])
+        int_Voxels = int(np.prod(tuple_Shape, dtype=np.int64))
+        arr_Mask = np.unpackbits(npz['Packed'], count=int_Voxels).reshape(tuple_Shape)
+        return arr_Mask, npz['IJKToRAS']
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Sorted-Voxel Index:   repeated threshold queries on the same input, sub-linear  ----------------------
+class SortedVoxelIndex:
+    """    Voxel intensities of one input array in sorted order, with their flat positions (argsort).
+              Between two thresholds, the voxels whose state flips are one contiguous run of the sorted order,
+              found by binary search: a threshold change only touches those voxels instead of the whole array.    """
+
+    def __init__(self, arr_Input):
+        import numpy as np
+        arr_Flat = arr_Input.reshape(-1)
+        dtype_Position = np.int32 if arr_Flat.size < 2**31 else np.int64
+        self.arr_SortedPositions = np.argsort(arr_Flat, kind='stable').astype(dtype_Position, copy=False)
+        self.arr_SortedValues = arr_Flat[self.arr_SortedPositions]
+        self.dtype = arr_Input.dtype
+        self.tuple_Shape = arr_Input.shape
+        # Output arrays thresholded from this input:   id  ->  (threshold value, invert, token of the output state)
+        self.dict_OutputState = {}
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainMemoryBytes(self):
+        """    Bytes held by the index.    """
+        return self.arr_SortedPositions.nbytes + self.arr_SortedValues.nbytes
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainFlipRange(self, value_Old, value_New, invert=False):
+        """    [idx_Start, idx_Stop) in the sorted order of the voxels whose state flips from value_Old to value_New.
+                  'Below' (set to 0 if  < value):   value_Lo <= voxel <  value_Hi
+                  'Above' (set to 0 if  > value):   value_Lo <  voxel <= value_Hi    """
+        import numpy as np
+        value_Lo, value_Hi = min(value_Old, value_New), max(value_Old, value_New)
+        str_Side = 'right' if invert else 'left'
+        return (int(np.searchsorted(self.arr_SortedValues, value_Lo, side=str_Side)),
+                int(np.searchsorted(self.arr_SortedValues, value_Hi, side=str_Side)))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def updateThresholdedArray(self, arr_Output, value_Old, value_New, invert=False):
+        """    Turn arr_Output, thresholded at value_Old, into the thresholdArray() result at value_New in place.
+                  Values are cast with castThresholdToScalarType(). :return: number of voxels written.    """
+        value_Old = castThresholdToScalarType(value_Old, self.dtype)
+        value_New = castThresholdToScalarType(value_New, self.dtype)
+        idx_Start, idx_Stop = self.obtainFlipRange(value_Old, value_New, invert)
+        if idx_Start == idx_Stop:
+            return 0
+        arr_OutputFlat = arr_Output.reshape(-1)
+        arr_Positions = self.arr_SortedPositions[idx_Start:idx_Stop]
+        # 'Below' zeroes more voxels as the threshold goes up, 'Above' as it goes down; the other way restores them
+        bool_SetToZero = (value_New > value_Old) != invert
+        arr_OutputFlat[arr_Positions] = 0 if bool_SetToZero else self.arr_SortedValues[idx_Start:idx_Stop]
+        return idx_Stop - idx_Start
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Intensity Histogram:   automatic threshold suggestions from one slab-wise pass  ---------------------
+class IntensityHistogram:
+    """    Histogram of the voxel intensities of one input array, counted slab by slab in one pass.
+              [value_Min, value_Max] is the intensity range (e.g. the scalar range VTK already keeps for display);
+              computed from arr_Input if not given. Integer inputs whose range fits in int_NumberOfBins get
+              one bin per integer value, so their suggestions are exact.    """
+
+    def __init__(self, arr_Input, int_NumberOfBins=INT_HistogramBins_Default, value_Min=None, value_Max=None,
+                 int_NumberOfThreads=1):
+        import numpy as np
+        if value_Min is None or value_Max is None:
+            value_Min, value_Max = arr_Input.min().item(), arr_Input.max().item()
+        self.bool_Integer = bool(np.issubdtype(arr_Input.dtype, np.integer))
+        if self.bool_Integer and value_Max - value_Min + 1 <= int_NumberOfBins:
+            int_NumberOfBins = int(value_Max - value_Min + 1)
+            tuple_Range = (value_Min - 0.5, value_Max + 0.5)
+        else:
+            tuple_Range = (float(value_Min), float(value_Max) if value_Max > value_Min else float(value_Min) + 1.0)
+        self.arr_Edges = np.linspace(tuple_Range[0], tuple_Range[1], int_NumberOfBins + 1)
+        dict_SlabCounts = {}
+
+        def countSlab(slab):
+            dict_SlabCounts[slab.start] = np.histogram(arr_Input[slab], bins=int_NumberOfBins, range=tuple_Range)[0]
+
+        runOverSlabs(countSlab, arr_Input.shape[0], obtainSlabDepth(arr_Input), int_NumberOfThreads)
+        self.arr_Counts = np.zeros(int_NumberOfBins, dtype=np.int64)
+        for arr_SlabCounts in dict_SlabCounts.values():
+            self.arr_Counts += arr_SlabCounts
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainCenters(self):
+        return 0.5 * (self.arr_Edges[:-1] + self.arr_Edges[1:])
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def finalizeThreshold(self, value):
+        """    Threshold for process(): rounded up for integer inputs, as process() truncates toward zero.    """
+        import math
+        return float(math.ceil(value)) if self.bool_Integer else float(value)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainOtsuThreshold(self):
+        """    Otsu: the split of the histogram into two classes of maximal between-class variance.
+                  :return: the lower edge of the upper class (voxels >= the threshold are kept by process()).    """
+        import numpy as np
+        arr_Weights = self.arr_Counts.astype(np.float64)
+        arr_Centers = self.obtainCenters()
+        arr_W0 = np.cumsum(arr_Weights)[:-1]
+        arr_W1 = arr_Weights.sum() - arr_W0
+        arr_Sum0 = np.cumsum(arr_Weights * arr_Centers)[:-1]
+        arr_Sum1 = (arr_Weights * arr_Centers).sum() - arr_Sum0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            arr_BetweenVariance = arr_W0 * arr_W1 * (arr_Sum0 / arr_W0 - arr_Sum1 / arr_W1) ** 2
+        if arr_BetweenVariance.size == 0 or not np.isfinite(arr_BetweenVariance).any():
+            return self.finalizeThreshold(self.arr_Edges[0])
+        idx_Split = int(np.nanargmax(np.where(np.isfinite(arr_BetweenVariance), arr_BetweenVariance, np.nan)))
+        return self.finalizeThreshold(self.arr_Edges[idx_Split + 1])
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainPercentileThreshold(self, float_Percentile):
+        """    Intensity below which float_Percentile % of the voxels lie, interpolated linearly within its bin.    """
+        import numpy as np
+        if not 0.0 <= float_Percentile <= 100.0:
+            raise ValueError(f'SL_Alert! Invalid percentile = {float_Percentile}')
+        arr_Cumulative = np.cumsum(self.arr_Counts)
+        float_Target = float_Percentile / 100.0 * arr_Cumulative[-1]
+        idx_Bin = min(int(np.searchsorted(arr_Cumulative, float_Target, side='left')), len(self.arr_Counts) - 1)
+        int_Before = arr_Cumulative[idx_Bin] - self.arr_Counts[idx_Bin]
+        float_Fraction = (float_Target - int_Before) / self.arr_Counts[idx_Bin] if self.arr_Counts[idx_Bin] else 0.0
+        value = self.arr_Edges[idx_Bin] + float_Fraction * (self.arr_Edges[idx_Bin + 1] - self.arr_Edges[idx_Bin])
+        return self.finalizeThreshold(value)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainValleyThreshold(self):
+        """    Least populated bin between the two highest modes of the smoothed histogram;
+                  Otsu threshold if the histogram has less than two modes.    """
+        import numpy as np
+        int_Window = max(len(self.arr_Counts) // 64, 1) | 1      # Odd moving-average window
+        arr_Smooth = np.convolve(self.arr_Counts.astype(np.float64), np.ones(int_Window) / int_Window, mode='same')
+        arr_Peaks = np.flatnonzero((arr_Smooth[1:-1] > arr_Smooth[:-2]) & (arr_Smooth[1:-1] >= arr_Smooth[2:])) + 1
+        if len(arr_Peaks) < 2:
+            return self.obtainOtsuThreshold()
+        idx_Lo, idx_Hi = sorted(arr_Peaks[np.argsort(arr_Smooth[arr_Peaks])[-2:]])
+        idx_Valley = idx_Lo + int(np.argmin(arr_Smooth[idx_Lo:idx_Hi + 1]))
+        return self.finalizeThreshold(self.obtainCenters()[idx_Valley])
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Result Cache:   LRU of threshold outputs within a memory budget  ---------------------------------------
+class ThresholdResultCache:
+    """    Least-recently-used cache of threshold output arrays, bounded by int_BudgetBytes.
+              Keys are hashable tuples, e.g. (input ID, input modification time, threshold, invert).    """
+
+    def __init__(self, int_BudgetBytes=INT_ResultCacheBudgetBytes_Default):
+        from collections import OrderedDict
+        self.dict_Entries = OrderedDict()     # key -> array, least recently used first
+        self.int_BudgetBytes = int_BudgetBytes
+        self.int_Bytes = 0
+        self.int_Hits = 0
+        self.int_Misses = 0
+        self.int_Evictions = 0
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def get(self, key):
+        """    Cached array of key (now most recently used), or None.    """
+        arr = self.dict_Entries.get(key)
+        if arr is None:
+            self.int_Misses += 1
+            return None
+        self.dict_Entries.move_to_end(key)
+        self.int_Hits += 1
+        return arr
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def put(self, key, arr):
+        """    Store arr (not copied: the caller must not modify it afterwards), evicting least recently used entries
+                  until the budget is respected. An array larger than the whole budget is not stored.    """
+        self.remove(key)
+        if arr.nbytes > self.int_BudgetBytes:
+            return
+        while self.dict_Entries and self.int_Bytes + arr.nbytes > self.int_BudgetBytes:
+            _, arr_Evicted = self.dict_Entries.popitem(last=False)
+            self.int_Bytes -= arr_Evicted.nbytes
+            self.int_Evictions += 1
+        self.dict_Entries[key] = arr
+        self.int_Bytes += arr.nbytes
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def isStorable(self, int_Bytes):
+        """    False if an array of int_Bytes would not be stored, e.g. the cache is disabled with a budget of 0.    """
+        return int_Bytes <= self.int_BudgetBytes
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def remove(self, key):
+        arr = self.dict_Entries.pop(key, None)
+        if arr is not None:
+            self.int_Bytes -= arr.nbytes
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def removeEntries(self, fn_KeyFilter):
+        """    Remove the entries whose key passes fn_KeyFilter(key), e.g. all the results of one input.
+                  :return: number of entries removed    """
+        list_Keys = [key for key in self.dict_Entries if fn_KeyFilter(key)]
+        for key in list_Keys:
+            self.remove(key)
+        return len(list_Keys)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def setBudgetBytes(self, int_BudgetBytes):
+        """    New budget; 0 disables the cache. Evicts least recently used entries beyond it.    """
+        self.int_BudgetBytes = int_BudgetBytes
+        while self.dict_Entries and self.int_Bytes > self.int_BudgetBytes:
+            _, arr_Evicted = self.dict_Entries.popitem(last=False)
+            self.int_Bytes -= arr_Evicted.nbytes
+            self.int_Evictions += 1
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def clear(self):
+        self.dict_Entries.clear()
+        self.int_Bytes = 0
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainStats(self):
+        return {'Hits': self.int_Hits, 'Misses': self.int_Misses, 'Evictions': self.int_Evictions,
+                'Entries': len(self.dict_Entries), 'Bytes': self.int_Bytes, 'BudgetBytes': self.int_BudgetBytes}
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Streaming Threshold:   memory-mapped NRRD / raw files, slab by slab  -------------------------------
+def readNrrdHeader(str_NrrdPath):
+    """    Parse the header of a NRRD file (raw or gzip encoding; only raw can be memory-mapped).
+              'line skip' lines, then 'byte skip' bytes (raw only), are skipped before the voxels, attached or detached.
+              :return: (dict_Header, str_DataPath, int_DataOffset)   where the voxels start in str_DataPath.    """
+    list_HeaderLines = []
+    with open(str_NrrdPath, 'rb') as f:
+        if not f.readline().startswith(b'NRRD'):
+            raise ValueError(f'SL_Alert! Not a NRRD file: {str_NrrdPath}')
+        for bytes_Line in f:
+            str_Line = bytes_Line.decode('ascii', errors='replace').rstrip('\r\n')
+            if not str_Line:
+                break
+            list_HeaderLines.append(str_Line)
+        int_AttachedDataOffset = f.tell()
+
+    dict_Header = {}
+    for str_Line in list_HeaderLines:
+        if str_Line.startswith('#') or ':=' in str_Line or ': ' not in str_Line:
+            continue    # comment or key/value pair, not a field
+        str_Field, str_Value = str_Line.split(': ', 1)
+        dict_Header[str_Field.strip().lower()] = str_Value.strip()
+
+    if obtainNrrdEncoding(dict_Header) not in ('raw', 'gzip'):
+        raise ValueError(f'SL_Alert! Unsupported NRRD encoding = {dict_Header["encoding"]}: {str_NrrdPath}')
+    int_LineSkip = int(dict_Header.get('line skip', dict_Header.get('lineskip', '0')))
+    int_ByteSkip = int(dict_Header.get('byte skip', dict_Header.get('byteskip', '0')))
+    if int_LineSkip < 0 or int_ByteSkip < 0:
+        raise ValueError(f'SL_Alert! Negative line skip / byte skip is not supported: {str_NrrdPath}')
+    if int_ByteSkip and obtainNrrdEncoding(dict_Header) != 'raw':
+        raise ValueError(f'SL_Alert! byte skip of compressed data is not supported: {str_NrrdPath}')
+
+    str_DataFile = dict_Header.get('data file', dict_Header.get('datafile'))
+    if str_DataFile is None:
+        str_DataPath, int_DataOffset = str_NrrdPath, int_AttachedDataOffset
+    else:
+        if ' ' in str_DataFile or '%' in str_DataFile:
+            raise ValueError(f'SL_Alert! Multi-file NRRD data is not supported: {str_DataFile}')
+        str_DataPath = os.path.join(os.path.dirname(os.path.abspath(str_NrrdPath)), str_DataFile)
+        int_DataOffset = 0
+    if int_LineSkip:
+        with open(str_DataPath, 'rb') as f:
+            f.seek(int_DataOffset)
+            for idx_Line in range(int_LineSkip):
+                if not f.readline():
+                    raise ValueError(f'SL_Alert! line skip: {int_LineSkip} is past the end of {str_DataPath}')
+            int_DataOffset = f.tell()
+    return dict_Header, str_DataPath, int_DataOffset + int_ByteSkip
+
+# ----------------------------------------------------------------------------------------------------------------------
+def obtainNrrdEncoding(dict_Header):
+    """    'raw' or 'gzip' (also written 'gz'), or the encoding as found in the header.    """
+    str_Encoding = dict_Header.get('encoding', 'raw').lower()
+    return 'gzip' if str_Encoding == 'gz' else str_Encoding
+
+# ----------------------------------------------------------------------------------------------------------------------
+def obtainNrrdArrayType(dict_Header):
+    """    NumPy dtype and array shape of the voxels. NRRD lists sizes fastest axis first, NumPy slowest first.    """
+    import numpy as np
+    str_NrrdType = dict_Header['type']
+    if str_NrrdType not in DICT_NrrdType_to_NumPyType:
+        raise ValueError(f'SL_Alert! Unsupported NRRD type = {str_NrrdType}')
+    str_ByteOrder = '>' if dict_Header.get('endian', 'little') == 'big' else '<'
+    dtype = np.dtype(str_ByteOrder + DICT_NrrdType_to_NumPyType[str_NrrdType])
+    tuple_Shape = tuple(int(str_Size) for str_Size in reversed(dict_Header['sizes'].split()))
+    return dtype, tuple_Shape
+
+# ----------------------------------------------------------------------------------------------------------------------
+def writeNrrdHeaderForRawOutput(str_InputPath, str_OutputPath):
+    """    Write an attached-header raw NRRD with the fields (geometry, type, endian) of str_InputPath,
+              and reserve the space of the voxels. Voxels are then written through memory-mapped windows.
+              :return: offset of the voxels in str_OutputPath    """
+    dict_Header, str_DataPath, int_DataOffset = readNrrdHeader(str_InputPath)
+    dtype, tuple_Shape = obtainNrrdArrayType(dict_Header)
+    list_DroppedFields = ('data file', 'datafile', 'byte skip', 'byteskip', 'line skip', 'lineskip', 'encoding')
+
+    list_OutputLines = []
+    with open(str_InputPath, 'rb') as f:
+        list_OutputLines.append(f.readline().decode('ascii').rstrip('\r\n'))
+        for bytes_Line in f:
+            str_Line = bytes_Line.decode('ascii', errors='replace').rstrip('\r\n')
+            if not str_Line:
+                break
+            if ': ' in str_Line and str_Line.split(': ', 1)[0].strip().lower() in list_DroppedFields:
+                continue
+            list_OutputLines.append(str_Line)
+    list_OutputLines.append('encoding: raw')
+
+    int_DataBytes = dtype.itemsize
+    for int_Size in tuple_Shape:
+        int_DataBytes *= int_Size
+    with open(str_OutputPath, 'wb') as f:
+        f.write(('\n'.join(list_OutputLines) + '\n\n').encode('ascii'))
+        int_DataOffset = f.tell()
+        f.truncate(int_DataOffset + int_DataBytes)
+    return int_DataOffset
+
+# ----------------------------------------------------------------------------------------------------------------------
+def thresholdRawFileStreaming(str_InputPath, int_InputOffset, str_OutputPath, int_OutputOffset, dtype, tuple_Shape,
+                              imageThreshold, invert=False, int_SlabBytes=INT_StreamingSlabBytes_Default):
+    """    thresholdArray() from a raw voxel file to another, slab by slab along axis 0 (the slowest axis).
+              Each slab is a pair of memory-mapped windows (input read-only, output read-write) that is unmapped
+              before the next one, so only the touched pages of one slab are resident at any time.
+              Voxels start at int_InputOffset / int_OutputOffset in the files (raw file, or NRRD header size),
+              and str_OutputPath must already be large enough, e.g. reserved by writeNrrdHeaderForRawOutput().
+              No memory measurement here (see test_t_ApplyThreshold_Streaming), the statistics are of the sweep only.
+              :return: dict   {'Voxels', 'DataBytes', 'Slabs', 'SlabDepth', 'MappedWindowBytes', 'Seconds'}
+                       MappedWindowBytes: size of the in + out windows of one slab, by layout (not a measured peak)    """
+    import time
+    import numpy as np
+
+    startTime = time.perf_counter()
+    int_SliceVoxels = 1
+    for int_Size in tuple_Shape[1:]:
+        int_SliceVoxels *= int_Size
+    int_SliceBytes = max(int_SliceVoxels * dtype.itemsize, 1)
+    int_DataBytes = int_SliceBytes * tuple_Shape[0]
+    if os.path.getsize(str_OutputPath) < int_OutputOffset + int_DataBytes:
+        raise ValueError(f'SL_Alert! Output file is smaller than the voxel data: {str_OutputPath}')
+    int_SlabDepth = max(int_SlabBytes // int_SliceBytes, 1)
+
+    int_NumberOfSlabs = 0
+    for slab in iterSlabSlices(tuple_Shape[0], int_SlabDepth):
+        tuple_SlabShape = (slab.stop - slab.start,) + tuple(tuple_Shape[1:])
+        arr_InSlab = np.memmap(str_InputPath, dtype=dtype, mode='r', shape=tuple_SlabShape,
+                               offset=int_InputOffset + slab.start * int_SliceBytes)
+        arr_OutSlab = np.memmap(str_OutputPath, dtype=dtype, mode='r+', shape=tuple_SlabShape,
+                                offset=int_OutputOffset + slab.start * int_SliceBytes)
+        thresholdArray(arr_InSlab, imageThreshold, invert, arr_OutSlab)
+        arr_OutSlab.flush()
+        del arr_InSlab, arr_OutSlab     # Unmap the slab before mapping the next one
+        int_NumberOfSlabs += 1
+
+    return {
+        'Voxels': int_SliceVoxels * tuple_Shape[0],
+        'DataBytes': int_DataBytes,
+        'Slabs': int_NumberOfSlabs,
+        'SlabDepth': int_SlabDepth,
+        'MappedWindowBytes': 2 * min(int_SlabDepth, tuple_Shape[0]) * int_SliceBytes,
+        'Seconds': time.perf_counter() - startTime,
+    }
+
+# ----------------------------------------------------------------------------------------------------------------------
+def thresholdNrrdFileStreaming(str_InputPath, str_OutputPath, imageThreshold, invert=False,
+                               int_SlabBytes=INT_StreamingSlabBytes_Default):
+    """    thresholdRawFileStreaming() from a raw-encoded NRRD (attached or detached header)
+              into an attached-header raw NRRD with the same geometry and scalar type.
+              :return: dict of statistics, see thresholdRawFileStreaming().    """
+    dict_Header, str_DataPath, int_DataOffset = readNrrdHeader(str_InputPath)
+    if obtainNrrdEncoding(dict_Header) != 'raw':
+        raise ValueError(f'SL_Alert! Streaming needs raw encoding, got {dict_Header["encoding"]}: {str_InputPath}')
+    dtype, tuple_Shape = obtainNrrdArrayType(dict_Header)
+    int_OutputOffset = writeNrrdHeaderForRawOutput(str_InputPath, str_OutputPath)
+    return thresholdRawFileStreaming(str_DataPath, int_DataOffset, str_OutputPath, int_OutputOffset,
+                                     dtype, tuple_Shape, imageThreshold, invert, int_SlabBytes)
+
+# ----------------------------------------------------------------------------------------------------------------------
+def readNrrdArray(str_NrrdPath):
+    """    Read the whole voxel array of a raw or gzip NRRD file into memory.    """
+    import gzip
+    import numpy as np
+    dict_Header, str_DataPath, int_DataOffset = readNrrdHeader(str_NrrdPath)
+    dtype, tuple_Shape = obtainNrrdArrayType(dict_Header)
+    with open(str_DataPath, 'rb') as f:
+        f.seek(int_DataOffset)
+        if obtainNrrdEncoding(dict_Header) == 'gzip':
+            with gzip.GzipFile(fileobj=f) as f_Gzip:
+                bytes_Data = f_Gzip.read()
+        else:
+            bytes_Data = f.read()
+    return np.frombuffer(bytes_Data, dtype=dtype, count=int(np.prod(tuple_Shape))).reshape(tuple_Shape)
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Batch Threshold:   worker functions of the process pool, picklable, no Slicer import  ------------
+def writeNrrdHeaderForArray(str_OutputPath, dtype, tuple_Shape, arr_IJKToRAS):
+    """    Write an attached-header raw NRRD for a [K, J, I] (scalar) or [K, J, I, C] (vector) voxel array
+              with the IJKToRAS matrix of its volume node, and reserve the space of the voxels.
+              :return: offset of the voxels in str_OutputPath    """
+    import numpy as np
+    dtype = np.dtype(dtype)
+    # NRRD space is LPS, the volume node IJKToRAS is RAS
+    arr_IJKToLPS = np.array(arr_IJKToRAS, dtype=float)[:3, :]
+    arr_IJKToLPS[:2, :] *= -1
+    str_Directions = ' '.join('(' + ','.join(repr(float(v) + 0.0) for v in arr_IJKToLPS[:, i]) + ')' for i in range(3))
+    str_Origin = '(' + ','.join(repr(float(v) + 0.0) for v in arr_IJKToLPS[:, 3]) + ')'
+    list_SizesIJK = [str(int_Size) for int_Size in reversed(tuple_Shape[:3])]
+    if len(tuple_Shape) == 4:
+        str_Sizes, str_Kinds = ' '.join([str(tuple_Shape[3])] + list_SizesIJK), 'vector domain domain domain'
+        str_Directions = 'none ' + str_Directions
+    else:
+        str_Sizes, str_Kinds = ' '.join(list_SizesIJK), 'domain domain domain'
+
+    list_OutputLines = [
+        'NRRD0004',
+        f'type: {DICT_NumPyType_to_NrrdType[dtype.kind + str(dtype.itemsize)]}',
+        f'dimension: {len(tuple_Shape)}',
+        'space: left-posterior-superior',
+        f'sizes: {str_Sizes}',
+        f'space directions: {str_Directions}',
+        f'kinds: {str_Kinds}',
+        f'endian: {"big" if dtype.byteorder == ">" else "little"}',
+        'encoding: raw',
+        f'space origin: {str_Origin}',
+    ]
+    with open(str_OutputPath, 'wb') as f:
+        f.write(('\n'.join(list_OutputLines) + '\n\n').encode('ascii'))
+        int_DataOffset = f.tell()
+        f.truncate(int_DataOffset + int(np.prod(tuple_Shape)) * dtype.itemsize)
+    return int_DataOffset
+
+# ----------------------------------------------------------------------------------------------------------------------
+def thresholdNrrdFile(str_InputPath, str_OutputPath, imageThreshold, invert=False):
+    """    Batch worker for a file: streaming for a raw NRRD, in memory for a gzip NRRD.
+              The output is an attached-header raw NRRD with the geometry and scalar type of the input.    """
+    dict_Header, str_DataPath, int_DataOffset = readNrrdHeader(str_InputPath)
+    if obtainNrrdEncoding(dict_Header) == 'raw':
+        thresholdNrrdFileStreaming(str_InputPath, str_OutputPath, imageThreshold, invert)
+        return
+    import numpy as np
+    arr_Input = readNrrdArray(str_InputPath)
+    int_OutputOffset = writeNrrdHeaderForRawOutput(str_InputPath, str_OutputPath)
+    arr_Output = np.memmap(str_OutputPath, dtype=arr_Input.dtype, mode='r+', shape=arr_Input.shape,
+                           offset=int_OutputOffset)
+    thresholdArray(arr_Input, imageThreshold, invert, arr_Output)
+    arr_Output.flush()
+
+# ----------------------------------------------------------------------------------------------------------------------
+def writeArrayToNrrdFile(str_OutputPath, arr_Input, arr_IJKToRAS):
+    """    Attached-header raw NRRD of a voxel array and the IJKToRAS matrix of its volume node, e.g. to hand a scene
+              volume to a batch worker as a file (the worker maps it, instead of receiving the pickled array).    """
+    import numpy as np
+    int_DataOffset = writeNrrdHeaderForArray(str_OutputPath, arr_Input.dtype, arr_Input.shape, arr_IJKToRAS)
+    with open(str_OutputPath, 'r+b') as f:
+        f.seek(int_DataOffset)
+        f.write(memoryview(np.ascontiguousarray(arr_Input)).cast('B'))
+
+# ----------------------------------------------------------------------------------------------------------------------
+def runBatchTask(fn_Worker, str_Input, str_OutputPath, *args):
+    """    Run one volume of a batch; never raises, so that a failing volume does not stop the batch.
+              :return: dict   {'Input', 'Output', 'Seconds', 'Error'}   where 'Error' is None on success.    """
+    import time
+    import traceback
+    startTime = time.perf_counter()
+    str_Error = None
+    try:
+        fn_Worker(*args)
+    except Exception:
+        str_Error = traceback.format_exc()
+    return {'Input': str_Input, 'Output': str_OutputPath, 'Seconds': time.perf_counter() - startTime, 'Error': str_Error}
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Background Threshold:   one task on a worker thread, cancellable between slabs  --------------------
+class BackgroundThresholdTask:
+    """    thresholdArray() (or thresholdMaskArray()) of one input array on a background thread, slab by slab.
+              Cancellable between two slabs; float_Progress is the fraction of the slices done.
+              The thread only reads arr_Input and writes arrays it allocates itself: the caller publishes
+              arr_Output / arr_OutputInverted once isDone(), from its own thread.    """
+
+    def __init__(self, arr_Input, imageThreshold, invert=False, bool_BinaryMask=False, bool_WithInverted=False,
+                 int_SlabBytes=INT_SlabBytes_Default):
+        import threading
+        self.arr_Input = arr_Input
+        self.imageThreshold = imageThreshold
+        self.invert = invert
+        self.bool_BinaryMask = bool_BinaryMask
+        self.bool_WithInverted = bool_WithInverted
+        self.int_SlabBytes = int_SlabBytes
+        # Results, set by the thread only if it ran to completion
+        self.arr_Output = None
+        self.arr_OutputInverted = None
+        self.exception = None
+        self.float_Progress = 0.0
+        self._event_Cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='BackgroundThresholdTask', daemon=True)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def start(self):
+        self._thread.start()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def cancel(self):
+        """    Ask the thread to stop before its next slab; the outputs are then never set.    """
+        self._event_Cancel.set()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def isCancelled(self):
+        return self._event_Cancel.is_set()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def isDone(self):
+        """    True once the thread has been started and has returned: completed, cancelled or failed.    """
+        return self._thread.ident is not None and not self._thread.is_alive()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def wait(self, float_Timeout=None):
+        """    Block until the thread returns, or float_Timeout seconds. :return: isDone()    """
+        self._thread.join(float_Timeout)
+        return self.isDone()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def _run(self):
+        import numpy as np
+        try:
+            arr_Input = self.arr_Input
+            dtype_Output = np.uint8 if self.bool_BinaryMask else arr_Input.dtype
+            fn_Threshold = thresholdMaskArray if self.bool_BinaryMask else thresholdArray
+            arr_Output = np.empty(arr_Input.shape, dtype=dtype_Output)
+            arr_OutputInverted = np.empty(arr_Input.shape, dtype=dtype_Output) if self.bool_WithInverted else None
+            int_NumberOfSlices = arr_Input.shape[0]
+            for slab in iterSlabSlices(int_NumberOfSlices, obtainSlabDepth(arr_Input, self.int_SlabBytes)):
+                if self._event_Cancel.is_set():
+                    return
+                fn_Threshold(arr_Input[slab], self.imageThreshold, self.invert, arr_Output[slab])
+                if arr_OutputInverted is not None:
+                    fn_Threshold(arr_Input[slab], self.imageThreshold, not self.invert, arr_OutputInverted[slab])
+                self.float_Progress = slab.stop / int_NumberOfSlices
+            self.arr_Output, self.arr_OutputInverted = arr_Output, arr_OutputInverted
+        except Exception as e:
+            self.exception = e
@@ -0,0 +1,165 @@
+'''=================================================================================================================='''
+'''=================================================================================================================='''
+#
+# t_ApplyThresholdLib.TypedParameterNode
+#       Typed, cached access to the parameters and node references of a module parameter node
+#       (vtkMRMLScriptedModuleNode), instead of str() / float() / "true"-"false" round trips at every access:
+#           parameters = TypedParameterNode(parameterNode, {"Threshold": float, "Invert": bool}, ("InputVolume",))
+#           parameters.get("Threshold")  ->  100.0         parameters.getNode("InputVolume")  ->  vtkMRMLNode or None
+#           with parameters.batch():                        one StartModify/EndModify, one ModifiedEvent
+#               parameters.set("Threshold", 120.0);  parameters.set("Invert", True)
+#       Decoded values and referenced nodes are cached until the next ModifiedEvent of the node. After it, a parameter
+#       is decoded again only if its string changed; writing the value a parameter already has is skipped.
+#       No Slicer import: the parameter node is used through its VTK/MRML methods only.
+#
+'''------------------------- STRING Macro of  TypedParameterNode ----------------------------------------------------'''
+'''------------------------------------------------------------------------------------------------------------------'''
+STR_True                                = "true"
+STR_False                               = "false"
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Encoding:   Python value  <->  parameter string  ------------------------------------------------------
+def encodeParameterValue(value, type_Value):
+    """    Parameter string of value: bools as "true"/"false" (as the modules always stored them), others with str().    """
+    if type_Value is bool:
+        return STR_True if value else STR_False
+    return str(type_Value(value))
+
+# ----------------------------------------------------------------------------------------------------------------------
+def decodeParameterValue(str_Value, type_Value):
+    """    Value of a parameter string; None for an unset parameter ("").    """
+    if str_Value == "":
+        return None
+    if type_Value is bool:
+        return str_Value == STR_True
+    return type_Value(str_Value)
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Typed Parameter Node  ---------------------------------------------------------------------------------
+class TypedParameterNode:
+    """    Typed, cached view of parameterNode.
+              dict_ParameterTypes:    {parameter name: bool, int, float or str}
+              tuple_ReferenceRoles:   node reference roles read through getNode / getNodeID
+              Call release() when the view is dropped, to remove its observer from the parameter node.    """
+
+    def __init__(self, parameterNode, dict_ParameterTypes, tuple_ReferenceRoles=()):
+        self.parameterNode = parameterNode
+        self.dict_ParameterTypes = dict(dict_ParameterTypes)
+        self.tuple_ReferenceRoles = tuple(tuple_ReferenceRoles)
+        self._dict_Values = {}          # {name: (str_Value, decoded value)}, kept across modifications
+        self._set_Valid = set()         # Names whose cached string is known current (until the next ModifiedEvent)
+        self._dict_Nodes = {}           # {role: (str_NodeID, node)}, dropped at every ModifiedEvent
+        self._int_BatchDepth = 0
+        self._int_ObserverTag = parameterNode.AddObserver("ModifiedEvent", self.onParameterNodeModified)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def release(self):
+        if self._int_ObserverTag is not None:
+            self.parameterNode.RemoveObserver(self._int_ObserverTag)
+            self._int_ObserverTag = None
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def onParameterNodeModified(self, caller=None, event=None):
+        """    Invalidate the cache, unless the modification is the end of a batch of this view: its writes are cached.    """
+        if self._int_BatchDepth == 0:
+            self._set_Valid.clear()
+            self._dict_Nodes.clear()
+
+    # ==================================================================================================================
+    # -----------        Parameters     --------------------------------------------------------------------------------
+    def get(self, str_Name):
+        """    Decoded value of parameter str_Name (None if unset), from the cache when its string did not change.    """
+        if str_Name in self._set_Valid:
+            return self._dict_Values[str_Name][1]
+        str_Value = self.parameterNode.GetParameter(str_Name)
+        tuple_Cached = self._dict_Values.get(str_Name)
+        if tuple_Cached is None or tuple_Cached[0] != str_Value:
+            tuple_Cached = (str_Value, decodeParameterValue(str_Value, self.dict_ParameterTypes[str_Name]))
+            self._dict_Values[str_Name] = tuple_Cached
+        self._set_Valid.add(str_Name)
+        return tuple_Cached[1]
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def set(self, str_Name, value):
+        """    Write parameter str_Name; nothing is written (no ModifiedEvent) if it already has this value.
+                  :return: True if the parameter was written    """
+        if self.get(str_Name) == value:
+            return False
+        str_Value = encodeParameterValue(value, self.dict_ParameterTypes[str_Name])
+        self._int_BatchDepth += 1      # Its own ModifiedEvent does not invalidate what it just cached
+        try:
+            self.parameterNode.SetParameter(str_Name, str_Value)
+        finally:
+            self._int_BatchDepth -= 1
+        self._dict_Values[str_Name] = (str_Value, decodeParameterValue(str_Value, self.dict_ParameterTypes[str_Name]))
+        self._set_Valid.add(str_Name)
+        return True
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def setDefault(self, str_Name, value):
+        """    Write parameter str_Name only if it is unset.    """
+        if self.get(str_Name) is None:
+            self.set(str_Name, value)
+
+    # ==================================================================================================================
+    # -----------        Node References    ----------------------------------------------------------------------------
+    def getNodeID(self, str_Role):
+        return self._obtainNodeEntry(str_Role)[0]
+
+    def getNode(self, str_Role):
+        return self._obtainNodeEntry(str_Role)[1]
+
+    def _obtainNodeEntry(self, str_Role):
+        tuple_Entry = self._dict_Nodes.get(str_Role)
+        if tuple_Entry is None:
+            tuple_Entry = (self.parameterNode.GetNodeReferenceID(str_Role), self.parameterNode.GetNodeReference(str_Role))
+            self._dict_Nodes[str_Role] = tuple_Entry
+        return tuple_Entry
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def setNodeID(self, str_Role, str_NodeID):
+        """    Set node reference str_Role (None to remove it); nothing is written if it already references str_NodeID.    """
+        if self.getNodeID(str_Role) == str_NodeID:
+            return False
+        self.parameterNode.SetNodeReferenceID(str_Role, str_NodeID)
+        self._dict_Nodes.pop(str_Role, None)
+        return True
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainState(self):
+        """    {parameter name: decoded value, reference role: node ID} of all the parameters and reference roles.    """
+        dict_State = {str_Name: self.get(str_Name) for str_Name in self.dict_ParameterTypes}
+        for str_Role in self.tuple_ReferenceRoles:
+            dict_State[str_Role] = self.getNodeID(str_Role)
+        return dict_State
+
+    # ==================================================================================================================
+    # -----------        Batched Writes     ----------------------------------------------------------------------------
+    def batch(self):
+        """    Context manager: the writes in the block are one StartModify/EndModify, hence at most one ModifiedEvent.    """
+        return _ParameterBatch(self)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+class _ParameterBatch:
+    """    StartModify/EndModify around a block of TypedParameterNode writes, see TypedParameterNode.batch.    """
+
+    def __init__(self, parameters):
+        self.parameters = parameters
+        self.wasModified = None
+
+    def __enter__(self):
+        self.wasModified = self.parameters.parameterNode.StartModify()
+        return self.parameters
+
+    def __exit__(self, *exc_info):
+        self.parameters._int_BatchDepth += 1    # The ModifiedEvent of EndModify reports the writes of the batch
+        try:
+            self.parameters.parameterNode.EndModify(self.wasModified)
+        finally:
+            self.parameters._int_BatchDepth -= 1
+        return False
@@ -0,0 +1 @@
+from .ThresholdEngine import *
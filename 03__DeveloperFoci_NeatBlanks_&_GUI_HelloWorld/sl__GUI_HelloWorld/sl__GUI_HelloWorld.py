@@ -162,7 +162,6 @@ class sl__GUI_HelloWorldWidget(ScriptedLoadableModuleWidget, VTKObservationMixin
         self._updatingGUIFromParameterNode = True
         # --------------------------------------------------------------------------------------------------------------
         # II. SL_Developer.  In-Brace,   Update UI widgets ()
-        print("**Widget.updateGUIFromParameterNode(self, caller=None, event=None), \tSL_Developer")
         #       II-01. Update buttons states and tooltips
         self.ui.pushButton_HelloWorld.toolTip = "Click Me and join SL Slicer Tutorial World"
         self.ui.pushButton_HelloWorld.enabled = True
@@ -176,7 +175,6 @@ class sl__GUI_HelloWorldWidget(ScriptedLoadableModuleWidget, VTKObservationMixin
         """ Read GUI Method:   Method updateParameterNodeFromGUI__ is called when users makes any change in the GUI.
               Changes are saved into the parameter node (so that they are restored when the scene is saved and loaded).
         """
-        print(f"**Widget.updateParameterNodeFromGUI(self, caller=None, event=None),     \t SL_Developer")
         if self._parameterNode is None or self._updatingGUIFromParameterNode:
             return
 
@@ -1,11 +1,17 @@
 import logging
+import math
+import os
+import time
 import vtk, qt
 
 import slicer
 from slicer.ScriptedLoadableModule import *
 from slicer.util import VTKObservationMixin
 
-import numpy as np
+from sl__US_SeqViewerLib import INSTRUMENTATION, instrumented
+from sl__US_SeqViewerLib.FramePrefetch import FramePrefetcher, INT_FramePrefetchBudgetBytes_Default
+from sl__US_SeqViewerLib.CinePlayback import CineClock, STR_CineMode_Loop, TUPLE_CineModes
+from sl__US_SeqViewerLib.FrameStore import FrameStore, FrameStoreBrowser
 
 '''=================================================================================================================='''
 '''=================================================================================================================='''
@@ -14,9 +20,13 @@ import numpy as np
 INT_SliderFrameIndex_Min                = 1       # StartingValue of slider_FrameIndex, increase from 1
 INT_FRAME_INDEX_SLIDER_DEFAULT          = 50      # Default slider_FrameIndex value
 INT_FRAME_INDEX_SLIDER_DEFAULT_MAX      = 99      # Default slider_FrameIndex maximum
+FLOAT_SliderFrame_TargetFps             = 60.0    # Slider drag: frames shown per second at most, latest value wins;
+                                                  #   0: every slider value is shown, synchronously
 
 # ReferenceRole
 STR_SeqBrowserNode_RefRole_Selected     = 'SeqBrowser_Ref_CurSelected'
+# Parameter:  path of the frame store shown instead of the selected SeqBrowser, '' if none (Logic.openFrameStore)
+STR_FrameStorePath_Param                = 'FrameStorePath'
 
 
 
@@ -39,7 +49,6 @@ class sl__US_SeqViewer(ScriptedLoadableModule):
                                           '\nThis file was originally developed by Sen Li, LATIS, École de techonologie supérieure. ' \
                                           '\nSen.Li.1@ens.etsmtl.ca'
 
-        print("sl__US_SeqViewer(ScriptedLoadableModule):    __init__(self, parent)")
 
 '''=================================================================================================================='''
 class sl__US_SeqViewerWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
@@ -51,11 +60,16 @@ class sl__US_SeqViewerWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         self.logic = None
         self._parameterNode = None  # Singleton initialized through self.setParameterNode(self.logic.getParameterNode())
         self._updatingGUIFromParameterNode = False
-
-        print("**Widget.__init__(self, parent)")
-
+        # Slider throttling: the slider value waiting to be shown, and when the next frame may be shown
+        self.float_SliderTargetFps = FLOAT_SliderFrame_TargetFps
+        self._idx_SliderPendingFrame = None
+        self._float_SliderNextFrameTime = 0.0
+        self.dict_SliderFrameCounters = {'Requested': 0, 'Rendered': 0, 'Dropped': 0}
+        # Cine rate: the SeqBrowser whose playback rate spinBox_CineFps was last set to
+        self._str_CineFpsSeqBrowserID = None
+
+    @instrumented()
     def setup(self):
-        print("**Widget.setup(self), \tSL_Developer")
         """    00. Called when the user opens the module the first time and the widget is initialized. """
         ScriptedLoadableModuleWidget.setup(self)
 
@@ -84,7 +98,15 @@ class sl__US_SeqViewerWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         slicer.modules.sequences.toolBar().activeBrowserNodeChanged.connect(self.onSelectedNodeChanged)
 
         self.ui.slider_SeqFrame.connect("valueChanged(int)", self.onSliderFrameIndex_ValueChanged)
-
+        #       Single-shot timer showing the latest slider value, at most float_SliderTargetFps times per second
+        self.timer_SliderFrame = qt.QTimer()
+        self.timer_SliderFrame.setSingleShot(True)
+        self.timer_SliderFrame.connect('timeout()', self.onSliderFrameTimer_Timeout)
+        #       Frame prefetch (opt-in):  started at the first frame shown, stopped when unchecked
+        self.ui.checkBox_FramePrefetch.connect('toggled(bool)', self.onCheckBoxFramePrefetch_Toggled)
+        #       Cine playback:  Play / Pause, mode and frame rate
+        self.ui.comboBox_CineMode.addItems(list(TUPLE_CineModes))
+        self.ui.pushButton_CinePlay.connect('toggled(bool)', self.onPushButtonCinePlay_Toggled)
 
         # 06. Needed for programmer-friendly  Module-Reload   where the Module had already been enter(self)-ed;
         #                                     Otherwise,      will initial through function     enter(self)
@@ -92,44 +114,60 @@ class sl__US_SeqViewerWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
             self.initializeParameterNode()  # Every-Module own a Singleton ParameterNode track by **Logic.moduleName!
 
     # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
     def cleanup(self):
         """    Called when the application closes and the module widget is destroyed.    """
-        print("**Widget.cleanup(self)")
         self.removeObservers()
+        self.timer_SliderFrame.stop()
+        self.logic.stopCinePlayback()
+        self.logic.stopFramePrefetch()
+        self.logic.closeFrameStore()
 
     # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
     def enter(self):
         """    Called each time the user opens this module.    """
-        print("**Widget.enter(self)")
-
         # 01. Slicer.  SL__Note:   Every-Module own a Singleton ParameterNode that can be identified by
         #                                 self._parameterNode.GetAttribute('ModuleName')!  Need to initial every Entry!
         self.initializeParameterNode()
 
     # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
     def exit(self):
         """    Called each time the user opens a different module.    """
-        print("**Widget.exit(self)")
         # Slicer. Do not react to parameter node changes (GUI will be updated when the user enters into the module)
         self.removeObserver(self._parameterNode, vtk.vtkCommand.ModifiedEvent, self.updateGUIFromParameterNode)
+        # SL_Developer. Stop the cine playback and the pending slider frame; give the proxy node back to its SeqBrowser,
+        #              free the prefetch ring buffer
+        self.stopCinePlayback()
+        self.timer_SliderFrame.stop()
+        if self._idx_SliderPendingFrame is not None:
+            self._idx_SliderPendingFrame = None
+            self.dict_SliderFrameCounters['Dropped'] += 1
+        self.logic.stopFramePrefetch()
 
     # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
     def onSceneStartClose(self, caller, event):
         """    Called just before the scene is closed.    """
-        print("**Widget.onSceneStartClose(self, caller, event)")
-
         # Slicer. Parameter node will be reset, do not use it anymore
         self.setParameterNode(None)
+        self.stopCinePlayback()
+        self._str_CineFpsSeqBrowserID = None
+        self.logic.stopFramePrefetch()
+        self.logic.clearFrameViews()
+        self.logic.closeFrameStore()
 
     # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
     def onSceneEndClose(self, caller, event):
         """     Called just after the scene is closed.    """
-        print("**Widget.onSceneEndClose(self, caller, event)")
         # If this module is shown while the scene is closed then recreate a new parameter node immediately
         if self.parent.isEntered:
             self.initializeParameterNode()
 
     # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
     def initializeParameterNode(self):
         """    Ensure parameter node exists and observed. """
         # 01. Slicer-Initial: the Singleton ParameterNode stores all user choices in param-values, node selections...
@@ -141,11 +179,11 @@ class sl__US_SeqViewerWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
 
 
     # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
     def setParameterNode(self, inputParameterNode):
         """    SL_Notes:  Set and observe the Singleton ParameterNode.
                   Observation is needed because when ParameterNode is changed then the GUI must be updated immediately.
         """
-        print("**Widget.setParameterNode(self, inputParameterNode)")
         if inputParameterNode:
             if not inputParameterNode.IsSingleton():
                 raise ValueError(f'SL__Allert! \tinputParameterNode = \n{inputParameterNode.__str__()}')
@@ -170,11 +208,23 @@ class sl__US_SeqViewerWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         idx_CurSeqBrowser_SelectedItemNumber = self.ui.slider_SeqFrame.value - INT_SliderFrameIndex_Min
         return idx_CurSeqBrowser_SelectedItemNumber
 
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainSliderFrameCounters(self):
+        """    Slider values requested, shown (Rendered), replaced by a newer value before being shown (Dropped), and
+                  still waiting to be shown (Pending): Requested = Rendered + Dropped + Pending.    """
+        dict_Counters = dict(self.dict_SliderFrameCounters)
+        dict_Counters['Pending'] = 0 if self._idx_SliderPendingFrame is None else 1
+        return dict_Counters
+
+    def resetSliderFrameCounters(self):
+        self.dict_SliderFrameCounters = {'Requested': 0, 'Rendered': 0, 'Dropped': 0}
+
     # ------------------------------------------------------------------------------------------------------------------
     # ==================================================================================================================
     # ==================================================================================================================
     # ===========        SL_Developer,     Section II-A:  updateGUIFromParameterNode__  &    Slots   that call uiUpdate =
     # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
     def updateGUIFromParameterNode(self, caller=None, event=None):
         """   This method is called whenever parameter node is changed.
               The module GUI is updated to show the current state of the parameter node.    """
@@ -187,40 +237,159 @@ class sl__US_SeqViewerWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         self._updatingGUIFromParameterNode = True
         # --------------------------------------------------------------------------------------------------------------
         # II. SL_Developer, C:  In-Brace,   Update UI widgets ()
-        print("**Widget.updateGUIFromParameterNode(self, caller=None, event=None), \tSL_Developer")
-        #   II-01. Update Values of   Node-Selectors (qMRMLNodeComboBox)
+        #   II-00. Frame store of the parameter node (a loaded scene, another logic): open it, or close the one shown
+        str_FrameStorePath = self._parameterNode.GetParameter(STR_FrameStorePath_Param)
+        if str_FrameStorePath != self.logic.obtainFrameStorePath():
+            self.openFrameStore_from_ParameterNode(str_FrameStorePath)
+        #   II-01. Update Values of   Node-Selectors (qMRMLNodeComboBox);  none while the frame store is shown instead
+        #          of the selected SeqBrowser (selecting a SeqBrowser closes the frame store)
         nodeSeqBrowser_Selected = self._parameterNode.GetNodeReference(STR_SeqBrowserNode_RefRole_Selected)
-        self.ui.sequenceSelector.setCurrentNode(nodeSeqBrowser_Selected)
+        self.ui.sequenceSelector.setCurrentNode(None if self.logic.isFrameStoreOpen() else nodeSeqBrowser_Selected)
         #   II-02. Update Status of  slider_SeqFrame, and label_FrameIndex:    QLabel,     Sliders (ctkSliderWidget)
-        self.uiUpdate_Slider_SeqFrame__by__nodeSeqBrowser_Selected(nodeSeqBrowser_Selected)
+        #          (over the frames of the open frame store, if any)
+        self.uiUpdate_Slider_SeqFrame__by__nodeSeqBrowser_Selected(self.logic.obtainSelectedSeqBrowser())
+        #   II-03. Update spinBox_CineFps:  playback rate of a newly selected SeqBrowser (or frame store)
+        self.uiUpdate_CineFps__by__nodeSeqBrowser_Selected(self.logic.obtainSelectedSeqBrowser())
 
         # --------------------------------------------------------------------------------------------------------------
         # III. Close-Brace: All the GUI updates are done;
         self._updatingGUIFromParameterNode = False
 
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def openFrameStore_from_ParameterNode(self, str_FrameStorePath):
+        ''' SL_Notes:   Show the frame store str_FrameStorePath of the parameter node, or close the one shown if '';
+                        a file that cannot be opened is logged, and the parameter cleared  ''' ''''''
+        if self.logic.isCinePlaying():
+            self.stopCinePlayback()
+        if not str_FrameStorePath:
+            self.logic.closeFrameStore()
+            return
+        try:
+            self.logic.openFrameStore(str_FrameStorePath)
+        except (OSError, ValueError) as e:
+            logging.error(f'Frame store not opened: {e}')
+            self.logic.closeFrameStore()
+            self._parameterNode.SetParameter(STR_FrameStorePath_Param, '')
+
     # ------------------------------------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
     def onSliderFrameIndex_ValueChanged(self, caller=None, event=None):
         ''' SL_Notes:   Not UserOnly function, can be called when a target_ControlPoint is selected!    ''' ''''''
         # 00. Check Singleton ParameterNode: in case of enter() or onSceneStartClose()
         if self._parameterNode is None or self._updatingGUIFromParameterNode:
             return
+        # 00-B. The user takes over the frame index: the cine playback stops
+        if self.logic.isCinePlaying():
+            self.stopCinePlayback()
 
-        # 01. LogicUpdate:   nodeSeqBrowser's  Current-SelectedItemNumber
+        # 01. Latest value wins: a value that was not shown yet is dropped, replaced by this one
         idx_CurFrame = self.getSelectedItemNumber_FromGUI_Slider()
+        self.dict_SliderFrameCounters['Requested'] += 1
+        if self._idx_SliderPendingFrame is not None:
+            self.dict_SliderFrameCounters['Dropped'] += 1
+        self._idx_SliderPendingFrame = idx_CurFrame
+        self.ui.label_FrameIndex.setText(str(self.ui.slider_SeqFrame.value))
+
+        # 02. Show it after the slider events already queued (a drag), and not before 1 / float_SliderTargetFps after
+        #       the previous frame; the single-shot timer always ends on the final slider value
+        if self.float_SliderTargetFps <= 0:
+            self.onSliderFrameTimer_Timeout()
+        elif not self.timer_SliderFrame.isActive():
+            float_Delay = self._float_SliderNextFrameTime - time.perf_counter()
+            self.timer_SliderFrame.start(max(0, int(math.ceil(1000 * float_Delay))))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def onSliderFrameTimer_Timeout(self):
+        ''' SL_Notes:   Show the latest slider value: frame index of the selected SeqBrowser, then the slider   ''' ''''''
+        idx_CurFrame, self._idx_SliderPendingFrame = self._idx_SliderPendingFrame, None
+        # 00. Check Singleton ParameterNode: in case of onSceneStartClose() while the frame was waiting
+        if idx_CurFrame is None or self._parameterNode is None:
+            return
+        float_StartTime = time.perf_counter()
+
+        # 01. LogicUpdate:   nodeSeqBrowser's  Current-SelectedItemNumber  (through the prefetch, if checked)
+        self.startFramePrefetch_IfChecked()
         self.logic.logicUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex(idx_CurFrame)
-        print(f'\t**Widget.onSliderFrameIndex_ValueChanged,\tidx_CurFrame = {idx_CurFrame}')
+        if INSTRUMENTATION.bool_Enabled:
+            INSTRUMENTATION.instant('FrameIndex', {'idx_CurFrame': idx_CurFrame})
 
         # 02. uiUpdate:      LandmarkPositionLabels
         self._updatingGUIFromParameterNode = True  # I. Open-Brace:  Avoid updateParameterNodeFromGUI__ (infinite loop)
         self.uiUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex() # II. In-Brace: uiUpdate
         self._updatingGUIFromParameterNode = False  # III. Close-Brace: All the GUI updates are done;
 
+        # 03. Next frame: one frame period after this one started, or right away if showing it took longer (behind)
+        self.dict_SliderFrameCounters['Rendered'] += 1
+        if self.float_SliderTargetFps > 0:
+            self._float_SliderNextFrameTime = max(float_StartTime + 1.0 / self.float_SliderTargetFps, time.perf_counter())
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def onPushButtonCinePlay_Toggled(self, bool_Checked):
+        ''' SL_Notes:   Play / Pause the cine playback of the selected SeqBrowser, from its current frame    ''' ''''''
+        # 00. Check Singleton ParameterNode: in case of enter() or onSceneStartClose()
+        if self._parameterNode is None or self._updatingGUIFromParameterNode:
+            return
+
+        # 01. LogicUpdate:   start at the frame rate and mode of the GUI, or stop
+        if bool_Checked:
+            self.startFramePrefetch_IfChecked()
+            nodeSeqBrowser_Selected = self.logic.obtainSelectedSeqBrowser()
+            self.logic.startCinePlayback(nodeSeqBrowser_Selected, self.ui.spinBox_CineFps.value,
+                                         self.ui.comboBox_CineMode.currentText, fn_FrameShown=self.onCineFrameShown)
+        else:
+            self.logic.stopCinePlayback()
+
+        # 02. uiUpdate:      Play / Pause button (unchecked if the playback could not start), statistics
+        self._updatingGUIFromParameterNode = True  # I. Open-Brace:  Avoid updateParameterNodeFromGUI__ (infinite loop)
+        self.uiUpdate_CineControls()  # II. In-Brace: uiUpdate
+        self._updatingGUIFromParameterNode = False  # III. Close-Brace: All the GUI updates are done;
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def onCineFrameShown(self, idx_Frame):
+        ''' SL_Notes:   Called by the Logic for every frame of the cine playback: the slider and its label follow it ''' ''''''
+        self._updatingGUIFromParameterNode = True  # I. Open-Brace:  not a user change of the slider
+        self.ui.slider_SeqFrame.value = idx_Frame + INT_SliderFrameIndex_Min  # II. In-Brace: uiUpdate
+        #   onSliderFrameIndex_ValueChanged returns before its label update while the brace is open: set it here
+        self.ui.label_FrameIndex.setText(str(self.ui.slider_SeqFrame.value))
+        self._updatingGUIFromParameterNode = False  # III. Close-Brace: All the GUI updates are done;
+
     # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def onCheckBoxFramePrefetch_Toggled(self, bool_Checked):
+        ''' SL_Notes:   Prefetch on: starts at the next frame shown (startFramePrefetch_IfChecked);  off: stops now  ''' ''''''
+        if not bool_Checked:
+            self.logic.stopFramePrefetch()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def startFramePrefetch_IfChecked(self):
+        ''' SL_Notes:   Prefetch the selected SeqBrowser if checkBox_FramePrefetch is checked and it is not prefetched
+                        yet: called before a frame is shown (slider, cine), never on a SeqBrowser switch  ''' ''''''
+        if not self.ui.checkBox_FramePrefetch.checked or self.logic.isFrameStoreOpen():
+            return
+        nodeSeqBrowser_Selected = self.logic.obtainSelectedSeqBrowser()
+        if nodeSeqBrowser_Selected and not self.logic.isFramePrefetching(nodeSeqBrowser_Selected):
+            self.logic.startFramePrefetch(nodeSeqBrowser_Selected)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def stopCinePlayback(self):
+        ''' SL_Notes:   Stop the cine playback, release the Play / Pause button, show the statistics of the playback ''' ''''''
+        self.logic.stopCinePlayback()
+        bool_WasUpdating = self._updatingGUIFromParameterNode
+        self._updatingGUIFromParameterNode = True  # I. Open-Brace:  Avoid onPushButtonCinePlay_Toggled
+        self.uiUpdate_CineControls()  # II. In-Brace: uiUpdate
+        self._updatingGUIFromParameterNode = bool_WasUpdating  # III. Close-Brace: All the GUI updates are done;
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
     def onSelectedNodeChanged(self, node_NewActiveBrowser=None, event=None):
         ''' SL_Notes:   Not UserOnly function, can be called when a target_ControlPoint is selected!    ''' ''''''
-        print(f"\nBeginning of **Widget.onSelectedNodeChanged():   \tnode_NewActiveBrowser ="
-              f" {node_NewActiveBrowser.GetID() if node_NewActiveBrowser else type(node_NewActiveBrowser)}")
+        if INSTRUMENTATION.bool_Enabled:
+            INSTRUMENTATION.instant('NewActiveBrowser', {'ID': node_NewActiveBrowser.GetID() if node_NewActiveBrowser else None})
         # 00-A. Check Singleton ParameterNode: important test for every NodeChange Slot, in case of onSceneStartClose()
         #       Check _updatingGUIFromParameterNode:  avoid bugs introduced by Slicer (PointAdded, PointPositionDefined)
         if self._parameterNode is None or self._updatingGUIFromParameterNode:
@@ -228,6 +397,12 @@ class sl__US_SeqViewerWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         # 00-B. Check the validity of node_NewActiveBrowser
         if not node_NewActiveBrowser:
             return
+        # 00-C. The cine playback was playing the former SeqBrowser; the frame store was shown instead of it
+        #       and the prefetch was of the former SeqBrowser (it starts again at the first frame shown, if checked)
+        if self.logic.isCinePlaying():
+            self.stopCinePlayback()
+        self.logic.closeFrameStore()
+        self.logic.stopFramePrefetch()
 
         # 01. LogicUpdate
         self.updateParameterNodeFromGUI__Set_RefRoleNodeID(STR_SeqBrowserNode_RefRole_Selected, node_NewActiveBrowser.GetID())
@@ -241,8 +416,9 @@ class sl__US_SeqViewerWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
             self.ui.sequenceSelector.setCurrentNode(node_NewActiveBrowser)
             #   II-02-B. Re-Set modules.sequences active SeqBrowser, just in case the Signal sender is Laminae-Labeling
             slicer.modules.sequences.widgetRepresentation().setActiveBrowserNode(node_NewActiveBrowser)
-            #   II-02-C. Push Slicer Screen refresh before uiUpdate
-            self.uiUpdate_PushSlicerScreenUpdate_by_ShakeTargetSeqBrowser(node_NewActiveBrowser)
+            #   II-02-C. Push Slicer Screen refresh before uiUpdate: current frame into the proxy nodes, one render
+            self.logic.logicUpdate_RefreshProxyNodes_TargetSeqBrowser(node_NewActiveBrowser)
+            self.uiUpdate_PushSlicerScreenUpdate_by_ScheduleRender()
             #   II-02-D. Start uiUpdate
             self.uiUpdate_SwitchSelection_ChangeSeqBrowser_RemainFrameIndex(node_NewActiveBrowser)
             # --------------------------------------------------------------------------------------------------------------
@@ -258,17 +434,13 @@ class sl__US_SeqViewerWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
     # ----- 3. The superior function who call uiUpdate function MUST    set     self._updatingGUIFromParameterNode  ----
     # ------------------------------------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
     def uiUpdate_Slider_SeqFrame__by__nodeSeqBrowser_Selected(self, nodeSeqBrowser_Selected):
         ''' **Widget.uiUpdate_Slider_SeqFrame__by__nodeSeqBrowser_Selected(self, nodeSeqBrowser_Selected)   ''' ''''''
-        if nodeSeqBrowser_Selected:
-            str_CurSeqBrowser_ID = 'nodeSeqBrowser_Selected.GetID() = ' + nodeSeqBrowser_Selected.GetID()
-            str_NumberOfItems = '.GetNumberOfItems() = ' + str(nodeSeqBrowser_Selected.GetNumberOfItems())
-            str_idxFrame =  f', \tidxFrame = {self.logic.obtain_idxSliderCurFrame_from_TargetSeqBrowser(nodeSeqBrowser_Selected)}'
-        else:
-            str_CurSeqBrowser_ID = 'CurSeqBrowser.GetID() = ' + str(type(nodeSeqBrowser_Selected))
-            str_NumberOfItems = ''
-            str_idxFrame = ''
-        print(f"\t**Widget.uiUpdate_Slider_SeqFrame__by__nodeSeqBrowser_Selected(), {str_CurSeqBrowser_ID}, {str_NumberOfItems}{str_idxFrame}")
+        if INSTRUMENTATION.bool_Enabled and nodeSeqBrowser_Selected:
+            INSTRUMENTATION.instant('SliderSource', {'ID': nodeSeqBrowser_Selected.GetID(),
+                                                     'NumberOfItems': nodeSeqBrowser_Selected.GetNumberOfItems(),
+                                                     'SelectedItemNumber': nodeSeqBrowser_Selected.GetSelectedItemNumber()})
 
         if nodeSeqBrowser_Selected and nodeSeqBrowser_Selected.GetNumberOfItems() > 0:
             self.ui.slider_SeqFrame.enabled = True
@@ -287,6 +459,7 @@ class sl__US_SeqViewerWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
     # ------------------------------------------------------------------------------------------------------------------
     # ==================================================================================================================
     # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
     def uiUpdate_SwitchSelection_ChangeSeqBrowser_RemainFrameIndex(self, node_NewActiveBrowser):
         ''' **Widget.uiUpdate_SwitchSelection_ChangeSeqBrowser_RemainFrameIndex(self, nodeTarget_SeqBrowser) ''' ''''''
         # 00-A. Check if the module isEntered
@@ -294,18 +467,13 @@ class sl__US_SeqViewerWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         # 00-B. Check the validity of nodeTarget_SeqBrowser
         if not node_NewActiveBrowser:       return
 
-        # 01. Update slider_SeqFrame
-        if node_NewActiveBrowser:
-            str_CurSeqBrowser_ID = 'node_NewActiveBrowser.GetID() = ' + node_NewActiveBrowser.GetID()
-            str_NumberOfItems = 'idx_SeqBrowserSelectedItem = ' + str(node_NewActiveBrowser.GetNumberOfItems())
-        else:
-            str_CurSeqBrowser_ID = 'node_NewActiveBrowser.GetID() = ' + str(type(node_NewActiveBrowser))
-            str_NumberOfItems = ''
-        print(f"\t**Widget.uiUpdate_SwitchSelection_ChangeSeqBrowser_RemainFrameIndex(),  {str_CurSeqBrowser_ID}, {str_NumberOfItems}")
+        # 01. Update slider_SeqFrame, and the cine rate to the playback rate of node_NewActiveBrowser
         self.uiUpdate_Slider_SeqFrame__by__nodeSeqBrowser_Selected(node_NewActiveBrowser)
+        self.uiUpdate_CineFps__by__nodeSeqBrowser_Selected(node_NewActiveBrowser)
 
 
     # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
     def uiUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex(self):
         '''         **Widget.uiUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex(self) 
             There are two modes to trigger this uiUpdate:   UI modified     /   Non-UI  (node)  modified.
@@ -314,8 +482,8 @@ class sl__US_SeqViewerWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         ''' ''''''
         # 00-A. Check if the module isEntered
         if not self.parent.isEntered:       return
-        # 00-B. Check the validity of nodeSeqBrowser_Selected
-        nodeSeqBrowser_Selected = self._parameterNode.GetNodeReference(STR_SeqBrowserNode_RefRole_Selected)
+        # 00-B. Check the validity of nodeSeqBrowser_Selected (FrameStoreBrowser of the open frame store, if any)
+        nodeSeqBrowser_Selected = self.logic.obtainSelectedSeqBrowser()
         if not nodeSeqBrowser_Selected:     return
 
         # 01. Update the uiSlider
@@ -323,20 +491,49 @@ class sl__US_SeqViewerWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
 
 
     # ------------------------------------------------------------------------------------------------------------------
-    def uiUpdate_PushSlicerScreenUpdate_by_ShakeTargetSeqBrowser(self, nodeTarget_SeqBrowser):
-        print(f'  **Widget.uiUpdate_PushSlicerScreenUpdate_by_ShakeTargetSeqBrowser()')
-        if nodeTarget_SeqBrowser:
-            # Let's push Slicer to update by Setting current selected frame back and forth
-            idx_curFrame = nodeTarget_SeqBrowser.GetSelectedItemNumber()
+    def uiUpdate_CineFps__by__nodeSeqBrowser_Selected(self, nodeSeqBrowser_Selected):
+        ''' **Widget.uiUpdate_CineFps__by__nodeSeqBrowser_Selected(self, nodeSeqBrowser_Selected)
+            spinBox_CineFps at the playback rate (acquisition rate) of a newly selected SeqBrowser; a rate the user set
+            is kept while the same SeqBrowser stays selected.
+        ''' ''''''
+        if not nodeSeqBrowser_Selected or nodeSeqBrowser_Selected.GetID() == self._str_CineFpsSeqBrowserID:
+            return
+        self._str_CineFpsSeqBrowserID = nodeSeqBrowser_Selected.GetID()
+        self.ui.spinBox_CineFps.value = nodeSeqBrowser_Selected.GetPlaybackRateFps()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def uiUpdate_CineControls(self):
+        ''' **Widget.uiUpdate_CineControls(self):   Play / Pause button, and the statistics of the last playback   ''' ''''''
+        bool_Playing = self.logic.isCinePlaying()
+        self.ui.pushButton_CinePlay.checked = bool_Playing
+        self.ui.pushButton_CinePlay.text = 'Pause' if bool_Playing else 'Play'
+        dict_Stats = self.logic.obtainCineStats()
+        if bool_Playing or dict_Stats is None:
+            self.ui.label_CineStats.setText('')
+        else:
+            self.ui.label_CineStats.setText(f'{dict_Stats["AchievedFps"]:.1f} of {dict_Stats["TargetFps"]:.1f} fps, '
+                                            f'{dict_Stats["Skipped"]} frames skipped, jitter {dict_Stats["JitterStdMs"]:.2f} ms '
+                                            f'(p95 {dict_Stats["JitterP95Ms"]:.2f} ms)')
 
-            nodeTarget_SeqBrowser.SetSelectedItemNumber(max(idx_curFrame - 1, 0))
-            nodeTarget_SeqBrowser.SetSelectedItemNumber(min(idx_curFrame + 1, nodeTarget_SeqBrowser.GetNumberOfItems() - 1))
-            nodeTarget_SeqBrowser.SetSelectedItemNumber(idx_curFrame)
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def uiUpdate_PushSlicerScreenUpdate_by_ScheduleRender(self):
+        ''' **Widget.uiUpdate_PushSlicerScreenUpdate_by_ScheduleRender(self)
+            Request one render of every view of the layout, done at the next turn of the event loop (requests of the
+            same turn are merged), instead of rendering the frames idx-1, idx+1 and idx to force a screen refresh.
+        ''' ''''''
+        layoutManager = slicer.app.layoutManager()
+        if not layoutManager:       return
+        for str_ViewName in layoutManager.sliceViewNames():
+            layoutManager.sliceWidget(str_ViewName).sliceView().scheduleRender()
+        for idx_View in range(layoutManager.threeDViewCount):
+            layoutManager.threeDWidget(idx_View).threeDView().scheduleRender()
 
     # ==================================================================================================================
     # ==================================================================================================================
     # ===========        SL_Developer,     Section IV:  updateParameterNodeFromGUI__       ==============================
     # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
     def updateParameterNodeFromGUI__Set_RefRoleNodeID(self, STR_RefRole, str_NodeID):
         """   Read GUI Method:   Method updateParameterNodeFromGUI__ is called when users makes any change in the GUI.
               Changes are saved into the parameter node (so that they are restored when the scene is saved and loaded).
@@ -348,12 +545,10 @@ class sl__US_SeqViewerWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         wasModified = self._parameterNode.StartModify()  # Modify all properties in a single batch
 
         # II.   Update the Singleton ParameterNode; No updateGUIFromParameterNode triggered in this step
-        node_BeforeChange = self._parameterNode.GetNodeReference(STR_RefRole)
-        if node_BeforeChange:       str_NodeBeforeChange = self._parameterNode.GetNodeReference(STR_RefRole).GetID()
-        else:                       str_NodeBeforeChange = "<class 'NoneType'>"
-        print(f'\tBefore Update:  {str_NodeBeforeChange}')
+        if INSTRUMENTATION.bool_Enabled:
+            INSTRUMENTATION.instant('RefRoleNodeID', {'RefRole': STR_RefRole, 'Before': self._parameterNode.GetNodeReferenceID(STR_RefRole),
+                                                      'After': str_NodeID})
         self._parameterNode.SetNodeReferenceID(STR_RefRole, str_NodeID)
-        print(f'\tAfter Update:  {self._parameterNode.GetNodeReference(STR_RefRole).GetID()}')
 
         # III. After   updating the Singleton ParameterNode; Enable Modify events, e.g., vtk.vtkCommand.ModifiedEvent
         self._parameterNode.EndModify(wasModified)
@@ -365,7 +560,7 @@ class sl__US_SeqViewerWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
 #
 # sl__US_SeqViewerLogic
 #
-class sl__US_SeqViewerLogic(ScriptedLoadableModuleLogic):
+class sl__US_SeqViewerLogic(ScriptedLoadableModuleLogic, VTKObservationMixin):
     """   The Logic class is :  to facilitate dynamic reloading of the module without restarting the application.
           This class should implement all the actual computation done by your module.  
           The interface should be such that other python code can import this class 
@@ -377,8 +572,21 @@ class sl__US_SeqViewerLogic(ScriptedLoadableModuleLogic):
     def __init__(self):
         """    Called when the logic class is instantiated. Can be used for initializing member variables.    """
         ScriptedLoadableModuleLogic.__init__(self)
+        VTKObservationMixin.__init__(self)  # needed for the observation of the prefetched SeqBrowser
 
         self._isSwitchingSeqBrowser = False
+        # Frame prefetch of one SeqBrowser: its nodes, FramePrefetcher and shown frame; see startFramePrefetch()
+        self._dict_FramePrefetch = None
+        # NumPy views of the frames of each sequence prefetched, by sequence ID; see obtainFrameViews()
+        self._dict_FrameViews = {}
+        # Frame store shown instead of the selected SeqBrowser: store, FrameStoreBrowser, proxy, prefetcher; see openFrameStore()
+        self._dict_FrameStore = None
+        # Cine playback: its SeqBrowser, schedule, timer, and the statistics of the last one; see startCinePlayback()
+        self._nodeSeqBrowser_Cine = None
+        self._fn_CineFrameShown = None
+        self.cineClock = None
+        self.timer_Cine = None
+        self._dict_CineStats = None
 
     # ==================================================================================================================
     # ==================================================================================================================
@@ -389,15 +597,25 @@ class sl__US_SeqViewerLogic(ScriptedLoadableModuleLogic):
         idx_SliderCurFrame = nodeTarget_SeqBrowser.GetSelectedItemNumber() + INT_SliderFrameIndex_Min
         return idx_SliderCurFrame
 
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainSelectedSeqBrowser(self):
+        ''' **Logic.obtainSelectedSeqBrowser(self)
+            The FrameStoreBrowser of the open frame store, else the SeqBrowser referenced by the parameter node: the
+            frame-switch functions, the slider and the cine playback use either one through the same methods.
+        ''' ''''''
+        if self._dict_FrameStore is not None:
+            return self._dict_FrameStore['Browser']
+        return self.getParameterNode().GetNodeReference(STR_SeqBrowserNode_RefRole_Selected)
+
 
     # ------------------------------------------------------------------------------------------------------------------
     # ==================================================================================================================
     # ==================================================================================================================
     # ===========        SL_Developer,     Section VII-A:  logicUpdate     &    Functions   that call paramNodeUpdate ====
     # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
     def setDefaultParameters(self, parameterNode):
         """    SL_Developer, B:    Initialize parameter node, Re-Enter, Re-Load.    """
-        print("**Logic.setDefaultParameters(self, parameterNode), \tSL_Developer, B");
         # I. Before  updating the Singleton ParameterNode; Disable Modify events, e.g., vtk.vtkCommand.ModifiedEvent
         wasModified = parameterNode.StartModify()  # Modify all properties in a single batch
         # --------------------------------------------------------------------------------------------------------------
@@ -449,10 +667,11 @@ class sl__US_SeqViewerLogic(ScriptedLoadableModuleLogic):
     # ------------------------------------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
     def logicUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex(self, idx_TargetFrame):
         ''' **Logic.logicUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex(self, idx_TargetFrame) ''' ''''''
         # 00-A. Check the validity of nodeSeqBrowser_Selected and idx_TargetFrame
-        nodeSeqBrowser_Selected = self.getParameterNode().GetNodeReference(STR_SeqBrowserNode_RefRole_Selected)
+        nodeSeqBrowser_Selected = self.obtainSelectedSeqBrowser()
         if not nodeSeqBrowser_Selected:     return
         # 00-B. Check the validity of idx_TargetFrame
         if not self.isValid_idxTargetFrame(nodeSeqBrowser_Selected, idx_TargetFrame):
@@ -460,8 +679,354 @@ class sl__US_SeqViewerLogic(ScriptedLoadableModuleLogic):
 
         # 01. Update nodeSeqBrowser along with its the Current-SelectedItemNumber
         nodeSeqBrowser_Selected.SetSelectedItemNumber(idx_TargetFrame)
-        print(f"\t\t**Logic.logicUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex()\t"
-            f"nodeSeqBrowser_Selected.GetID() = {nodeSeqBrowser_Selected.GetID()}, idx_TargetFrame = {idx_TargetFrame}")
+        if INSTRUMENTATION.bool_Enabled:
+            INSTRUMENTATION.instant('SelectedItemNumber', {'ID': nodeSeqBrowser_Selected.GetID(), 'idx_TargetFrame': idx_TargetFrame})
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def logicUpdate_RefreshProxyNodes_TargetSeqBrowser(self, nodeTarget_SeqBrowser):
+        ''' **Logic.logicUpdate_RefreshProxyNodes_TargetSeqBrowser(self, nodeTarget_SeqBrowser)
+            Copy the current frame of nodeTarget_SeqBrowser into its proxy nodes, once; the selected item is unchanged.
+        ''' ''''''
+        if not nodeTarget_SeqBrowser:     return
+        slicer.modules.sequences.logic().UpdateProxyNodesFromSequences(nodeTarget_SeqBrowser)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # ---------------  Section VIII-03:     Frame Prefetch    Functions          ---------------------------------------
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def startFramePrefetch(self, nodeSeqBrowser, int_BudgetBytes=INT_FramePrefetchBudgetBytes_Default):
+        ''' **Logic.startFramePrefetch(self, nodeSeqBrowser, int_BudgetBytes)
+            Show the frames of nodeSeqBrowser through a FramePrefetcher (ring buffer of int_BudgetBytes, filled ahead
+            in the scrub direction by a worker thread): the proxy volume gets its own voxel buffer, the SeqBrowser stops
+            copying frames into it (playback off for the master sequence), and every change of its selected item, from
+            this module or any other, copies the frame from the ring buffer.
+            Only for a master sequence of scalar volumes of one shape and scalar type. Frames added to or replaced in
+            the sequence while it runs (e.g. recording) restart it on the new frames.
+            :return: True if prefetching, False if the sequence is not supported (nothing changed)
+        ''' ''''''
+        self.stopFramePrefetch()
+        # 00. Check the master sequence: scalar volumes, one shape, with a proxy node
+        nodeSequence = nodeSeqBrowser.GetMasterSequenceNode() if nodeSeqBrowser else None
+        nodeProxy = nodeSeqBrowser.GetProxyNode(nodeSequence) if nodeSequence else None
+        if not nodeProxy or not nodeProxy.IsA("vtkMRMLScalarVolumeNode") or not nodeProxy.GetImageData():
+            return False
+        list_Frames = self.obtainFrameViews(nodeSequence)
+        if list_Frames is None:
+            return False
+
+        # 01. Prefetcher: the worker reads these NumPy views of the frames, taken here on the main thread (no MRML)
+        def readFrame(idx_Frame, arr_Out):
+            arr_Out[...] = list_Frames[idx_Frame]
+        prefetcher = FramePrefetcher(readFrame, len(list_Frames), list_Frames[0].shape, list_Frames[0].dtype,
+                                     int_BudgetBytes)
+        # 02. Proxy with its own voxels, not updated by the SeqBrowser anymore; but saved scenes keep the playback on
+        self._dict_FramePrefetch = {'SeqBrowser': nodeSeqBrowser, 'Sequence': nodeSequence, 'Proxy': nodeProxy,
+                                    'Prefetcher': prefetcher, 'idx_Shown': None, 'BudgetBytes': int_BudgetBytes}
+        self.logicUpdate_DetachProxy_FramePrefetch()
+        self.addObserver(nodeSeqBrowser, vtk.vtkCommand.ModifiedEvent, self.onFramePrefetch_SeqBrowserModified)
+        self.addObserver(nodeSequence, vtk.vtkCommand.ModifiedEvent, self.onFramePrefetch_SequenceModified)
+        self.addObserver(slicer.mrmlScene, slicer.mrmlScene.StartSaveEvent, self.onFramePrefetch_SceneStartSave)
+        self.addObserver(slicer.mrmlScene, slicer.mrmlScene.EndSaveEvent, self.onFramePrefetch_SceneEndSave)
+        prefetcher.start()
+        self.logicUpdate_ShowFrame_from_FramePrefetch(nodeSeqBrowser.GetSelectedItemNumber())
+        return True
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def stopFramePrefetch(self):
+        ''' **Logic.stopFramePrefetch(self):   stop the worker, give the proxy node back to the SeqBrowser. ''' ''''''
+        if self._dict_FramePrefetch is None:    return
+        dict_FramePrefetch, self._dict_FramePrefetch = self._dict_FramePrefetch, None
+        dict_FramePrefetch['Prefetcher'].stop()
+        nodeSeqBrowser = dict_FramePrefetch['SeqBrowser']
+        self.removeObserver(nodeSeqBrowser, vtk.vtkCommand.ModifiedEvent, self.onFramePrefetch_SeqBrowserModified)
+        self.removeObserver(dict_FramePrefetch['Sequence'], vtk.vtkCommand.ModifiedEvent, self.onFramePrefetch_SequenceModified)
+        self.removeObserver(slicer.mrmlScene, slicer.mrmlScene.StartSaveEvent, self.onFramePrefetch_SceneStartSave)
+        self.removeObserver(slicer.mrmlScene, slicer.mrmlScene.EndSaveEvent, self.onFramePrefetch_SceneEndSave)
+        # The sequence is already out of the scene if the prefetch stops because it was removed (onFrameViews_NodeRemoved)
+        if nodeSeqBrowser.GetScene() and slicer.mrmlScene.IsNodePresent(dict_FramePrefetch['Sequence']):
+            nodeSeqBrowser.SetPlayback(dict_FramePrefetch['Sequence'], True)
+            slicer.modules.sequences.logic().UpdateProxyNodesFromSequences(nodeSeqBrowser)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def isFramePrefetching(self, nodeSeqBrowser=None):
+        ''' **Logic.isFramePrefetching(self, nodeSeqBrowser=None):   of nodeSeqBrowser, or of any SeqBrowser ''' ''''''
+        if self._dict_FramePrefetch is None:    return False
+        return nodeSeqBrowser is None or self._dict_FramePrefetch['SeqBrowser'] is nodeSeqBrowser
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainFramePrefetchStats(self):
+        ''' **Logic.obtainFramePrefetchStats(self):  hit rate and memory of the ring buffer, see FramePrefetcher.obtainStats
+            :return: dict, or None if not prefetching    ''' ''''''
+        if self._dict_FramePrefetch is None:    return None
+        return self._dict_FramePrefetch['Prefetcher'].obtainStats()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def obtainFrameViews(self, nodeSequence):
+        ''' **Logic.obtainFrameViews(self, nodeSequence)
+            NumPy views (no copy) of the frames of nodeSequence, built once and kept until the sequence is modified or
+            removed: prefetching the same sequence again does not walk its data nodes again.
+            :return: list of arrays, or None if the frames are not scalar volumes of one shape and scalar type
+        ''' ''''''
+        if not self.hasObserver(slicer.mrmlScene, slicer.mrmlScene.NodeRemovedEvent, self.onFrameViews_NodeRemoved):
+            self.addObserver(slicer.mrmlScene, slicer.mrmlScene.NodeRemovedEvent, self.onFrameViews_NodeRemoved)
+        tuple_Version = (nodeSequence.GetMTime(), nodeSequence.GetNumberOfDataNodes())
+        tuple_Cached = self._dict_FrameViews.get(nodeSequence.GetID())
+        if tuple_Cached is not None and tuple_Cached[0] == tuple_Version:
+            return tuple_Cached[1]
+        list_Frames = [nodeSequence.GetNthDataNode(idx_Frame) for idx_Frame in range(nodeSequence.GetNumberOfDataNodes())]
+        if list_Frames and all(nodeFrame.IsA("vtkMRMLScalarVolumeNode") and nodeFrame.GetImageData()
+                               for nodeFrame in list_Frames):
+            list_Frames = [slicer.util.arrayFromVolume(nodeFrame) for nodeFrame in list_Frames]
+            if any(arr.shape != list_Frames[0].shape or arr.dtype != list_Frames[0].dtype for arr in list_Frames):
+                list_Frames = None
+        else:
+            list_Frames = None
+        self._dict_FrameViews[nodeSequence.GetID()] = (tuple_Version, list_Frames)
+        return list_Frames
+
+    def clearFrameViews(self):
+        self._dict_FrameViews = {}
+        self.removeObserver(slicer.mrmlScene, slicer.mrmlScene.NodeRemovedEvent, self.onFrameViews_NodeRemoved)
+
+    @vtk.calldata_type(vtk.VTK_OBJECT)
+    def onFrameViews_NodeRemoved(self, caller, event, removedNode):
+        ''' **Logic.onFrameViews_NodeRemoved:   a sequence left the scene, its frame views (and voxels) go with it ''' ''''''
+        if self._dict_FramePrefetch is not None and self._dict_FramePrefetch['Sequence'] is removedNode:
+            self.stopFramePrefetch()
+        self._dict_FrameViews.pop(removedNode.GetID(), None)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def logicUpdate_DetachProxy_FramePrefetch(self):
+        ''' **Logic.logicUpdate_DetachProxy_FramePrefetch(self)
+            The proxy volume gets its own copy of the voxels it shows (it shares those of the current frame), and the
+            SeqBrowser stops copying frames into it (playback off for the master sequence).
+        ''' ''''''
+        nodeProxy = self._dict_FramePrefetch['Proxy']
+        imageData = vtk.vtkImageData()
+        imageData.DeepCopy(nodeProxy.GetImageData())
+        nodeProxy.SetAndObserveImageData(imageData)
+        self._dict_FramePrefetch['SeqBrowser'].SetPlayback(self._dict_FramePrefetch['Sequence'], False)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def onFramePrefetch_SceneStartSave(self, caller=None, event=None):
+        ''' **Logic.onFramePrefetch_SceneStartSave:   the scene is saved with the playback of the master sequence on ''' ''''''
+        if self._dict_FramePrefetch is None:    return
+        self._dict_FramePrefetch['SeqBrowser'].SetPlayback(self._dict_FramePrefetch['Sequence'], True)
+
+    def onFramePrefetch_SceneEndSave(self, caller=None, event=None):
+        ''' **Logic.onFramePrefetch_SceneEndSave:   saved, the prefetch takes the proxy volume back  ''' ''''''
+        if self._dict_FramePrefetch is None:    return
+        self.logicUpdate_DetachProxy_FramePrefetch()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def onFramePrefetch_SeqBrowserModified(self, caller=None, event=None):
+        ''' **Logic.onFramePrefetch_SeqBrowserModified:   the selected item of the prefetched SeqBrowser changed?  ''' ''''''
+        if self._dict_FramePrefetch is None:    return
+        idx_Frame = self._dict_FramePrefetch['SeqBrowser'].GetSelectedItemNumber()
+        if idx_Frame != self._dict_FramePrefetch['idx_Shown']:
+            self.logicUpdate_ShowFrame_from_FramePrefetch(idx_Frame)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def onFramePrefetch_SequenceModified(self, caller=None, event=None):
+        ''' **Logic.onFramePrefetch_SequenceModified:   frames added or replaced, e.g. while recording: the views of the
+            running prefetcher are stale, restart it on the new frames (stopped if they are not supported anymore) ''' ''''''
+        if self._dict_FramePrefetch is None:    return
+        self.startFramePrefetch(self._dict_FramePrefetch['SeqBrowser'], self._dict_FramePrefetch['BudgetBytes'])
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def logicUpdate_ShowFrame_from_FramePrefetch(self, idx_Frame):
+        ''' **Logic.logicUpdate_ShowFrame_from_FramePrefetch(self, idx_Frame)
+            Copy frame idx_Frame from the ring buffer (read now on a miss) into the proxy volume, and its geometry.
+        ''' ''''''
+        if idx_Frame < 0:       return
+        nodeProxy = self._dict_FramePrefetch['Proxy']
+        bool_Hit = self._dict_FramePrefetch['Prefetcher'].copyFrame(idx_Frame, slicer.util.arrayFromVolume(nodeProxy))
+        wasModified = nodeProxy.StartModify()
+        nodeProxy.CopyOrientation(self._dict_FramePrefetch['Sequence'].GetNthDataNode(idx_Frame))
+        slicer.util.arrayFromVolumeModified(nodeProxy)
+        nodeProxy.EndModify(wasModified)
+        self._dict_FramePrefetch['idx_Shown'] = idx_Frame
+        if INSTRUMENTATION.bool_Enabled:
+            INSTRUMENTATION.instant('FramePrefetch', {'idx_Frame': idx_Frame, 'Hit': bool_Hit})
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # ---------------  Section VIII-04:     Frame Store       Functions          ---------------------------------------
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def exportFrameStore(self, nodeSeqBrowser, str_Path):
+        ''' **Logic.exportFrameStore(self, nodeSeqBrowser, str_Path)
+            Write the master sequence of nodeSeqBrowser (scalar volumes of one shape) to the frame store file str_Path,
+            frame by frame: voxels, IJKToRAS, and the index value as timestamp (seconds; frame / playback rate if the
+            index value is not a number).
+        ''' ''''''
+        nodeSequence = nodeSeqBrowser.GetMasterSequenceNode() if nodeSeqBrowser else None
+        if not nodeSequence or nodeSequence.GetNumberOfDataNodes() == 0:
+            raise ValueError(f'SL_Alert! No frames to export in nodeSeqBrowser = {nodeSeqBrowser}')
+        arr_First = slicer.util.arrayFromVolume(nodeSequence.GetNthDataNode(0))
+        store = FrameStore.create(str_Path, nodeSequence.GetNumberOfDataNodes(), arr_First.shape, arr_First.dtype)
+        try:
+            matrix_IJKToRAS = vtk.vtkMatrix4x4()
+            for idx_Frame in range(nodeSequence.GetNumberOfDataNodes()):
+                nodeFrame = nodeSequence.GetNthDataNode(idx_Frame)
+                arr_Frame = slicer.util.arrayFromVolume(nodeFrame)
+                if arr_Frame.shape != arr_First.shape:
+                    raise ValueError(f'SL_Alert! Frame {idx_Frame} of shape {arr_Frame.shape}, expected {arr_First.shape}')
+                nodeFrame.GetIJKToRASMatrix(matrix_IJKToRAS)
+                try:
+                    float_Timestamp = float(nodeSequence.GetNthIndexValue(idx_Frame))
+                except ValueError:
+                    float_Timestamp = idx_Frame / nodeSeqBrowser.GetPlaybackRateFps()
+                store.writeFrame(idx_Frame, arr_Frame, slicer.util.arrayFromVTKMatrix(matrix_IJKToRAS), float_Timestamp)
+        finally:
+            store.close()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def openFrameStore(self, str_Path, int_BudgetBytes=INT_FramePrefetchBudgetBytes_Default):
+        ''' **Logic.openFrameStore(self, str_Path, int_BudgetBytes)
+            Show the frame store file str_Path instead of the selected SeqBrowser. Opening maps the file (no frame is
+            read); a new volume node is its proxy, and a FramePrefetcher pages in the frames around the shown one.
+            Until closeFrameStore(), obtainSelectedSeqBrowser() is its FrameStoreBrowser: the frame-switch functions,
+            the slider and the cine playback work on it unchanged.
+            :return: FrameStoreBrowser
+        ''' ''''''
+        self.closeFrameStore()
+        store = FrameStore.open(str_Path)
+        # 01. Proxy volume: one frame of voxels, the only one in memory besides the ring buffer
+        import numpy as np
+        nodeProxy = slicer.mrmlScene.AddNewNodeByClass('vtkMRMLScalarVolumeNode', os.path.basename(str_Path))
+        nodeProxy.CreateDefaultDisplayNodes()
+        slicer.util.updateVolumeFromArray(nodeProxy, np.zeros(store.tuple_FrameShape, dtype=store.dtype))
+        prefetcher = FramePrefetcher(store.readFrame, store.int_NumberOfFrames, store.tuple_FrameShape, store.dtype,
+                                     int_BudgetBytes)
+        browser = FrameStoreBrowser(store, self.logicUpdate_ShowFrame_from_FrameStore)
+        self._dict_FrameStore = {'Store': store, 'Browser': browser, 'Proxy': nodeProxy, 'Prefetcher': prefetcher}
+        prefetcher.start()
+        browser.SetSelectedItemNumber(0)
+        slicer.util.setSliceViewerLayers(background=nodeProxy, fit=True)
+        # 02. Parameter node: the GUI observing it shows the frames of the store
+        self.getParameterNode().SetParameter(STR_FrameStorePath_Param, str_Path)
+        return browser
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def closeFrameStore(self):
+        ''' **Logic.closeFrameStore(self):   stop its prefetcher, remove its proxy volume, unmap the file  ''' ''''''
+        if self._dict_FrameStore is None:    return
+        dict_FrameStore, self._dict_FrameStore = self._dict_FrameStore, None
+        dict_FrameStore['Prefetcher'].stop()
+        dict_FrameStore['Browser'].close()
+        dict_FrameStore['Store'].close()
+        if dict_FrameStore['Proxy'].GetScene():
+            slicer.mrmlScene.RemoveNode(dict_FrameStore['Proxy'])
+        parameterNode = self.getParameterNode()
+        if parameterNode:
+            parameterNode.SetParameter(STR_FrameStorePath_Param, '')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def isFrameStoreOpen(self):
+        return self._dict_FrameStore is not None
+
+    def obtainFrameStorePath(self):
+        ''' **Logic.obtainFrameStorePath(self):   path of the open frame store, '' if none  ''' ''''''
+        return self._dict_FrameStore['Store'].str_Path if self._dict_FrameStore is not None else ''
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainFrameStoreProxyNode(self):
+        return self._dict_FrameStore['Proxy'] if self._dict_FrameStore is not None else None
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def logicUpdate_ShowFrame_from_FrameStore(self, idx_Frame):
+        ''' **Logic.logicUpdate_ShowFrame_from_FrameStore(self, idx_Frame)
+            Copy frame idx_Frame (ring buffer, else the file) and its IJKToRAS into the proxy volume of the frame store.
+        ''' ''''''
+        nodeProxy, store = self._dict_FrameStore['Proxy'], self._dict_FrameStore['Store']
+        bool_Hit = self._dict_FrameStore['Prefetcher'].copyFrame(idx_Frame, slicer.util.arrayFromVolume(nodeProxy))
+        wasModified = nodeProxy.StartModify()
+        nodeProxy.SetIJKToRASMatrix(slicer.util.vtkMatrixFromArray(store.arr_Transforms[idx_Frame]))
+        slicer.util.arrayFromVolumeModified(nodeProxy)
+        nodeProxy.EndModify(wasModified)
+        if INSTRUMENTATION.bool_Enabled:
+            INSTRUMENTATION.instant('FrameStore', {'idx_Frame': idx_Frame, 'Hit': bool_Hit})
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # ---------------  Section VIII-05:     Cine Playback     Functions          ---------------------------------------
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def startCinePlayback(self, nodeSeqBrowser, float_Fps=None, str_Mode=STR_CineMode_Loop, fn_FrameShown=None):
+        ''' **Logic.startCinePlayback(self, nodeSeqBrowser, float_Fps=None, str_Mode=STR_CineMode_Loop, fn_FrameShown=None)
+            Play nodeSeqBrowser from its selected item, frame k due at  t_Start + k / float_Fps  (CineClock): the timer
+            is re-armed for the next deadline after each frame, so the time spent showing it is compensated, and the
+            frames already overdue when the timer fires are skipped instead of delaying the playback.
+            :param float_Fps:       default: the playback rate of nodeSeqBrowser (acquisition rate)
+            :param str_Mode:        STR_CineMode_Loop, or STR_CineMode_PingPong
+            :param fn_FrameShown:   fn_FrameShown(idx_Frame), called after every shown frame (e.g. to move a slider)
+            :return: True if playing, False if nodeSeqBrowser has less than two items
+        ''' ''''''
+        self.stopCinePlayback()
+        if not nodeSeqBrowser or nodeSeqBrowser.GetNumberOfItems() < 2:
+            return False
+        if float_Fps is None:
+            float_Fps = nodeSeqBrowser.GetPlaybackRateFps()
+        self.cineClock = CineClock(float_Fps, nodeSeqBrowser.GetNumberOfItems(), str_Mode,
+                                   nodeSeqBrowser.GetSelectedItemNumber())
+        nodeSeqBrowser.SetPlaybackActive(False)     # Not two playbacks: the one of the Sequences module stops
+        self._nodeSeqBrowser_Cine = nodeSeqBrowser
+        self._fn_CineFrameShown = fn_FrameShown
+        if self.timer_Cine is None:
+            self.timer_Cine = qt.QTimer()
+            self.timer_Cine.setSingleShot(True)
+            self.timer_Cine.setTimerType(qt.Qt.PreciseTimer)
+            self.timer_Cine.connect('timeout()', self.onCineTimer_Timeout)
+        self.cineClock.start(time.perf_counter())
+        self.onCineTimer_Timeout()
+        return True
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @instrumented()
+    def stopCinePlayback(self):
+        ''' **Logic.stopCinePlayback(self):   the shown frame stays selected; its statistics stay in obtainCineStats() ''' ''''''
+        if self.cineClock is None:      return
+        self.timer_Cine.stop()
+        self._dict_CineStats = self.cineClock.obtainStats()
+        self.cineClock, self._nodeSeqBrowser_Cine, self._fn_CineFrameShown = None, None, None
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def isCinePlaying(self):
+        return self.cineClock is not None
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainCineStats(self):
+        ''' **Logic.obtainCineStats(self):  achieved fps, skipped frames and jitter, see CineClock.obtainStats
+            :return: dict of the playback running, else of the last one; None if there was none    ''' ''''''
+        if self.cineClock is not None:
+            return self.cineClock.obtainStats()
+        return self._dict_CineStats
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def onCineTimer_Timeout(self):
+        ''' **Logic.onCineTimer_Timeout:   show the frame due now, re-arm the timer for the deadline of the next one ''' ''''''
+        if self.cineClock is None:      return
+        if self._nodeSeqBrowser_Cine.GetScene() is None:
+            self.stopCinePlayback()     # SeqBrowser removed from the scene
+            return
+        # 01. Latest frame due (the skipped ones are counted by the clock); the views render it at the next event turn
+        idx_Frame = self.cineClock.obtainTick(time.perf_counter())
+        self._nodeSeqBrowser_Cine.SetSelectedItemNumber(idx_Frame)
+        if self._fn_CineFrameShown is not None:
+            self._fn_CineFrameShown(idx_Frame)
+        if INSTRUMENTATION.bool_Enabled:
+            INSTRUMENTATION.instant('CineFrame', {'idx_Frame': idx_Frame, 'Skipped': self.cineClock.int_Skipped})
+        # 02. Next deadline is absolute: the time spent above, and the lateness of this timeout, are not added to it
+        if self.cineClock is not None:  # fn_FrameShown may have stopped the playback
+            float_Delay = self.cineClock.float_NextDeadline - time.perf_counter()
+            self.timer_Cine.start(max(0, int(math.ceil(1000 * float_Delay))))
+
 
 
 
@@ -484,6 +1049,18 @@ class sl__US_SeqViewerTest(ScriptedLoadableModuleTest):
         """Run as few or as many tests as needed here.    """
         self.setUp()
         self.test_sl__US_SeqViewer1()
+        self.setUp()
+        self.test_sl__US_SeqViewer_Instrumentation()
+        self.setUp()
+        self.test_sl__US_SeqViewer_BrowserSwitchRefresh()
+        self.setUp()
+        self.test_sl__US_SeqViewer_FramePrefetch()
+        self.setUp()
+        self.test_sl__US_SeqViewer_SliderThrottle()
+        self.setUp()
+        self.test_sl__US_SeqViewer_CinePlayback()
+        self.setUp()
+        self.test_sl__US_SeqViewer_FrameStore()
 
     def test_sl__US_SeqViewer1(self):
         """ Ideally you should have several levels of tests.  At the lowest level
@@ -503,4 +1080,432 @@ class sl__US_SeqViewerTest(ScriptedLoadableModuleTest):
 
         self.delayDisplay('Test passed')
 
+    # ------------------------------------------------------------------------------------------------------------------
+    def createSyntheticSeqBrowser(self, int_NumberOfFrames, tuple_FrameShape=(1, 64, 64)):
+        """    Sequence browser over int_NumberOfFrames random uint8 frames (K, J, I), as a small ultrasound sequence.    """
+        import numpy as np
+        rng = np.random.default_rng(0)
+        nodeSequence = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLSequenceNode", 'SyntheticUS')
+        nodeFrame = slicer.util.addVolumeFromArray(np.zeros(tuple_FrameShape, dtype=np.uint8), name='SyntheticUS_Frame')
+        for idx_Frame in range(int_NumberOfFrames):
+            slicer.util.updateVolumeFromArray(nodeFrame, rng.integers(0, 256, size=tuple_FrameShape, dtype=np.uint8))
+            nodeSequence.SetDataNodeAtValue(nodeFrame, str(idx_Frame))
+        slicer.mrmlScene.RemoveNode(nodeFrame)
+        nodeSeqBrowser = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLSequenceBrowserNode", 'SyntheticUS_Browser')
+        nodeSeqBrowser.SetAndObserveMasterSequenceNodeID(nodeSequence.GetID())
+        return nodeSeqBrowser
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_sl__US_SeqViewer_Instrumentation(self):
+        """    Disabled, the instrumented methods record nothing; enabled, every call is counted, timed, nested under its
+                  caller, and exported as Chrome trace and speedscope profiles.    """
+        import json
+        import os
+        import shutil
+        import tempfile
+        from sl__US_SeqViewerLib import INSTRUMENTATION
+        from sl__US_SeqViewerLib.Instrumentation import Instrumentation, INT_DurationWindow
+        self.delayDisplay("Starting the test")
+
+        nodeSeqBrowser = self.createSyntheticSeqBrowser(20)
+        logic = sl__US_SeqViewerLogic()
+        logic.getParameterNode().SetNodeReferenceID(STR_SeqBrowserNode_RefRole_Selected, nodeSeqBrowser.GetID())
+        str_Method = 'sl__US_SeqViewerLogic.logicUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex'
+
+        bool_WasEnabled = INSTRUMENTATION.bool_Enabled
+        INSTRUMENTATION.disable()
+        INSTRUMENTATION.reset()
+        str_Dir = None
+        try:
+            # 01. Disabled: nothing recorded
+            for idx_Frame in range(10):
+                logic.logicUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex(idx_Frame)
+            self.assertEqual(INSTRUMENTATION.list_Spans, [])
+            self.assertEqual(INSTRUMENTATION.obtainStatistics(), {})
+
+            # 02. Enabled: call counts, timings, and the nesting under a section
+            INSTRUMENTATION.enable()
+            with INSTRUMENTATION.section('Test.SwitchFrames'):
+                for idx_Frame in range(20):
+                    logic.logicUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex(idx_Frame)
+            INSTRUMENTATION.disable()
+            self.assertEqual(nodeSeqBrowser.GetSelectedItemNumber(), 19)
+            dict_Statistics = INSTRUMENTATION.obtainStatistics()
+            self.assertEqual(dict_Statistics[str_Method]['Count'], 20)
+            self.assertEqual(dict_Statistics['Test.SwitchFrames']['Count'], 1)
+            self.assertLessEqual(dict_Statistics[str_Method]['P50Ms'], dict_Statistics[str_Method]['MaxMs'])
+            self.assertGreaterEqual(dict_Statistics['Test.SwitchFrames']['TotalMs'], dict_Statistics[str_Method]['TotalMs'])
+            self.assertTrue(all(int_Depth == 1 for str_Name, _, _, int_Depth, _, _ in INSTRUMENTATION.list_Spans
+                                if str_Name == str_Method))
+
+            # 03. Exports: one complete event per call, instant events with their arguments, balanced speedscope events
+            str_Dir = tempfile.mkdtemp()
+            INSTRUMENTATION.exportChromeTrace(os.path.join(str_Dir, 'trace.json'))
+            INSTRUMENTATION.exportSpeedscope(os.path.join(str_Dir, 'trace.speedscope.json'))
+            with open(os.path.join(str_Dir, 'trace.json')) as f:
+                list_Events = json.load(f)['traceEvents']
+            self.assertEqual(len([e for e in list_Events if e['name'] == str_Method and e['ph'] == 'X']), 20)
+            self.assertEqual([e['args']['idx_TargetFrame'] for e in list_Events if e['name'] == 'SelectedItemNumber'],
+                             [str(idx_Frame) for idx_Frame in range(20)])
+            with open(os.path.join(str_Dir, 'trace.speedscope.json')) as f:
+                list_SpeedscopeEvents = json.load(f)['profiles'][0]['events']
+            self.assertEqual(len([e for e in list_SpeedscopeEvents if e['type'] == 'O']),
+                             len([e for e in list_SpeedscopeEvents if e['type'] == 'C']))
+
+            # 04. Bounded statistics: the percentiles keep the last INT_DurationWindow calls, the count all of them
+            instrumentation = Instrumentation(bool_Enabled=True)
+            for int_Duration_ns in range(INT_DurationWindow + 100):
+                instrumentation._record('Test.Window', 0, int_Duration_ns, 0, None)
+            self.assertEqual(len(instrumentation.dict_Durations['Test.Window']), INT_DurationWindow)
+            self.assertEqual(instrumentation.obtainStatistics()['Test.Window']['Count'], INT_DurationWindow + 100)
+        finally:
+            INSTRUMENTATION.reset()
+            INSTRUMENTATION.bool_Enabled = bool_WasEnabled
+            if str_Dir:
+                shutil.rmtree(str_Dir, ignore_errors=True)
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_sl__US_SeqViewer_BrowserSwitchRefresh(self):
+        """    Switching between two 1000-frame sequences: the targeted refresh puts the current frame in the proxy node
+                  with one update (the former 'shake' did three), and its latency is logged against the shake's.    """
+        import time
+        import numpy as np
+        self.delayDisplay("Starting the test")
+
+        int_NumberOfFrames, int_Switches = 1000, 20
+        list_SeqBrowsers = [self.createSyntheticSeqBrowser(int_NumberOfFrames) for _ in range(2)]
+        for idx, nodeSeqBrowser in enumerate(list_SeqBrowsers):
+            nodeSeqBrowser.SetSelectedItemNumber(100 + idx)
+        logic = sl__US_SeqViewerLogic()
+        widgetSequences = slicer.modules.sequences.widgetRepresentation()
+
+        def shakeSeqBrowser(nodeSeqBrowser):
+            idx_Frame = nodeSeqBrowser.GetSelectedItemNumber()
+            nodeSeqBrowser.SetSelectedItemNumber(max(idx_Frame - 1, 0))
+            nodeSeqBrowser.SetSelectedItemNumber(min(idx_Frame + 1, nodeSeqBrowser.GetNumberOfItems() - 1))
+            nodeSeqBrowser.SetSelectedItemNumber(idx_Frame)
+
+        def refreshSeqBrowser(nodeSeqBrowser):
+            logic.logicUpdate_RefreshProxyNodes_TargetSeqBrowser(nodeSeqBrowser)
+            slicer.util.getModuleWidget('sl__US_SeqViewer').uiUpdate_PushSlicerScreenUpdate_by_ScheduleRender()
+
+        # 01. Proxy updates per switch, and the proxy shows the selected frame of the sequence
+        nodeSeqBrowser = list_SeqBrowsers[0]
+        nodeSequence = nodeSeqBrowser.GetMasterSequenceNode()
+        nodeProxy = nodeSeqBrowser.GetProxyNode(nodeSequence)
+        list_ProxyUpdates = []
+        int_Tag = nodeProxy.AddObserver(slicer.vtkMRMLVolumeNode.ImageDataModifiedEvent,
+                                        lambda caller, event: list_ProxyUpdates.append(event))
+        dict_ProxyUpdates = {}
+        for str_Refresh, fn_Refresh in (('Shake', shakeSeqBrowser), ('Refresh', refreshSeqBrowser)):
+            list_ProxyUpdates.clear()
+            fn_Refresh(nodeSeqBrowser)
+            dict_ProxyUpdates[str_Refresh] = len(list_ProxyUpdates)
+        nodeProxy.RemoveObserver(int_Tag)
+        self.assertEqual(nodeSeqBrowser.GetSelectedItemNumber(), 100)
+        self.assertLessEqual(dict_ProxyUpdates['Refresh'], 1)
+        self.assertLess(dict_ProxyUpdates['Refresh'], dict_ProxyUpdates['Shake'])
+        self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(nodeProxy),
+                                       slicer.util.arrayFromVolume(nodeSequence.GetNthDataNode(100))))
+
+        # 02. Browser-switch latency, with the event-loop turn that renders it
+        dict_Ms = {}
+        for str_Refresh, fn_Refresh in (('Shake', shakeSeqBrowser), ('Refresh', refreshSeqBrowser)):
+            list_Ms = []
+            for idx_Switch in range(int_Switches):
+                nodeSeqBrowser = list_SeqBrowsers[idx_Switch % 2]
+                startTime = time.perf_counter()
+                widgetSequences.setActiveBrowserNode(nodeSeqBrowser)
+                fn_Refresh(nodeSeqBrowser)
+                slicer.app.processEvents()
+                list_Ms.append(1000 * (time.perf_counter() - startTime))
+            dict_Ms[str_Refresh] = sorted(list_Ms)[int_Switches // 2]
+        logging.info(f'Browser switch, {int_NumberOfFrames} frames, median: shake {dict_Ms["Shake"]:.2f} ms, '
+                     f'targeted refresh {dict_Ms["Refresh"]:.2f} ms;  proxy updates {dict_ProxyUpdates}')
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_sl__US_SeqViewer_FramePrefetch(self):
+        """    Scrubbing a prefetched 500-frame sequence forward then backward: the proxy always shows the selected frame,
+                  most switches are ring-buffer hits, the buffer stays within its budget, a scene save sees the
+                  playback on, and stopping gives the proxy back to the SeqBrowser; the frame views are built once,
+                  follow the frames recorded while prefetching, and are dropped with their sequence.    """
+        import time
+        import numpy as np
+        self.delayDisplay("Starting the test")
+
+        int_NumberOfFrames, tuple_FrameShape = 500, (1, 64, 64)
+        int_BudgetBytes = 32 * int(np.prod(tuple_FrameShape))      # 32 uint8 frames
+        nodeSeqBrowser = self.createSyntheticSeqBrowser(int_NumberOfFrames, tuple_FrameShape)
+        nodeSequence = nodeSeqBrowser.GetMasterSequenceNode()
+        nodeProxy = nodeSeqBrowser.GetProxyNode(nodeSequence)
+        logic = sl__US_SeqViewerLogic()
+        logic.getParameterNode().SetNodeReferenceID(STR_SeqBrowserNode_RefRole_Selected, nodeSeqBrowser.GetID())
+
+        self.assertTrue(logic.startFramePrefetch(nodeSeqBrowser, int_BudgetBytes))
+        self.assertTrue(logic.isFramePrefetching(nodeSeqBrowser))
+        try:
+            # 01. Scrub at ~200 frames/s, forward then backward: the proxy shows the selected frame at every step
+            list_Scrub = list(range(int_NumberOfFrames)) + list(range(int_NumberOfFrames - 1, -1, -1))
+            for idx_Frame in list_Scrub:
+                logic.logicUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex(idx_Frame)
+                self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(nodeProxy),
+                                               slicer.util.arrayFromVolume(nodeSequence.GetNthDataNode(idx_Frame))))
+                slicer.app.processEvents()
+                time.sleep(0.005)
+            dict_Stats = logic.obtainFramePrefetchStats()
+
+            # 01-B. Scene save: saved with the playback of the master sequence on; the prefetch goes on after it
+            slicer.mrmlScene.InvokeEvent(slicer.mrmlScene.StartSaveEvent)
+            self.assertTrue(nodeSeqBrowser.GetPlayback(nodeSequence))
+            slicer.mrmlScene.InvokeEvent(slicer.mrmlScene.EndSaveEvent)
+            self.assertFalse(nodeSeqBrowser.GetPlayback(nodeSequence))
+            logic.logicUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex(7)
+            self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(nodeProxy),
+                                           slicer.util.arrayFromVolume(nodeSequence.GetNthDataNode(7))))
+        finally:
+            logic.stopFramePrefetch()
+        logging.info(f'Frame prefetch, {int_NumberOfFrames} frames scrubbed forward and backward: hit rate '
+                     f'{100 * dict_Stats["HitRate"]:.1f} %, {dict_Stats["Capacity"]} frames buffered, '
+                     f'{dict_Stats["UsedBytes"]} of {dict_Stats["BudgetBytes"]} bytes')
+        # Frame 0 shown at the start, then one lookup per change of the selected item (the turn at 499 is not one)
+        self.assertEqual(dict_Stats['Hits'] + dict_Stats['Misses'], len(list_Scrub) - 1)
+        self.assertGreater(dict_Stats['HitRate'], 0.5)
+        self.assertLessEqual(dict_Stats['UsedBytes'], int_BudgetBytes)
+
+        # 02. Stopped: the SeqBrowser updates its proxy node again
+        self.assertFalse(logic.isFramePrefetching())
+        self.assertIsNone(logic.obtainFramePrefetchStats())
+        self.assertTrue(nodeSeqBrowser.GetPlayback(nodeSequence))
+        nodeSeqBrowser.SetSelectedItemNumber(123)
+        self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(nodeProxy),
+                                       slicer.util.arrayFromVolume(nodeSequence.GetNthDataNode(123))))
+
+        # 03. Started again on the same sequence: its frame views are reused, not built again
+        list_FrameViews = logic.obtainFrameViews(nodeSequence)
+        self.assertTrue(logic.startFramePrefetch(nodeSeqBrowser, int_BudgetBytes))
+        logic.stopFramePrefetch()
+        self.assertIs(logic.obtainFrameViews(nodeSequence), list_FrameViews)
+
+        # 04. Frames replaced and added while prefetching (e.g. recording): shown from the new frames, not stale views
+        self.assertTrue(logic.startFramePrefetch(nodeSeqBrowser, int_BudgetBytes))
+        try:
+            nodeFrame = slicer.util.addVolumeFromArray(np.full(tuple_FrameShape, 7, dtype=np.uint8), name='Recorded')
+            nodeSequence.SetDataNodeAtValue(nodeFrame, '3')
+            nodeSequence.SetDataNodeAtValue(nodeFrame, str(int_NumberOfFrames))
+            slicer.mrmlScene.RemoveNode(nodeFrame)
+            self.assertTrue(logic.isFramePrefetching(nodeSeqBrowser))
+            for idx_Frame in (3, int_NumberOfFrames):
+                logic.logicUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex(idx_Frame)
+                self.assertTrue(np.all(slicer.util.arrayFromVolume(nodeProxy) == 7))
+        finally:
+            logic.stopFramePrefetch()
+
+        # 05. Sequence removed from the scene: its frame views are dropped, a running prefetch of it stops
+        self.assertTrue(logic.startFramePrefetch(nodeSeqBrowser, int_BudgetBytes))
+        str_SequenceID = nodeSequence.GetID()
+        slicer.mrmlScene.RemoveNode(nodeSequence)
+        self.assertFalse(logic.isFramePrefetching())
+        self.assertNotIn(str_SequenceID, logic._dict_FrameViews)
 
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_sl__US_SeqViewer_SliderThrottle(self):
+        """    A fast slider drag over 2000 frames: intermediate values are dropped, at most one frame is shown per
+                  event-loop turn, and the viewer settles on the exact final frame.    """
+        import numpy as np
+        self.delayDisplay("Starting the test")
+
+        int_NumberOfFrames, int_ValuesPerTurn = 2000, 20
+        nodeSeqBrowser = self.createSyntheticSeqBrowser(int_NumberOfFrames)
+        nodeSequence = nodeSeqBrowser.GetMasterSequenceNode()
+        slicer.util.selectModule('sl__US_SeqViewer')
+        widget = slicer.util.getModuleWidget('sl__US_SeqViewer')
+        widget.onSelectedNodeChanged(nodeSeqBrowser)
+        self.assertEqual(widget.ui.slider_SeqFrame.value, INT_SliderFrameIndex_Min)
+        widget.resetSliderFrameCounters()
+
+        # 01. Drag: a mouse drag delivers several slider values per event-loop turn
+        for int_Value in range(INT_SliderFrameIndex_Min + 1, INT_SliderFrameIndex_Min + int_NumberOfFrames):
+            widget.ui.slider_SeqFrame.value = int_Value
+            if int_Value % int_ValuesPerTurn == 0:
+                slicer.app.processEvents()
+        # 02. Release: the pending value is shown within one frame period
+        startTime = time.perf_counter()
+        while widget.obtainSliderFrameCounters()['Pending'] and time.perf_counter() - startTime < 1.0:
+            slicer.app.processEvents()
+            time.sleep(0.001)
+
+        dict_Counters = widget.obtainSliderFrameCounters()
+        logging.info(f'Slider drag over {int_NumberOfFrames} frames at {widget.float_SliderTargetFps} fps: {dict_Counters}')
+        self.assertEqual(dict_Counters['Pending'], 0)
+        self.assertEqual(dict_Counters['Requested'], int_NumberOfFrames - 1)
+        self.assertEqual(dict_Counters['Rendered'] + dict_Counters['Dropped'], dict_Counters['Requested'])
+        self.assertLessEqual(dict_Counters['Rendered'], int_NumberOfFrames // int_ValuesPerTurn + 1)
+        self.assertGreater(dict_Counters['Dropped'], 0)
+        self.assertEqual(nodeSeqBrowser.GetSelectedItemNumber(), int_NumberOfFrames - 1)
+        self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(nodeSeqBrowser.GetProxyNode(nodeSequence)),
+                                       slicer.util.arrayFromVolume(nodeSequence.GetNthDataNode(int_NumberOfFrames - 1))))
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_sl__US_SeqViewer_CinePlayback(self):
+        """    Cine playback at 60 fps: it follows the frames in loop and ping-pong modes, keeps its rate, and when showing
+                  a frame takes longer than the frame period it skips frames instead of drifting from the wall clock;
+                  its statistics stay bounded, and the frame rate follows the selected SeqBrowser.    """
+        import numpy as np
+        from sl__US_SeqViewerLib.CinePlayback import STR_CineMode_PingPong
+        self.delayDisplay("Starting the test")
+
+        nodeSeqBrowser = self.createSyntheticSeqBrowser(300)
+        nodeSequence = nodeSeqBrowser.GetMasterSequenceNode()
+        logic = sl__US_SeqViewerLogic()
+
+        def play(float_Fps, str_Mode, float_Seconds, float_ShowSeconds=0.0):
+            list_Frames = []
+            def onFrameShown(idx_Frame):
+                list_Frames.append(idx_Frame)
+                time.sleep(float_ShowSeconds)      # A slow machine: showing a frame takes float_ShowSeconds
+            nodeSeqBrowser.SetSelectedItemNumber(0)
+            startTime = time.perf_counter()
+            self.assertTrue(logic.startCinePlayback(nodeSeqBrowser, float_Fps, str_Mode, fn_FrameShown=onFrameShown))
+            while time.perf_counter() - startTime < float_Seconds:
+                slicer.app.processEvents()
+                time.sleep(0.0005)
+            float_Elapsed = time.perf_counter() - startTime
+            logic.stopCinePlayback()
+            return list_Frames, float_Elapsed, logic.obtainCineStats()
+
+        # 01. Loop: frames go forward, at close to the target rate; the proxy shows the last one
+        list_Frames, float_Elapsed, dict_Stats = play(60.0, STR_CineMode_Loop, 1.0)
+        logging.info(f'Cine playback, loop: {dict_Stats}')
+        self.assertFalse(logic.isCinePlaying())
+        self.assertTrue(all(0 < (idx_Next - idx) % 300 for idx, idx_Next in zip(list_Frames, list_Frames[1:])))
+        self.assertGreater(dict_Stats['AchievedFps'], 0.8 * 60.0)
+        self.assertLessEqual(dict_Stats['AchievedFps'], 1.05 * 60.0)
+        self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(nodeSeqBrowser.GetProxyNode(nodeSequence)),
+                                       slicer.util.arrayFromVolume(nodeSequence.GetNthDataNode(list_Frames[-1]))))
+
+        # 02. PingPong through 10 frames: back and forth, within the sequence
+        nodeSeqBrowser_Short = self.createSyntheticSeqBrowser(10)
+        list_Frames_PingPong = []
+        self.assertTrue(logic.startCinePlayback(nodeSeqBrowser_Short, 120.0, STR_CineMode_PingPong,
+                                                fn_FrameShown=list_Frames_PingPong.append))
+        startTime = time.perf_counter()
+        while time.perf_counter() - startTime < 0.5:
+            slicer.app.processEvents()
+            time.sleep(0.0005)
+        logic.stopCinePlayback()
+        self.assertTrue(set(list_Frames_PingPong) <= set(range(10)))
+        self.assertIn(9, list_Frames_PingPong)
+        idx_Last = list_Frames_PingPong.index(9)
+        self.assertTrue(any(idx_Next < idx for idx, idx_Next in zip(list_Frames_PingPong[idx_Last:],
+                                                                     list_Frames_PingPong[idx_Last + 1:])))
+
+        # 03. Showing a frame takes 40 ms at 60 fps: frames are skipped, the playback stays on the wall clock
+        list_Frames, float_Elapsed, dict_Stats = play(60.0, STR_CineMode_Loop, 1.0, float_ShowSeconds=0.040)
+        logging.info(f'Cine playback, 40 ms per frame: {dict_Stats}')
+        self.assertGreater(dict_Stats['Skipped'], 0)
+        self.assertLess(abs(list_Frames[-1] - float_Elapsed * 60.0), 0.1 * 60.0 + 3)
+
+        # 04. A long playback: the clock keeps the last INT_CineStatsWindow intervals, and counts all of them
+        from sl__US_SeqViewerLib.CinePlayback import INT_CineStatsWindow
+        cineClock = CineClock(60.0, 300)
+        cineClock.start(0.0)
+        for int_Step in range(3 * INT_CineStatsWindow):
+            cineClock.obtainTick(int_Step / 60.0)
+        self.assertEqual(len(cineClock.deque_Intervals), INT_CineStatsWindow)
+        self.assertEqual(cineClock.obtainStats()['Shown'], 3 * INT_CineStatsWindow)
+        self.assertAlmostEqual(cineClock.obtainStats()['AchievedFps'], 60.0, places=3)
+
+        # 05. Selecting a SeqBrowser sets the cine rate to its playback rate
+        nodeSeqBrowser_Short.SetPlaybackRateFps(25.0)
+        slicer.util.selectModule('sl__US_SeqViewer')
+        widget = slicer.util.getModuleWidget('sl__US_SeqViewer')
+        widget.onSelectedNodeChanged(nodeSeqBrowser_Short)
+        self.assertAlmostEqual(widget.ui.spinBox_CineFps.value, 25.0)
+
+        # 06. A frame shown by the playback: the slider and the frame index label follow it
+        widget.onCineFrameShown(7)
+        self.assertEqual(widget.ui.slider_SeqFrame.value, 7 + INT_SliderFrameIndex_Min)
+        self.assertEqual(widget.ui.label_FrameIndex.text, str(widget.ui.slider_SeqFrame.value))
+
+        self.delayDisplay('Test passed')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_sl__US_SeqViewer_FrameStore(self):
+        """    A sequence exported to a frame store file and opened again: the frame-switch function shows its frames and
+                  transforms, opening takes the same time for a 100 000-frame store as for a 200-frame one, and closing
+                  gives the selected SeqBrowser back; the frame store path of the parameter node opens and closes it.    """
+        import shutil
+        import tempfile
+        import numpy as np
+        self.delayDisplay("Starting the test")
+
+        nodeSeqBrowser = self.createSyntheticSeqBrowser(200)
+        nodeSequence = nodeSeqBrowser.GetMasterSequenceNode()
+        for idx_Frame in range(nodeSequence.GetNumberOfDataNodes()):     # Tracked frames: a different origin each
+            nodeSequence.GetNthDataNode(idx_Frame).SetOrigin(idx_Frame, 0.0, 0.0)
+        # The logic of the widget: the widget observes the parameter node, and opens the frame store it names
+        slicer.util.selectModule('sl__US_SeqViewer')
+        widget = slicer.util.getModuleWidget('sl__US_SeqViewer')
+        logic = widget.logic
+        logic.getParameterNode().SetNodeReferenceID(STR_SeqBrowserNode_RefRole_Selected, nodeSeqBrowser.GetID())
+        str_Dir = tempfile.mkdtemp()
+        try:
+            str_Path = os.path.join(str_Dir, 'SyntheticUS.slfs')
+
+            # 01. Export, open: the frame-switch function works on the store; the selector shows no SeqBrowser
+            logic.exportFrameStore(nodeSeqBrowser, str_Path)
+            browser = logic.openFrameStore(str_Path)
+            try:
+                self.assertIsNone(widget.ui.sequenceSelector.currentNode())
+                self.assertIs(logic.obtainSelectedSeqBrowser(), browser)
+                self.assertEqual(logic.getParameterNode().GetParameter(STR_FrameStorePath_Param), str_Path)
+                self.assertEqual(browser.GetNumberOfItems(), 200)
+                nodeProxy = logic.obtainFrameStoreProxyNode()
+                for idx_Frame in (0, 1, 2, 57, 199, 198, 100):
+                    logic.logicUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex(idx_Frame)
+                    self.assertEqual(browser.GetSelectedItemNumber(), idx_Frame)
+                    self.assertTrue(np.array_equal(slicer.util.arrayFromVolume(nodeProxy),
+                                                   slicer.util.arrayFromVolume(nodeSequence.GetNthDataNode(idx_Frame))))
+                    self.assertEqual(nodeProxy.GetOrigin()[0], idx_Frame)
+                with self.assertRaises(ValueError):
+                    logic.logicUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex(200)
+            finally:
+                logic.closeFrameStore()
+            self.assertIs(logic.obtainSelectedSeqBrowser(), nodeSeqBrowser)
+            self.assertEqual(logic.getParameterNode().GetParameter(STR_FrameStorePath_Param), '')
+            self.assertIs(widget.ui.sequenceSelector.currentNode(), nodeSeqBrowser)
+
+            # 01-B. The parameter node names the store (a loaded scene): the widget opens it, and closes it when cleared;
+            #       a missing file is not opened and the parameter is cleared
+            logic.getParameterNode().SetParameter(STR_FrameStorePath_Param, str_Path)
+            self.assertEqual(logic.obtainFrameStorePath(), str_Path)
+            self.assertEqual(widget.ui.slider_SeqFrame.maximum, 200)
+            logic.getParameterNode().SetParameter(STR_FrameStorePath_Param, '')
+            self.assertFalse(logic.isFrameStoreOpen())
+            logic.getParameterNode().SetParameter(STR_FrameStorePath_Param, os.path.join(str_Dir, 'Missing.slfs'))
+            self.assertFalse(logic.isFrameStoreOpen())
+            self.assertEqual(logic.getParameterNode().GetParameter(STR_FrameStorePath_Param), '')
+
+            # 02. Opening time does not depend on the number of frames: only the header is read
+            str_PathLong = os.path.join(str_Dir, 'Long.slfs')
+            FrameStore.create(str_PathLong, 100000, (1, 64, 64), np.uint8).close()
+            dict_OpenMs = {}
+            for str_Name, str_StorePath in (('200 frames', str_Path), ('100000 frames', str_PathLong)):
+                startTime = time.perf_counter()
+                FrameStore.open(str_StorePath).close()
+                dict_OpenMs[str_Name] = 1000 * (time.perf_counter() - startTime)
+            logging.info(f'Frame store open time: {dict_OpenMs}')
+            self.assertLess(dict_OpenMs['100000 frames'], 50.0)
+        finally:
+            logic.closeFrameStore()
+            shutil.rmtree(str_Dir, ignore_errors=True)
+
+        self.delayDisplay('Test passed')
@@ -0,0 +1,130 @@
+import collections
+import math
+
+'''=================================================================================================================='''
+'''=================================================================================================================='''
+#
+# sl__US_SeqViewerLib.CinePlayback
+#       Wall-clock schedule of a cine playback: frame k of the playback is due at  t_Start + k / fps, whatever the
+#       time spent showing the previous ones, so that the playback does not drift; a frame whose successor is
+#       already due is skipped. Driven by a single-shot timer re-armed at every frame:
+#           clock = CineClock(float_Fps, int_NumberOfFrames, STR_CineMode_Loop, idx_Start)
+#           clock.start(time.perf_counter())
+#           on timeout:     idx_Frame = clock.obtainTick(time.perf_counter());   show idx_Frame
+#                           timer.start(ms until clock.float_NextDeadline)
+#       obtainStats(): achieved fps, frames skipped, jitter of the intervals between shown frames; memory bounded
+#       whatever the playback length (running sums, and the last INT_CineStatsWindow intervals for the percentiles).
+#       No Slicer import: times are given by the caller (time.perf_counter()).
+#
+'''------------------------- STRING Macro of  CinePlayback ----------------------------------------------------------'''
+'''------------------------------------------------------------------------------------------------------------------'''
+STR_CineMode_Loop                       = 'Loop'        # 0, 1, ..., n-1, 0, 1, ...
+STR_CineMode_PingPong                   = 'PingPong'    # 0, 1, ..., n-1, n-2, ..., 1, 0, 1, ...
+TUPLE_CineModes                         = (STR_CineMode_Loop, STR_CineMode_PingPong)
+INT_CineStatsWindow                     = 1000          # Intervals kept for the jitter std and P95 (the latest ones)
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Frame Index of a Playback Step  ----------------------------------------------------------------------
+def obtainCineFrameIndex(int_Step, int_NumberOfFrames, str_Mode):
+    """    Frame shown at step int_Step (>= 0) of a playback of int_NumberOfFrames frames in str_Mode.    """
+    if str_Mode not in TUPLE_CineModes:
+        raise ValueError(f'SL_Alert! Unknown cine mode = {str_Mode}, expected one of {TUPLE_CineModes}')
+    if int_NumberOfFrames <= 1:
+        return 0
+    if str_Mode == STR_CineMode_Loop:
+        return int_Step % int_NumberOfFrames
+    int_Period = 2 * (int_NumberOfFrames - 1)
+    int_Phase = int_Step % int_Period
+    return int_Phase if int_Phase < int_NumberOfFrames else int_Period - int_Phase
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Cine Clock  ------------------------------------------------------------------------------------------
+class CineClock:
+    """    Playback schedule at float_Fps from frame idx_Start (going forward), and statistics of the shown frames.
+              float_NextDeadline:   time at which the next frame is due, to re-arm the timer    """
+
+    def __init__(self, float_Fps, int_NumberOfFrames, str_Mode=STR_CineMode_Loop, idx_Start=0):
+        if float_Fps <= 0:
+            raise ValueError(f'SL_Alert! Invalid float_Fps = {float_Fps}')
+        obtainCineFrameIndex(0, int_NumberOfFrames, str_Mode)    # Validates str_Mode
+        self.float_Fps = float(float_Fps)
+        self.int_NumberOfFrames = int(int_NumberOfFrames)
+        self.str_Mode = str_Mode
+        self.int_StepOffset = min(max(int(idx_Start), 0), max(self.int_NumberOfFrames - 1, 0))
+        self.float_StartTime = None
+        self.float_NextDeadline = None
+        self._int_LastStep = None
+        self.int_Shown = 0
+        self.int_Skipped = 0
+        # Statistics of the shown frames: running sums over the whole playback, the latest intervals in a window
+        self._float_LastShownTime = None
+        self.deque_Intervals = collections.deque(maxlen=INT_CineStatsWindow)
+        self.int_Intervals = 0
+        self.float_IntervalSum = 0.0
+        self.float_DeviationMax = 0.0   # Largest |interval - target period|
+        self.float_LatenessSum = 0.0    # Time of the shown frames after their deadline
+        self.float_LatenessMax = 0.0
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def start(self, float_Now):
+        self.float_StartTime = float_Now
+        self.float_NextDeadline = float_Now
+        self._int_LastStep = None
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainTick(self, float_Now):
+        """    Frame to show at float_Now: the latest one due. Frames due since the previous tick but not shown are
+                  counted as skipped. Moves float_NextDeadline to the deadline of the following frame.
+                  :return: idx_Frame    """
+        int_Step = max(0, int(math.floor((float_Now - self.float_StartTime) * self.float_Fps)))
+        if self._int_LastStep is not None:
+            int_Step = max(int_Step, self._int_LastStep + 1)     # A tick a little early still shows the next frame
+            self.int_Skipped += int_Step - self._int_LastStep - 1
+        self._int_LastStep = int_Step
+        self.int_Shown += 1
+        self.recordShownFrame(float_Now, max(0.0, float_Now - (self.float_StartTime + int_Step / self.float_Fps)))
+        self.float_NextDeadline = self.float_StartTime + (int_Step + 1) / self.float_Fps
+        return obtainCineFrameIndex(self.int_StepOffset + int_Step, self.int_NumberOfFrames, self.str_Mode)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def recordShownFrame(self, float_Now, float_Lateness):
+        """    Add a frame shown at float_Now, float_Lateness after its deadline, to the statistics.    """
+        self.float_LatenessSum += float_Lateness
+        self.float_LatenessMax = max(self.float_LatenessMax, float_Lateness)
+        if self._float_LastShownTime is not None:
+            float_Interval = float_Now - self._float_LastShownTime
+            self.deque_Intervals.append(float_Interval)
+            self.int_Intervals += 1
+            self.float_IntervalSum += float_Interval
+            self.float_DeviationMax = max(self.float_DeviationMax, abs(float_Interval - 1.0 / self.float_Fps))
+        self._float_LastShownTime = float_Now
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainStats(self):
+        """    :return: dict   {'TargetFps', 'AchievedFps', 'Shown', 'Skipped', 'IntervalMeanMs', 'JitterStdMs',
+                                'JitterP95Ms', 'JitterMaxMs', 'LatenessMeanMs', 'LatenessMaxMs'}
+                  Jitter: deviation of the intervals between shown frames from their mean (std), and from the target
+                  period (P95, Max of the absolute deviation). Std and P95 are of the last INT_CineStatsWindow
+                  intervals; the other values are of the whole playback.    """
+        float_Period = 1.0 / self.float_Fps
+        dict_Stats = {'TargetFps': self.float_Fps, 'AchievedFps': 0.0, 'Shown': self.int_Shown,
+                      'Skipped': self.int_Skipped, 'IntervalMeanMs': 0.0, 'JitterStdMs': 0.0, 'JitterP95Ms': 0.0,
+                      'JitterMaxMs': 0.0, 'LatenessMeanMs': 0.0, 'LatenessMaxMs': 0.0}
+        if self.int_Shown:
+            dict_Stats['LatenessMeanMs'] = 1000 * self.float_LatenessSum / self.int_Shown
+            dict_Stats['LatenessMaxMs'] = 1000 * self.float_LatenessMax
+        if self.int_Intervals:
+            int_Window = len(self.deque_Intervals)
+            float_WindowMean = sum(self.deque_Intervals) / int_Window
+            list_Deviations = sorted(abs(float_Interval - float_Period) for float_Interval in self.deque_Intervals)
+            dict_Stats.update({
+                'AchievedFps': self.int_Intervals / self.float_IntervalSum if self.float_IntervalSum > 0 else 0.0,
+                'IntervalMeanMs': 1000 * self.float_IntervalSum / self.int_Intervals,
+                'JitterStdMs': 1000 * math.sqrt(sum((x - float_WindowMean) ** 2 for x in self.deque_Intervals) / int_Window),
+                'JitterP95Ms': 1000 * list_Deviations[min(int(0.95 * int_Window), int_Window - 1)],
+                'JitterMaxMs': 1000 * self.float_DeviationMax})
+        return dict_Stats
@@ -0,0 +1,145 @@
+import threading
+
+'''=================================================================================================================='''
+'''=================================================================================================================='''
+#
+# sl__US_SeqViewerLib.FramePrefetch
+#       Ring buffer of ready frames around the current frame of a sequence, filled ahead in the scrub direction by a
+#       background worker, so that a frame switch is a buffer lookup:
+#           prefetcher = FramePrefetcher(fn_ReadFrame, int_NumberOfFrames, tuple_FrameShape, dtype, int_BudgetBytes)
+#           prefetcher.start()
+#           bool_Hit = prefetcher.copyFrame(idx_Frame, arr_Out)     # buffer hit, else read now (a miss)
+#           prefetcher.stop()
+#       fn_ReadFrame(idx_Frame, arr_Out) writes frame idx_Frame into arr_Out; it is called from the worker thread,
+#       so it must not touch MRML nodes nor Qt objects (read NumPy arrays, or files).
+#       Frame idx lives in slot idx % capacity: any window of 'capacity' consecutive frames fits without collision.
+#       No Slicer import; NumPy is imported when a prefetcher is created, not with the module.
+#
+'''------------------------- STRING Macro of  FramePrefetch ---------------------------------------------------------'''
+'''------------------------------------------------------------------------------------------------------------------'''
+INT_FramePrefetchBudgetBytes_Default    = 256 * 1024 * 1024
+INT_FramePrefetchCapacity_Min           = 2
+FLOAT_FramePrefetchAheadFraction        = 0.75      # Part of the window ahead of the current frame, in scrub direction
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Frame Prefetcher  ------------------------------------------------------------------------------------
+class FramePrefetcher:
+    """    Bounded ring buffer of frames (capacity = int_BudgetBytes // frame bytes, at least 2, at most all frames),
+              kept filled around the last requested frame by a daemon worker thread.
+              Statistics: int_Hits, int_Misses (frames read synchronously), obtainStats()    """
+
+    def __init__(self, fn_ReadFrame, int_NumberOfFrames, tuple_FrameShape, dtype,
+                 int_BudgetBytes=INT_FramePrefetchBudgetBytes_Default):
+        import numpy as np
+        self.fn_ReadFrame = fn_ReadFrame
+        self.int_NumberOfFrames = int(int_NumberOfFrames)
+        self.tuple_FrameShape = tuple(tuple_FrameShape)
+        self.dtype = np.dtype(dtype)
+        self.int_FrameBytes = int(np.prod(self.tuple_FrameShape)) * self.dtype.itemsize
+        self.int_BudgetBytes = int(int_BudgetBytes)
+        self.int_Capacity = min(self.int_NumberOfFrames,
+                                max(INT_FramePrefetchCapacity_Min, self.int_BudgetBytes // max(self.int_FrameBytes, 1)))
+        self.arr_Slots = np.empty((self.int_Capacity,) + self.tuple_FrameShape, dtype=self.dtype)
+        self.arr_SlotFrame = np.full(self.int_Capacity, -1, dtype=np.int64)    # Frame held by each slot, -1: none
+
+        self.int_Hits = 0
+        self.int_Misses = 0
+        self.int_Prefetched = 0
+        self._idx_Current = 0
+        self._int_Direction = 1         # +1 forward, -1 backward: the side of the window that gets most of it
+        self._int_Generation = 0        # Incremented at every request: the worker restarts its window
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._bool_Stop = False
+        self._thread = None
+
+    # ==================================================================================================================
+    # -----------        Worker     ------------------------------------------------------------------------------------
+    def start(self):
+        if self._thread is None:
+            self._bool_Stop = False
+            self._thread = threading.Thread(target=self._run, name='FramePrefetcher', daemon=True)
+            self._thread.start()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def stop(self):
+        with self._condition:
+            self._bool_Stop = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainWindow(self, idx_Current, int_Direction):
+        """    Frames to keep buffered around idx_Current, nearest first, mostly in int_Direction; clipped to the sequence.  """
+        int_Ahead = max(1, int(round(FLOAT_FramePrefetchAheadFraction * (self.int_Capacity - 1))))
+        int_Behind = self.int_Capacity - 1 - int_Ahead
+        list_Window = [idx_Current]
+        for int_Step in range(1, max(int_Ahead, int_Behind) + 1):
+            if int_Step <= int_Ahead:
+                list_Window.append(idx_Current + int_Direction * int_Step)
+            if int_Step <= int_Behind:
+                list_Window.append(idx_Current - int_Direction * int_Step)
+        return [idx for idx in list_Window if 0 <= idx < self.int_NumberOfFrames]
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def _run(self):
+        import numpy as np
+        arr_Scratch = np.empty(self.tuple_FrameShape, dtype=self.dtype)
+        while True:
+            with self._condition:
+                if self._bool_Stop:
+                    return
+                int_Generation = self._int_Generation
+                list_Missing = [idx for idx in self.obtainWindow(self._idx_Current, self._int_Direction)
+                                if self.arr_SlotFrame[idx % self.int_Capacity] != idx]
+                if not list_Missing:
+                    self._condition.wait()
+                    continue
+            for idx_Frame in list_Missing:
+                # Read outside the lock (the slow part), publish under it; a newer request restarts the window
+                self.fn_ReadFrame(idx_Frame, arr_Scratch)
+                with self._condition:
+                    if self._bool_Stop or self._int_Generation != int_Generation:
+                        break
+                    int_Slot = idx_Frame % self.int_Capacity
+                    self.arr_Slots[int_Slot] = arr_Scratch
+                    self.arr_SlotFrame[int_Slot] = idx_Frame
+                    self.int_Prefetched += 1
+
+    # ==================================================================================================================
+    # -----------        Lookup     ------------------------------------------------------------------------------------
+    def copyFrame(self, idx_Frame, arr_Out):
+        """    Write frame idx_Frame into arr_Out: from the buffer (hit), else read now and buffered (miss).
+                  Moves the window to idx_Frame, in the direction of the move.   :return: True on a buffer hit    """
+        int_Slot = idx_Frame % self.int_Capacity
+        with self._condition:
+            if idx_Frame != self._idx_Current:
+                self._int_Direction = 1 if idx_Frame > self._idx_Current else -1
+            self._idx_Current = idx_Frame
+            self._int_Generation += 1
+            bool_Hit = self.arr_SlotFrame[int_Slot] == idx_Frame
+            if bool_Hit:
+                arr_Out[...] = self.arr_Slots[int_Slot]
+                self.int_Hits += 1
+            self._condition.notify_all()
+        if not bool_Hit:
+            self.fn_ReadFrame(idx_Frame, arr_Out)
+            with self._condition:
+                self.arr_Slots[int_Slot] = arr_Out
+                self.arr_SlotFrame[int_Slot] = idx_Frame
+                self.int_Misses += 1
+        return bool(bool_Hit)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainStats(self):
+        """    :return: dict   {'Hits', 'Misses', 'HitRate', 'Prefetched', 'Capacity', 'FrameBytes', 'BudgetBytes',
+                                'UsedBytes'}    UsedBytes: memory of the ring buffer, allocated once    """
+        int_Requests = self.int_Hits + self.int_Misses
+        return {'Hits': self.int_Hits, 'Misses': self.int_Misses,
+                'HitRate': self.int_Hits / int_Requests if int_Requests else 0.0, 'Prefetched': self.int_Prefetched,
+                'Capacity': self.int_Capacity, 'FrameBytes': self.int_FrameBytes, 'BudgetBytes': self.int_BudgetBytes,
+                'UsedBytes': int(self.arr_Slots.nbytes)}
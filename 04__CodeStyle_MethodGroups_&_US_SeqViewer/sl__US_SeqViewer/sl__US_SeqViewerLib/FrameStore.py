@@ -0,0 +1,184 @@
+import json
+import os
+
+'''=================================================================================================================='''
+'''=================================================================================================================='''
+#
+# sl__US_SeqViewerLib.FrameStore
+#       On-disk frame store for sequences longer than the RAM: one file holding
+#           a fixed-stride array of frames     (N, K, J, I)   any scalar type
+#           per-frame IJKToRAS transforms      (N, 4, 4)      float64
+#           per-frame timestamps               (N,)           float64, seconds
+#       behind a small JSON header, each array at a page-aligned offset. The arrays are memory-mapped: opening a store
+#       reads the header only (constant time, whatever the number of frames), and the OS pages in the frames that are
+#       read, not the others.
+#           store = FrameStore.create('/data/clip.slfs', int_NumberOfFrames, tuple_FrameShape, np.uint8)
+#           store.writeFrame(idx_Frame, arr_Frame, arr_IJKToRAS, float_Timestamp);   store.close()
+#           store = FrameStore.open('/data/clip.slfs');   store.readFrame(idx_Frame, arr_Out)
+#       store.readFrame is a FramePrefetcher fn_ReadFrame: the prefetch worker is the one paging the frames in.
+#       FrameStoreBrowser shows a store through the vtkMRMLSequenceBrowserNode methods the viewer uses.
+#       No Slicer import; NumPy is imported when a store is created or opened, not with the module.
+#
+'''------------------------- STRING Macro of  FrameStore ------------------------------------------------------------'''
+'''------------------------------------------------------------------------------------------------------------------'''
+BYTES_FrameStore_Magic                  = b'SLUSFRM1'
+INT_FrameStore_Version                  = 1
+INT_FrameStore_Alignment                = 4096      # Offset of every array: a multiple of the page size
+FLOAT_FrameStore_DefaultFps             = 30.0      # Playback rate when the timestamps do not give one
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Frame Store  -----------------------------------------------------------------------------------------
+class FrameStore:
+    """    Memory-mapped frames, transforms and timestamps of a frame store file; use FrameStore.create / FrameStore.open.
+              arr_Frames, arr_Transforms, arr_Timestamps:   np.memmap, read-only unless opened writable    """
+
+    def __init__(self, str_Path, dict_Header, bool_Writable):
+        import numpy as np
+        self.str_Path = str_Path
+        self.int_NumberOfFrames = int(dict_Header['NumberOfFrames'])
+        self.tuple_FrameShape = tuple(dict_Header['FrameShape'])
+        self.dtype = np.dtype(dict_Header['DType'])
+        self.bool_Writable = bool_Writable
+        self.int_FramesRead = 0
+        str_Mode = 'r+' if bool_Writable else 'r'
+        dict_Offsets = dict_Header['Offsets']
+        self.arr_Frames = np.memmap(str_Path, dtype=self.dtype, mode=str_Mode, offset=dict_Offsets['Frames'],
+                                    shape=(self.int_NumberOfFrames,) + self.tuple_FrameShape)
+        self.arr_Transforms = np.memmap(str_Path, dtype=np.float64, mode=str_Mode, offset=dict_Offsets['Transforms'],
+                                        shape=(self.int_NumberOfFrames, 4, 4))
+        self.arr_Timestamps = np.memmap(str_Path, dtype=np.float64, mode=str_Mode, offset=dict_Offsets['Timestamps'],
+                                        shape=(self.int_NumberOfFrames,))
+
+    # ==================================================================================================================
+    # -----------        Create / Open / Close     ---------------------------------------------------------------------
+    @classmethod
+    def create(cls, str_Path, int_NumberOfFrames, tuple_FrameShape, dtype):
+        """    New store file of int_NumberOfFrames frames, allocated but not written (sparse where the file system
+                  allows it): identity transforms, timestamps 0.    :return: FrameStore, writable    """
+        if int_NumberOfFrames <= 0:
+            raise ValueError(f'SL_Alert! Invalid int_NumberOfFrames = {int_NumberOfFrames}')
+        import numpy as np
+        tuple_FrameShape, dtype = tuple(int(x) for x in tuple_FrameShape), np.dtype(dtype)
+        int_FrameBytes = int(np.prod(tuple_FrameShape)) * dtype.itemsize
+        dict_Header = {'Version': INT_FrameStore_Version, 'NumberOfFrames': int(int_NumberOfFrames),
+                       'FrameShape': list(tuple_FrameShape), 'DType': dtype.str, 'FrameBytes': int_FrameBytes}
+        # Layout:  magic | header length | header (JSON) | frames | transforms | timestamps;  arrays page-aligned
+        int_Frames = INT_FrameStore_Alignment
+        int_Transforms = alignOffset(int_Frames + int_NumberOfFrames * int_FrameBytes)
+        int_Timestamps = alignOffset(int_Transforms + int_NumberOfFrames * 16 * 8)
+        dict_Header['Offsets'] = {'Frames': int_Frames, 'Transforms': int_Transforms, 'Timestamps': int_Timestamps}
+        bytes_Header = json.dumps(dict_Header).encode('utf-8')
+        if len(BYTES_FrameStore_Magic) + 8 + len(bytes_Header) > int_Frames:
+            raise ValueError(f'SL_Alert! Frame store header too long: {len(bytes_Header)} bytes')
+        with open(str_Path, 'wb') as f:
+            f.write(BYTES_FrameStore_Magic)
+            f.write(len(bytes_Header).to_bytes(8, 'little'))
+            f.write(bytes_Header)
+            f.truncate(int_Timestamps + int_NumberOfFrames * 8)
+
+        store = cls(str_Path, dict_Header, bool_Writable=True)
+        store.arr_Transforms[...] = np.eye(4)
+        return store
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @classmethod
+    def open(cls, str_Path, bool_Writable=False):
+        """    Open a store file: reads its header and maps its arrays, no frame is read.    :return: FrameStore    """
+        with open(str_Path, 'rb') as f:
+            if f.read(len(BYTES_FrameStore_Magic)) != BYTES_FrameStore_Magic:
+                raise ValueError(f'SL_Alert! Not a frame store file: {str_Path}')
+            int_HeaderBytes = int.from_bytes(f.read(8), 'little')
+            dict_Header = json.loads(f.read(int_HeaderBytes).decode('utf-8'))
+        if dict_Header.get('Version') != INT_FrameStore_Version:
+            raise ValueError(f'SL_Alert! Unsupported frame store version = {dict_Header.get("Version")}: {str_Path}')
+        int_Size = dict_Header['Offsets']['Timestamps'] + 8 * dict_Header['NumberOfFrames']
+        if os.path.getsize(str_Path) < int_Size:
+            raise ValueError(f'SL_Alert! Truncated frame store file: {str_Path}')
+        return cls(str_Path, dict_Header, bool_Writable)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def flush(self):
+        if self.bool_Writable:
+            for arr in (self.arr_Frames, self.arr_Transforms, self.arr_Timestamps):
+                arr.flush()
+
+    def close(self):
+        """    Flush (writable), and drop the memory maps.    """
+        self.flush()
+        self.arr_Frames = self.arr_Transforms = self.arr_Timestamps = None
+
+    # ==================================================================================================================
+    # -----------        Frames     ------------------------------------------------------------------------------------
+    def readFrame(self, idx_Frame, arr_Out):
+        """    Copy frame idx_Frame into arr_Out (pages it in); a FramePrefetcher fn_ReadFrame.    """
+        arr_Out[...] = self.arr_Frames[idx_Frame]
+        self.int_FramesRead += 1
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def writeFrame(self, idx_Frame, arr_Frame, arr_IJKToRAS=None, float_Timestamp=None):
+        if not self.bool_Writable:
+            raise ValueError(f'SL_Alert! Frame store opened read-only: {self.str_Path}')
+        self.arr_Frames[idx_Frame] = arr_Frame
+        if arr_IJKToRAS is not None:
+            self.arr_Transforms[idx_Frame] = arr_IJKToRAS
+        if float_Timestamp is not None:
+            self.arr_Timestamps[idx_Frame] = float_Timestamp
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainFps(self):
+        """    Acquisition rate from the timestamps; FLOAT_FrameStore_DefaultFps if they do not increase.    """
+        if self.int_NumberOfFrames < 2:
+            return FLOAT_FrameStore_DefaultFps
+        float_Duration = float(self.arr_Timestamps[-1] - self.arr_Timestamps[0])
+        return (self.int_NumberOfFrames - 1) / float_Duration if float_Duration > 0 else FLOAT_FrameStore_DefaultFps
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+def alignOffset(int_Offset):
+    return -(-int_Offset // INT_FrameStore_Alignment) * INT_FrameStore_Alignment
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Frame Store Browser  ---------------------------------------------------------------------------------
+class FrameStoreBrowser:
+    """    A frame store seen through the vtkMRMLSequenceBrowserNode methods used by the frame-switch functions, the
+              slider and the cine playback (GetNumberOfItems, Get/SetSelectedItemNumber, GetPlaybackRateFps, ...).
+              SetSelectedItemNumber calls fn_ShowFrame(idx_Frame), which puts the frame into a proxy volume.
+              After close(), GetScene() returns None, as for a node removed from the scene.    """
+
+    def __init__(self, store, fn_ShowFrame):
+        self.store = store
+        self.fn_ShowFrame = fn_ShowFrame
+        self._idx_Selected = 0
+        self._bool_Open = True
+
+    def close(self):
+        self._bool_Open = False
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def GetID(self):
+        return f'FrameStore:{self.store.str_Path}'
+
+    def GetScene(self):
+        return self.store if self._bool_Open else None
+
+    def GetNumberOfItems(self):
+        return self.store.int_NumberOfFrames
+
+    def GetSelectedItemNumber(self):
+        return self._idx_Selected
+
+    def SetSelectedItemNumber(self, idx_Frame):
+        if not 0 <= idx_Frame < self.store.int_NumberOfFrames:
+            raise ValueError(f'SL_Alert! Invalid idx_Frame = {idx_Frame}')
+        self._idx_Selected = idx_Frame
+        self.fn_ShowFrame(idx_Frame)
+
+    def GetPlaybackRateFps(self):
+        return self.store.obtainFps()
+
+    def SetPlaybackActive(self, bool_Active):
+        pass    # No playback of its own
@@ -0,0 +1,236 @@
+import collections
+import functools
+import os
+import threading
+import time
+
+'''=================================================================================================================='''
+'''=================================================================================================================='''
+#
+# sl__US_SeqViewerLib.Instrumentation
+#       Structured tracing of the widget and logic methods, instead of print() lines on every call.
+#       Disabled (default): an instrumented method costs one attribute test more than the plain method; nothing is
+#                           formatted nor stored.
+#       Enabled:            every call is recorded as a span (name, start, duration, nesting depth, thread), giving
+#                           per-method call counts, cumulative and percentile timings, and a trace exported for
+#                               chrome://tracing  /  https://ui.perfetto.dev      (exportChromeTrace)
+#                               https://www.speedscope.app                       (exportSpeedscope)
+#
+#       In the Slicer Python console:
+#           from sl__US_SeqViewerLib import INSTRUMENTATION
+#           INSTRUMENTATION.enable();   ... use the module ...;   INSTRUMENTATION.printSummary()
+#           INSTRUMENTATION.exportChromeTrace('/tmp/seqviewer_trace.json')
+#       or start Slicer with SL__US_SEQVIEWER_TRACE=1 to record from the module start.
+#       No Slicer import.
+#
+'''------------------------- STRING Macro of  Instrumentation -------------------------------------------------------'''
+'''------------------------------------------------------------------------------------------------------------------'''
+STR_Instrumentation_EnvVar              = 'SL__US_SEQVIEWER_TRACE'
+
+# Spans kept for the trace export; beyond it only the statistics keep accumulating
+INT_MaxTraceEvents                      = 1000000
+# Durations kept per method for the percentiles (the latest calls); count, total and max cover every call
+INT_DurationWindow                      = 10000
+
+__all__ = ['STR_Instrumentation_EnvVar', 'Instrumentation', 'INSTRUMENTATION', 'instrumented']
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Instrumentation  -------------------------------------------------------------------------------------
+class Instrumentation:
+    """    Recorder of timed spans (method calls, or sections of them) and instant events.
+              Spans:            list of (str_Name, int_Start_ns, int_Duration_ns, int_Depth, int_ThreadID, dict_Args)
+              dict_Durations:   {str_Name: deque of the durations in ns of the last INT_DurationWindow calls}
+              dict_Totals:      {str_Name: [call count, total ns, max ns]}, of every call    """
+
+    def __init__(self, bool_Enabled=False):
+        self.bool_Enabled = bool_Enabled
+        self._local = threading.local()     # Nesting depth, per thread
+        self.reset()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def enable(self):
+        self.bool_Enabled = True
+
+    def disable(self):
+        self.bool_Enabled = False
+
+    def reset(self):
+        """    Drop all the recorded spans and statistics.    """
+        self.list_Spans = []
+        self.dict_Durations = {}
+        self.dict_Totals = {}
+        self.int_Origin_ns = time.perf_counter_ns()
+
+    # ==================================================================================================================
+    # -----------        Recording      --------------------------------------------------------------------------------
+    def instrument(self, str_Name=None):
+        """    Decorator: record every call of the method as a span named str_Name (default: Class.method).    """
+        def decorator(fn):
+            str_SpanName = str_Name or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.bool_Enabled:
+                    return fn(*args, **kwargs)
+                int_Depth = self._enter()
+                int_Start_ns = time.perf_counter_ns()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self._record(str_SpanName, int_Start_ns, time.perf_counter_ns() - int_Start_ns, int_Depth, None)
+            return wrapper
+        return decorator
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def section(self, str_Name, dict_Args=None):
+        """    Context manager: record the enclosed block as a span.    """
+        return _Section(self, str_Name, dict_Args)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def instant(self, str_Name, dict_Args=None):
+        """    Record a zero-duration event with its arguments (e.g. node ID, frame index).
+                  Callers on a hot path test bool_Enabled first, so that dict_Args is not even built when disabled.    """
+        if not self.bool_Enabled:
+            return
+        self._record(str_Name, time.perf_counter_ns(), 0, getattr(self._local, 'int_Depth', 0), dict_Args,
+                     bool_Instant=True)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def _enter(self):
+        int_Depth = getattr(self._local, 'int_Depth', 0)
+        self._local.int_Depth = int_Depth + 1
+        return int_Depth
+
+    def _record(self, str_Name, int_Start_ns, int_Duration_ns, int_Depth, dict_Args, bool_Instant=False):
+        if not bool_Instant:
+            self._local.int_Depth = int_Depth
+            deque_Durations = self.dict_Durations.get(str_Name)
+            if deque_Durations is None:
+                deque_Durations = self.dict_Durations[str_Name] = collections.deque(maxlen=INT_DurationWindow)
+                self.dict_Totals[str_Name] = [0, 0, 0]
+            deque_Durations.append(int_Duration_ns)
+            list_Totals = self.dict_Totals[str_Name]
+            list_Totals[0] += 1
+            list_Totals[1] += int_Duration_ns
+            list_Totals[2] = max(list_Totals[2], int_Duration_ns)
+        if len(self.list_Spans) < INT_MaxTraceEvents:
+            self.list_Spans.append((str_Name, int_Start_ns, -1 if bool_Instant else int_Duration_ns, int_Depth,
+                                    threading.get_ident(), dict_Args))
+
+    # ==================================================================================================================
+    # -----------        Statistics     --------------------------------------------------------------------------------
+    def obtainStatistics(self):
+        """    :return: dict   {str_Name: {'Count', 'TotalMs', 'MeanMs', 'P50Ms', 'P95Ms', 'P99Ms', 'MaxMs'}}
+                  Count, TotalMs, MeanMs and MaxMs over every call; the percentiles over the last INT_DurationWindow.    """
+        dict_Statistics = {}
+        for str_Name, deque_Durations in self.dict_Durations.items():
+            list_Sorted = sorted(deque_Durations)
+            int_Window = len(list_Sorted)
+            int_Count, int_Total_ns, int_Max_ns = self.dict_Totals[str_Name]
+            obtainPercentileMs = lambda p: list_Sorted[min(int(p / 100.0 * int_Window), int_Window - 1)] / 1e6
+            dict_Statistics[str_Name] = {'Count': int_Count, 'TotalMs': int_Total_ns / 1e6,
+                                         'MeanMs': int_Total_ns / int_Count / 1e6, 'P50Ms': obtainPercentileMs(50),
+                                         'P95Ms': obtainPercentileMs(95), 'P99Ms': obtainPercentileMs(99),
+                                         'MaxMs': int_Max_ns / 1e6}
+        return dict_Statistics
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def printSummary(self):
+        """    Table of the statistics, the most expensive methods (cumulative time) first.    """
+        dict_Statistics = self.obtainStatistics()
+        print(f'{"Method":<72s} {"Count":>8s} {"Total ms":>10s} {"Mean ms":>9s} {"P50 ms":>9s} {"P95 ms":>9s} {"Max ms":>9s}')
+        for str_Name, d in sorted(dict_Statistics.items(), key=lambda item: -item[1]['TotalMs']):
+            print(f'{str_Name:<72s} {d["Count"]:>8d} {d["TotalMs"]:>10.3f} {d["MeanMs"]:>9.3f} {d["P50Ms"]:>9.3f} '
+                  f'{d["P95Ms"]:>9.3f} {d["MaxMs"]:>9.3f}')
+
+    # ==================================================================================================================
+    # -----------        Trace Export   --------------------------------------------------------------------------------
+    def obtainChromeTrace(self):
+        """    Trace Event Format (chrome://tracing, Perfetto): complete events 'X' and instant events 'i', in µs.    """
+        int_Pid = os.getpid()
+        list_Events = []
+        for str_Name, int_Start_ns, int_Duration_ns, int_Depth, int_ThreadID, dict_Args in self.list_Spans:
+            dict_Event = {'name': str_Name, 'pid': int_Pid, 'tid': int_ThreadID,
+                          'ts': (int_Start_ns - self.int_Origin_ns) / 1e3}
+            if int_Duration_ns < 0:
+                dict_Event.update({'ph': 'i', 's': 't'})
+            else:
+                dict_Event.update({'ph': 'X', 'dur': int_Duration_ns / 1e3})
+            if dict_Args:
+                dict_Event['args'] = {str_Key: str(value) for str_Key, value in dict_Args.items()}
+            list_Events.append(dict_Event)
+        return {'traceEvents': list_Events, 'displayTimeUnit': 'ms'}
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def obtainSpeedscope(self, str_ProfileName='sl__US_SeqViewer'):
+        """    speedscope 'evented' profile per thread: open/close events of the spans, rebuilt from their nesting.    """
+        list_Frames, dict_FrameIndex, dict_ByThread = [], {}, {}
+        for str_Name, int_Start_ns, int_Duration_ns, int_Depth, int_ThreadID, _ in self.list_Spans:
+            if int_Duration_ns < 0:
+                continue    # Instant events have no place in a flame graph
+            if str_Name not in dict_FrameIndex:
+                dict_FrameIndex[str_Name] = len(list_Frames)
+                list_Frames.append({'name': str_Name})
+            dict_ByThread.setdefault(int_ThreadID, []).append((int_Start_ns, int_Depth, int_Duration_ns, str_Name))
+
+        list_Profiles = []
+        for int_ThreadID, list_ThreadSpans in dict_ByThread.items():
+            # Spans are recorded when they end (inner first): order them by start, outer first
+            list_ThreadSpans.sort()
+            list_Events, list_Open = [], []
+            for int_Start_ns, _, int_Duration_ns, str_Name in list_ThreadSpans:
+                while list_Open and list_Open[-1][0] <= int_Start_ns:
+                    int_End_ns, idx_Frame = list_Open.pop()
+                    list_Events.append({'type': 'C', 'frame': idx_Frame, 'at': int_End_ns - self.int_Origin_ns})
+                idx_Frame = dict_FrameIndex[str_Name]
+                list_Events.append({'type': 'O', 'frame': idx_Frame, 'at': int_Start_ns - self.int_Origin_ns})
+                list_Open.append((int_Start_ns + int_Duration_ns, idx_Frame))
+            while list_Open:
+                int_End_ns, idx_Frame = list_Open.pop()
+                list_Events.append({'type': 'C', 'frame': idx_Frame, 'at': int_End_ns - self.int_Origin_ns})
+            list_Profiles.append({'type': 'evented', 'name': f'{str_ProfileName} thread {int_ThreadID}',
+                                  'unit': 'nanoseconds', 'startValue': list_Events[0]['at'],
+                                  'endValue': list_Events[-1]['at'], 'events': list_Events})
+        return {'$schema': 'https://www.speedscope.app/file-format-schema.json', 'name': str_ProfileName,
+                'shared': {'frames': list_Frames}, 'profiles': list_Profiles}
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def exportChromeTrace(self, str_Path):
+        import json
+        with open(str_Path, 'w') as f:
+            json.dump(self.obtainChromeTrace(), f)
+
+    def exportSpeedscope(self, str_Path):
+        import json
+        with open(str_Path, 'w') as f:
+            json.dump(self.obtainSpeedscope(), f)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+class _Section:
+    """    Span of a with-block, see Instrumentation.section.    """
+
+    def __init__(self, instrumentation, str_Name, dict_Args):
+        self.instrumentation, self.str_Name, self.dict_Args = instrumentation, str_Name, dict_Args
+        self.int_Start_ns = None
+
+    def __enter__(self):
+        if self.instrumentation.bool_Enabled:
+            self.int_Depth = self.instrumentation._enter()
+            self.int_Start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.int_Start_ns is not None:
+            self.instrumentation._record(self.str_Name, self.int_Start_ns, time.perf_counter_ns() - self.int_Start_ns,
+                                         self.int_Depth, self.dict_Args)
+        return False
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Module-wide Recorder  --------------------------------------------------------------------------------
+INSTRUMENTATION = Instrumentation(bool_Enabled=os.environ.get(STR_Instrumentation_EnvVar, '') not in ('', '0'))
+instrumented = INSTRUMENTATION.instrument
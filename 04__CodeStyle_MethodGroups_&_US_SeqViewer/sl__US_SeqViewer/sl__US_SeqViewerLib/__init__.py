@@ -0,0 +1 @@
+from .Instrumentation import *
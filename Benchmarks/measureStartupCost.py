@@ -0,0 +1,94 @@
+import os
+import sys
+
+'''=================================================================================================================='''
+'''=================================================================================================================='''
+#
+# measureStartupCost
+#       Startup cost of each tutorial module: Slicer startup time with the module added, minus the startup time of
+#       Slicer without any of them. It covers everything the module costs at startup: its import (and the imports
+#       of its dependencies), ScriptedLoadableModule.__init__, and its startupCompleted() handlers.
+#
+#           python measureStartupCost.py --slicer /path/to/Slicer  [--repeat 5]  [--json after.json]
+#           python measureStartupCost.py --slicer /path/to/Slicer  --compare before.json
+#
+#       Run it on two commits (e.g. before and after a change to the module imports) and --compare the JSON files.
+#
+'''------------------------- STRING Macro of  measureStartupCost ----------------------------------------------------'''
+'''------------------------------------------------------------------------------------------------------------------'''
+STR_RepoPath                            = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module name  ->  folder of its .py file, relative to the repository
+DICT_ModulePaths = {
+    't_ApplyThreshold':     os.path.join('02__Interact_Debug_&_Pipeline', 't_ApplyThreshold'),
+    'sl__GUI_HelloWorld':   os.path.join('03__DeveloperFoci_NeatBlanks_&_GUI_HelloWorld', 'sl__GUI_HelloWorld'),
+    'sl__US_SeqViewer':     os.path.join('04__CodeStyle_MethodGroups_&_US_SeqViewer', 'sl__US_SeqViewer'),
+}
+
+# No splash, no main window, exit as soon as startupCompleted() is emitted; no user settings nor .slicerrc.py
+LIST_SlicerStartupArgs = ['--no-splash', '--no-main-window', '--exit-after-startup', '--disable-settings',
+                          '--ignore-slicerrc']
+
+INT_Repeat_Default                      = 5
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Startup Measurement  ---------------------------------------------------------------------------------
+def measureSlicerStartup(str_SlicerPath, list_ModuleNames, int_Repeat=INT_Repeat_Default):
+    """    Median wall time (ms) of int_Repeat Slicer startups with list_ModuleNames added as additional module paths.    """
+    import statistics
+    import subprocess
+    import time
+    list_Args = [str_SlicerPath] + LIST_SlicerStartupArgs
+    for str_ModuleName in list_ModuleNames:
+        list_Args += ['--additional-module-path', os.path.join(STR_RepoPath, DICT_ModulePaths[str_ModuleName])]
+    list_Milliseconds = []
+    for _ in range(int_Repeat):
+        startTime = time.perf_counter()
+        subprocess.run(list_Args, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        list_Milliseconds.append(1000 * (time.perf_counter() - startTime))
+    return statistics.median(list_Milliseconds)
+
+# ----------------------------------------------------------------------------------------------------------------------
+def measureStartupCost(str_SlicerPath, int_Repeat=INT_Repeat_Default):
+    """    :return: dict   {'BaselineMs': startup without modules,   'Modules': {name: startup cost in ms},   'Repeat'}    """
+    float_BaselineMs = measureSlicerStartup(str_SlicerPath, [], int_Repeat)
+    dict_Modules = {str_ModuleName: measureSlicerStartup(str_SlicerPath, [str_ModuleName], int_Repeat) - float_BaselineMs
+                    for str_ModuleName in DICT_ModulePaths}
+    return {'BaselineMs': float_BaselineMs, 'Modules': dict_Modules, 'Repeat': int_Repeat}
+
+# ----------------------------------------------------------------------------------------------------------------------
+def printStartupCost(dict_Report, dict_Before=None):
+    print(f'Slicer startup without the modules: {dict_Report["BaselineMs"]:8.1f} ms   (median of {dict_Report["Repeat"]})')
+    for str_ModuleName, float_Ms in dict_Report['Modules'].items():
+        str_Line = f'    {str_ModuleName:<24s} {float_Ms:+8.1f} ms'
+        if dict_Before and str_ModuleName in dict_Before['Modules']:
+            str_Line += f'      before {dict_Before["Modules"][str_ModuleName]:+8.1f} ms'
+        print(str_Line)
+
+# ----------------------------------------------------------------------------------------------------------------------
+def main(list_Args=None):
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description='Startup cost of the tutorial modules in Slicer.')
+    parser.add_argument('--slicer', required=True, help='Slicer executable')
+    parser.add_argument('--repeat', type=int, default=INT_Repeat_Default, help='startups per measurement')
+    parser.add_argument('--json', help='write the report to this JSON file')
+    parser.add_argument('--compare', help='JSON report of a previous run, printed next to this one')
+    args = parser.parse_args(list_Args)
+
+    dict_Report = measureStartupCost(args.slicer, args.repeat)
+    dict_Before = None
+    if args.compare:
+        with open(args.compare) as f:
+            dict_Before = json.load(f)
+    printStartupCost(dict_Report, dict_Before)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(dict_Report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
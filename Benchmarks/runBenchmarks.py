@@ -0,0 +1,421 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from measureStartupCost import DICT_ModulePaths, STR_RepoPath
+
+'''=================================================================================================================='''
+'''=================================================================================================================='''
+#
+# runBenchmarks
+#       Performance benchmarks of the SL_Tutorials modules on synthetic data, headless:
+#           - threshold throughput (voxels/s) at several volume sizes                  t_ApplyThreshold
+#           - sequence frame-switch latency at several frame counts                    sl__US_SeqViewer
+#           - sequence browser switch latency, as sl__US_SeqViewer switches              sl__US_SeqViewer
+#           - frame-switch latency while scrubbing, SeqBrowser against the frame prefetch  sl__US_SeqViewer
+#           - module widget enter/exit time                                            all three modules
+#           - parameter-node round trip (set + get, with the widget observing it)     all three modules
+#           - parameter get / set, string round trip against the typed cached view     t_ApplyThreshold
+#
+#           Slicer --no-main-window --python-script Benchmarks/runBenchmarks.py  --json results.json
+#           Slicer --no-main-window --python-script Benchmarks/runBenchmarks.py  --update-baseline
+#           Slicer --no-main-window --python-script Benchmarks/runBenchmarks.py  --check
+#           PythonSlicer Benchmarks/runBenchmarks.py       (without Slicer: threshold throughput of the engine only)
+#
+#       By default the run only reports (exit status 0). With --check, results are compared against the stored
+#       baseline (Benchmarks/baseline.json, written by --update-baseline on the reference machine; timings of another
+#       machine are not comparable, so none is shipped): a metric worse than the baseline by more than --tolerance is
+#       a regression, and the exit status is 1. Without a baseline file, --check exits with 2 (nothing was checked).
+#       The threshold throughput is named after what it measured: .Process. (in Slicer) or .Engine. (without Slicer),
+#       so that a baseline of one mode is never compared against a run of the other.
+#
+'''------------------------- STRING Macro of  runBenchmarks ---------------------------------------------------------'''
+'''------------------------------------------------------------------------------------------------------------------'''
+STR_BaselinePath_Default                = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Metric direction
+STR_Better_Higher                       = 'higher'
+STR_Better_Lower                        = 'lower'
+
+# Synthetic data sizes
+LIST_ThresholdShapes                    = [(32, 128, 128), (64, 256, 256), (128, 512, 512)]
+LIST_FrameCounts                        = [10, 100, 1000]
+TUPLE_FrameShape                        = (1, 128, 128)     # One 2D ultrasound frame: K, J, I
+TUPLE_PrefetchFrameShape                = (1, 512, 512)     # A large 2D frame, where a frame copy costs
+FLOAT_ScrubInterval_s                   = 1.0 / 60          # Slider drag: one frame every 1 / 60 s, not timed
+
+INT_Repeat_Default                      = 5
+INT_FrameSwitches_Default               = 200
+INT_EnterExit_Default                   = 20
+INT_RoundTrips_Default                  = 200
+FLOAT_Tolerance_Default                 = 0.25      # 25 % worse than the baseline is a regression
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Helpers  ---------------------------------------------------------------------------------------------
+def isInSlicer():
+    try:
+        import slicer
+        return hasattr(slicer, 'app') and slicer.app is not None
+    except ImportError:
+        return False
+
+# ----------------------------------------------------------------------------------------------------------------------
+def measureSeconds(fn, int_Repeat):
+    """    Wall time of int_Repeat calls of fn(idx), one measure per call.    """
+    import time
+    list_Seconds = []
+    for idx in range(int_Repeat):
+        startTime = time.perf_counter()
+        fn(idx)
+        list_Seconds.append(time.perf_counter() - startTime)
+    return list_Seconds
+
+# ----------------------------------------------------------------------------------------------------------------------
+def obtainPercentile(list_Values, float_Percentile):
+    list_Sorted = sorted(list_Values)
+    return list_Sorted[min(int(round(float_Percentile / 100.0 * (len(list_Sorted) - 1))), len(list_Sorted) - 1)]
+
+# ----------------------------------------------------------------------------------------------------------------------
+def createMetric(value, str_Unit, str_Better):
+    return {'Value': float(value), 'Unit': str_Unit, 'Better': str_Better}
+
+# ----------------------------------------------------------------------------------------------------------------------
+def ensureModuleLoaded(str_ModuleName):
+    """    Load one of the tutorial modules into the running Slicer if it was not started with its module path.    """
+    import slicer
+    if hasattr(slicer.modules, str_ModuleName.lower()):
+        return
+    import qt
+    factoryManager = slicer.app.moduleManager().factoryManager()
+    factoryManager.registerModule(qt.QFileInfo(os.path.join(STR_RepoPath, DICT_ModulePaths[str_ModuleName],
+                                                            str_ModuleName + '.py')))
+    factoryManager.instantiateModules()
+    factoryManager.loadModules([str_ModuleName])
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Benchmarks  ------------------------------------------------------------------------------------------
+def benchmarkThresholdThroughput(list_Shapes=LIST_ThresholdShapes, int_Repeat=INT_Repeat_Default):
+    """    Voxels per second of t_ApplyThresholdLogic.process (in Slicer), or of the NumPy engine (without Slicer).
+              The result cache is off, so that every run computes.    """
+    import numpy as np
+    str_Mode = 'Process' if isInSlicer() else 'Engine'
+    dict_Metrics = {}
+    for tuple_Shape in list_Shapes:
+        arr_Synthetic = np.random.default_rng(0).integers(-1000, 2000, size=tuple_Shape, dtype=np.int16)
+        if isInSlicer():
+            import slicer
+            ensureModuleLoaded('t_ApplyThreshold')
+            from t_ApplyThreshold import t_ApplyThresholdLogic
+            inputVolume = slicer.util.addVolumeFromArray(arr_Synthetic, name='Benchmark_Synthetic')
+            outputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+            logic = t_ApplyThresholdLogic()
+            logic.setResultCacheBudgetBytes(0)
+            fn_Threshold = lambda idx: logic.process(inputVolume, outputVolume, 100 + idx, showResult=False)
+        else:
+            sys.path.insert(0, os.path.join(STR_RepoPath, DICT_ModulePaths['t_ApplyThreshold']))
+            from t_ApplyThresholdLib import thresholdArray
+            arr_Output = np.empty_like(arr_Synthetic)
+            fn_Threshold = lambda idx: thresholdArray(arr_Synthetic, 100 + idx, False, arr_Output)
+        fn_Threshold(-1)    # Warm-up: first allocation of the output
+        float_Seconds = sorted(measureSeconds(fn_Threshold, int_Repeat))[int_Repeat // 2]
+        str_Shape = 'x'.join(str(n) for n in tuple_Shape)
+        dict_Metrics[f't_ApplyThreshold.Threshold.{str_Mode}.VoxelsPerSecond.{str_Shape}'] = createMetric(
+            arr_Synthetic.size / float_Seconds, 'voxel/s', STR_Better_Higher)
+        if isInSlicer():
+            slicer.mrmlScene.RemoveNode(inputVolume)
+            slicer.mrmlScene.RemoveNode(outputVolume)
+    return dict_Metrics
+
+# ----------------------------------------------------------------------------------------------------------------------
+def createSyntheticSequence(int_NumberOfFrames, str_Name='Benchmark_Sequence', tuple_FrameShape=TUPLE_FrameShape):
+    """    Sequence browser over int_NumberOfFrames synthetic ultrasound-like frames.    """
+    import numpy as np
+    import slicer
+    rng = np.random.default_rng(0)
+    sequenceNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLSequenceNode", str_Name)
+    frameVolume = slicer.util.addVolumeFromArray(np.zeros(tuple_FrameShape, dtype=np.uint8), name=str_Name + '_Frame')
+    for idx_Frame in range(int_NumberOfFrames):
+        slicer.util.updateVolumeFromArray(frameVolume, rng.integers(0, 256, size=tuple_FrameShape, dtype=np.uint8))
+        sequenceNode.SetDataNodeAtValue(frameVolume, str(idx_Frame))
+    slicer.mrmlScene.RemoveNode(frameVolume)
+    browserNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLSequenceBrowserNode", str_Name + '_Browser')
+    browserNode.SetAndObserveMasterSequenceNodeID(sequenceNode.GetID())
+    return browserNode
+
+# ----------------------------------------------------------------------------------------------------------------------
+def benchmarkFrameSwitch(list_FrameCounts=LIST_FrameCounts, int_Switches=INT_FrameSwitches_Default):
+    """    Latency of sl__US_SeqViewerLogic switching the selected frame (the slider path), including the event-loop
+              turn that processes the resulting updates; random frames, median and 95th percentile.    """
+    import numpy as np
+    import slicer
+    ensureModuleLoaded('sl__US_SeqViewer')
+    from sl__US_SeqViewer import sl__US_SeqViewerLogic, STR_SeqBrowserNode_RefRole_Selected
+    dict_Metrics = {}
+    for int_NumberOfFrames in list_FrameCounts:
+        browserNode = createSyntheticSequence(int_NumberOfFrames)
+        logic = sl__US_SeqViewerLogic()
+        logic.getParameterNode().SetNodeReferenceID(STR_SeqBrowserNode_RefRole_Selected, browserNode.GetID())
+        arr_Frames = np.random.default_rng(0).integers(0, int_NumberOfFrames, size=int_Switches)
+
+        def switchFrame(idx):
+            logic.logicUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex(int(arr_Frames[idx]))
+            slicer.app.processEvents()
+
+        list_Ms = [1000 * s for s in measureSeconds(switchFrame, int_Switches)]
+        dict_Metrics[f'sl__US_SeqViewer.FrameSwitch.MedianMs.{int_NumberOfFrames}Frames'] = createMetric(
+            obtainPercentile(list_Ms, 50), 'ms', STR_Better_Lower)
+        dict_Metrics[f'sl__US_SeqViewer.FrameSwitch.P95Ms.{int_NumberOfFrames}Frames'] = createMetric(
+            obtainPercentile(list_Ms, 95), 'ms', STR_Better_Lower)
+        slicer.mrmlScene.Clear()
+    return dict_Metrics
+
+# ----------------------------------------------------------------------------------------------------------------------
+def benchmarkFramePrefetch(int_NumberOfFrames=LIST_FrameCounts[1], int_Switches=INT_FrameSwitches_Default):
+    """    Latency of a frame switch of sl__US_SeqViewerLogic while scrubbing forward one frame every
+              FLOAT_ScrubInterval_s (a slider drag), large frames: the SeqBrowser updating its proxy node, against the
+              frame prefetch (ring buffer filled ahead by its worker). Median, 95th percentile, and the speed-up of the
+              prefetch: the opt-in prefetch is worth keeping only while this speed-up stays above 1.    """
+    import time
+    import slicer
+    ensureModuleLoaded('sl__US_SeqViewer')
+    from sl__US_SeqViewer import sl__US_SeqViewerLogic, STR_SeqBrowserNode_RefRole_Selected
+    browserNode = createSyntheticSequence(int_NumberOfFrames, tuple_FrameShape=TUPLE_PrefetchFrameShape)
+    logic = sl__US_SeqViewerLogic()
+    logic.getParameterNode().SetNodeReferenceID(STR_SeqBrowserNode_RefRole_Selected, browserNode.GetID())
+
+    def scrubFrame(idx):
+        time.sleep(FLOAT_ScrubInterval_s)     # Time between two slider values: the prefetch worker reads ahead
+        startTime = time.perf_counter()
+        logic.logicUpdate_SwitchSelection_SelectedSeqBrowser_ChangeFrameIndex((idx + 1) % int_NumberOfFrames)
+        slicer.app.processEvents()
+        return time.perf_counter() - startTime
+
+    dict_Metrics, dict_MedianMs = {}, {}
+    for str_Mode in ('Browser', 'Prefetch'):
+        browserNode.SetSelectedItemNumber(0)
+        if str_Mode == 'Prefetch' and not logic.startFramePrefetch(browserNode):
+            raise ValueError(f'SL_Alert! Frame prefetch not supported for {browserNode.GetID()}')
+        list_Ms = [1000 * scrubFrame(idx) for idx in range(int_Switches)]
+        logic.stopFramePrefetch()
+        dict_MedianMs[str_Mode] = obtainPercentile(list_Ms, 50)
+        dict_Metrics[f'sl__US_SeqViewer.FrameSwitch{str_Mode}.MedianMs.{int_NumberOfFrames}Frames'] = createMetric(
+            dict_MedianMs[str_Mode], 'ms', STR_Better_Lower)
+        dict_Metrics[f'sl__US_SeqViewer.FrameSwitch{str_Mode}.P95Ms.{int_NumberOfFrames}Frames'] = createMetric(
+            obtainPercentile(list_Ms, 95), 'ms', STR_Better_Lower)
+    dict_Metrics[f'sl__US_SeqViewer.FrameSwitchPrefetch.SpeedupVsBrowser.{int_NumberOfFrames}Frames'] = createMetric(
+        dict_MedianMs['Browser'] / dict_MedianMs['Prefetch'] if dict_MedianMs['Prefetch'] else 0.0, 'x',
+        STR_Better_Higher)
+    slicer.mrmlScene.Clear()
+    return dict_Metrics
+
+# ----------------------------------------------------------------------------------------------------------------------
+def benchmarkBrowserSwitch(int_NumberOfFrames=LIST_FrameCounts[-1], int_Switches=INT_FrameSwitches_Default // 4):
+    """    Latency of switching the active sequence browser between two int_NumberOfFrames sequences as
+              sl__US_SeqViewerWidget.onSelectedNodeChanged does it (active browser, the former prefetch stopped, one
+              proxy update, one render of every view scheduled), including the event-loop turn that renders it.    """
+    import slicer
+    ensureModuleLoaded('sl__US_SeqViewer')
+    sequencesWidget = slicer.modules.sequences.widgetRepresentation()
+    widget = slicer.util.getModuleWidget('sl__US_SeqViewer')
+    list_Browsers = [createSyntheticSequence(int_NumberOfFrames, f'Benchmark_Sequence{idx}') for idx in range(2)]
+    for browserNode in list_Browsers:
+        browserNode.SetSelectedItemNumber(int_NumberOfFrames // 2)
+
+    def switchBrowser(idx):
+        browserNode = list_Browsers[idx % 2]
+        sequencesWidget.setActiveBrowserNode(browserNode)
+        widget.logic.stopFramePrefetch()
+        widget.logic.logicUpdate_RefreshProxyNodes_TargetSeqBrowser(browserNode)
+        widget.uiUpdate_PushSlicerScreenUpdate_by_ScheduleRender()
+        slicer.app.processEvents()
+
+    list_Ms = [1000 * s for s in measureSeconds(switchBrowser, int_Switches)]
+    dict_Metrics = {
+        f'sl__US_SeqViewer.BrowserSwitch.MedianMs.{int_NumberOfFrames}Frames': createMetric(
+            obtainPercentile(list_Ms, 50), 'ms', STR_Better_Lower),
+        f'sl__US_SeqViewer.BrowserSwitch.P95Ms.{int_NumberOfFrames}Frames': createMetric(
+            obtainPercentile(list_Ms, 95), 'ms', STR_Better_Lower)}
+    slicer.mrmlScene.Clear()
+    return dict_Metrics
+
+# ----------------------------------------------------------------------------------------------------------------------
+def benchmarkModuleEnterExit(int_Repeat=INT_EnterExit_Default):
+    """    First widget creation (setup) and then widget enter() + exit() of each module.    """
+    import time
+    import slicer
+    dict_Metrics = {}
+    for str_ModuleName in DICT_ModulePaths:
+        ensureModuleLoaded(str_ModuleName)
+        startTime = time.perf_counter()
+        widget = slicer.util.getModuleWidget(str_ModuleName)
+        dict_Metrics[f'{str_ModuleName}.Widget.SetupMs'] = createMetric(
+            1000 * (time.perf_counter() - startTime), 'ms', STR_Better_Lower)
+
+        def enterExit(idx):
+            widget.enter()
+            widget.exit()
+
+        dict_Metrics[f'{str_ModuleName}.Widget.EnterExitMs'] = createMetric(
+            1000 * obtainPercentile(measureSeconds(enterExit, int_Repeat), 50), 'ms', STR_Better_Lower)
+    return dict_Metrics
+
+# ----------------------------------------------------------------------------------------------------------------------
+def benchmarkParameterNodeRoundTrip(int_RoundTrips=INT_RoundTrips_Default):
+    """    SetParameter + GetParameter on the parameter node of each module while its widget is entered, then the
+              pending events are processed, so that every change is timed up to the widget refresh
+              (updateGUIFromParameterNode, deferred by a 0 ms timer in t_ApplyThreshold), as during an interactive
+              session.    """
+    import slicer
+    dict_Metrics = {}
+    for str_ModuleName in DICT_ModulePaths:
+        ensureModuleLoaded(str_ModuleName)
+        widget = slicer.util.getModuleWidget(str_ModuleName)
+        widget.enter()
+        parameterNode = widget.logic.getParameterNode()
+
+        def roundTrip(idx):
+            parameterNode.SetParameter('BenchmarkValue', str(idx))
+            parameterNode.GetParameter('BenchmarkValue')
+            slicer.app.processEvents()
+
+        list_Us = [1e6 * s for s in measureSeconds(roundTrip, int_RoundTrips)]
+        widget.exit()
+        parameterNode.UnsetParameter('BenchmarkValue')
+        dict_Metrics[f'{str_ModuleName}.ParameterNode.RoundTripMedianUs'] = createMetric(
+            obtainPercentile(list_Us, 50), 'us', STR_Better_Lower)
+    return dict_Metrics
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+def benchmarkParameterAccess(int_Repeat=INT_RoundTrips_Default * 50):
+    """    Microbenchmarks of one parameter get and set on the t_ApplyThreshold parameter node: GetParameter + float()
+              and SetParameter(str()) against the typed, cached TypedParameterNode view; no observer but the view's.    """
+    import slicer
+    ensureModuleLoaded('t_ApplyThreshold')
+    from t_ApplyThreshold import t_ApplyThresholdLogic
+    logic = t_ApplyThresholdLogic()
+    parameterNode = logic.getParameterNode()
+    logic.setDefaultParameters(parameterNode)
+    parameters = logic.obtainParameters(parameterNode)
+    dict_Operations = {
+        'GetString':         lambda idx: float(parameterNode.GetParameter('Threshold')),
+        'GetTyped':          lambda idx: parameters.get('Threshold'),
+        'SetString':         lambda idx: parameterNode.SetParameter('Threshold', str(float(idx % 2))),
+        'SetTyped':          lambda idx: parameters.set('Threshold', float(idx % 2)),
+        'SetTypedUnchanged': lambda idx: parameters.set('Threshold', 1.0),
+    }
+    dict_Metrics = {}
+    for str_Operation, fn_Operation in dict_Operations.items():
+        list_Seconds = measureSeconds(fn_Operation, int_Repeat)
+        dict_Metrics[f't_ApplyThreshold.Parameter.{str_Operation}MeanUs'] = createMetric(
+            1e6 * sum(list_Seconds) / int_Repeat, 'us', STR_Better_Lower)
+    return dict_Metrics
+
+
+# ======================================================================================================================
+# ======================================================================================================================
+# ------------     Suite, Report & Baseline  ----------------------------------------------------------------------------
+def runBenchmarkSuite(bool_Quick=False):
+    """    :return: dict   {'Environment': {...},   'Results': {metric name: {'Value', 'Unit', 'Better'}},   'Skipped'}    """
+    import platform
+    import numpy as np
+    dict_Results, list_Skipped = {}, []
+    list_Shapes = LIST_ThresholdShapes[:2] if bool_Quick else LIST_ThresholdShapes
+    list_FrameCounts = LIST_FrameCounts[:2] if bool_Quick else LIST_FrameCounts
+    dict_Results.update(benchmarkThresholdThroughput(list_Shapes))
+    dict_Environment = {'Python': platform.python_version(), 'NumPy': np.__version__, 'Platform': platform.platform(),
+                        'CPUs': os.cpu_count(), 'Slicer': None}
+    if isInSlicer():
+        import slicer
+        dict_Environment['Slicer'] = slicer.app.applicationVersion
+        dict_Results.update(benchmarkFrameSwitch(list_FrameCounts))
+        dict_Results.update(benchmarkFramePrefetch(list_FrameCounts[1]))
+        dict_Results.update(benchmarkBrowserSwitch(list_FrameCounts[-1]))
+        dict_Results.update(benchmarkModuleEnterExit())
+        dict_Results.update(benchmarkParameterNodeRoundTrip())
+        dict_Results.update(benchmarkParameterAccess())
+    else:
+        list_Skipped = ['FrameSwitch', 'FramePrefetch', 'BrowserSwitch', 'ModuleEnterExit', 'ParameterNodeRoundTrip', 'ParameterAccess']
+    return {'Environment': dict_Environment, 'Results': dict_Results, 'Skipped': list_Skipped}
+
+# ----------------------------------------------------------------------------------------------------------------------
+def compareWithBaseline(dict_Results, dict_Baseline, float_Tolerance=FLOAT_Tolerance_Default):
+    """    Per metric of both runs: 'Slowdown' = how many times worse than the baseline (> 1 is worse), and
+              'Regression' if worse by more than float_Tolerance.   :return: {metric name: {...}}    """
+    dict_Comparison = {}
+    for str_Metric, dict_Metric in dict_Results.items():
+        dict_Base = dict_Baseline.get(str_Metric)
+        if not dict_Base or not dict_Base['Value'] or not dict_Metric['Value']:
+            continue
+        if dict_Metric['Better'] == STR_Better_Higher:
+            float_Slowdown = dict_Base['Value'] / dict_Metric['Value']
+        else:
+            float_Slowdown = dict_Metric['Value'] / dict_Base['Value']
+        dict_Comparison[str_Metric] = {'Baseline': dict_Base['Value'], 'Value': dict_Metric['Value'],
+                                       'Slowdown': float_Slowdown, 'Regression': float_Slowdown > 1.0 + float_Tolerance}
+    return dict_Comparison
+
+# ----------------------------------------------------------------------------------------------------------------------
+def printReport(dict_Report, dict_Comparison):
+    for str_Metric, dict_Metric in sorted(dict_Report['Results'].items()):
+        str_Line = f'{str_Metric:<64s} {dict_Metric["Value"]:>14.4g} {dict_Metric["Unit"]:<8s}'
+        if str_Metric in dict_Comparison:
+            dict_Compared = dict_Comparison[str_Metric]
+            str_Line += f'  x{dict_Compared["Slowdown"]:.2f} vs baseline' + ('   REGRESSION' if dict_Compared['Regression'] else '')
+        print(str_Line)
+    for str_Skipped in dict_Report['Skipped']:
+        print(f'{str_Skipped:<64s} skipped (needs Slicer)')
+
+# ----------------------------------------------------------------------------------------------------------------------
+def main(list_Args=None):
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description='Performance benchmarks of the SL_Tutorials modules.')
+    parser.add_argument('--json', help='write the results (and the baseline comparison) to this JSON file')
+    parser.add_argument('--baseline', default=STR_BaselinePath_Default, help='baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--check', action='store_true',
+                        help='compare against the baseline: exit status 1 on a regression, 2 without a baseline file')
+    parser.add_argument('--tolerance', type=float, default=FLOAT_Tolerance_Default,
+                        help='relative slowdown over the baseline flagged as a regression')
+    parser.add_argument('--quick', action='store_true', help='smaller sizes, for a smoke run')
+    args = parser.parse_args(list_Args)
+
+    dict_Report = runBenchmarkSuite(args.quick)
+    dict_Comparison = {}
+    bool_BaselineMissing = args.check and not os.path.isfile(args.baseline)
+    if args.check and os.path.isfile(args.baseline):
+        with open(args.baseline) as f:
+            dict_Comparison = compareWithBaseline(dict_Report['Results'], json.load(f)['Results'], args.tolerance)
+    dict_Report['Comparison'] = dict_Comparison
+    printReport(dict_Report, dict_Comparison)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(dict_Report, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({'Environment': dict_Report['Environment'], 'Results': dict_Report['Results']}, f, indent=2)
+        print(f'Baseline stored in {args.baseline}')
+    list_Regressions = [str_Metric for str_Metric, d in dict_Comparison.items() if d['Regression']]
+    if list_Regressions:
+        print(f'{len(list_Regressions)} regression(s) over the baseline: {", ".join(list_Regressions)}')
+        return 1
+    if bool_BaselineMissing:
+        print(f'SL_Alert! No baseline file {args.baseline}: nothing was compared. Store one with --update-baseline '
+              f'on the reference machine, or run without --check for a report-only run.')
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    int_Status = main()
+    if isInSlicer():
+        import slicer
+        slicer.util.exit(int_Status)
+    else:
+        sys.exit(int_Status)